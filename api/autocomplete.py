@@ -0,0 +1,213 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Title
+
+PREFIX_END = chr(0x10FFFF)
+
+
+def normalize(name):
+    return " ".join((name or "").casefold().replace("ё", "е").split())
+
+
+class TitlePrefixIndex:
+    """
+    Индекс названий произведений в памяти процесса для автодополнения.
+
+    Нормализованные названия хранятся в отсортированном списке, поэтому
+    диапазон совпадений по префиксу находится двоичным поиском. Для
+    коротких префиксов с большим числом совпадений лучшие по рейтингу
+    произведения кэшируются и поддерживаются при изменениях.
+    Индекс догружает изменения по `Title.updated_at` не чаще
+    `refresh_interval` секунд и полностью перестраивается раз в
+    `rebuild_interval` секунд, чтобы учесть удаления в других процессах.
+    """
+
+    max_limit = 50
+    scan_limit = 256
+    refresh_interval = 1
+    rebuild_interval = 600
+    refresh_overlap = timedelta(seconds=5)
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.update_lock = threading.Lock()
+        self.keys = []
+        self.titles = {}
+        self.top = {}
+        self.built_at = None
+        self.checked_at = None
+        self.synced_at = None
+
+    def rank(self, title_id):
+        normalized, name, rating = self.titles[title_id]
+        return (rating is None, -(rating or 0), normalized, title_id)
+
+    def load(self, rows):
+        titles = {
+            title_id: (normalize(name), name, rating)
+            for title_id, name, rating in rows
+        }
+        keys = sorted(
+            (normalized, title_id)
+            for title_id, (normalized, _, _) in titles.items()
+        )
+
+        with self.lock:
+            self.titles, self.keys, self.top = titles, keys, {}
+
+    def upsert(self, title_id, name, rating):
+        with self.lock:
+            old = self.titles.get(title_id)
+            normalized = normalize(name)
+
+            if old is not None:
+                if old == (normalized, name, rating):
+                    return
+                old_rank = self.rank(title_id)
+                del self.keys[bisect_left(self.keys, (old[0], title_id))]
+            else:
+                old_rank = None
+
+            self.titles[title_id] = (normalized, name, rating)
+            insort(self.keys, (normalized, title_id))
+            self.patch_top(title_id, old and old[0], old_rank, normalized)
+
+    def remove(self, title_id):
+        with self.lock:
+            old = self.titles.get(title_id)
+            if old is None:
+                return
+
+            old_rank = self.rank(title_id)
+            del self.keys[bisect_left(self.keys, (old[0], title_id))]
+            del self.titles[title_id]
+            self.patch_top(title_id, old[0], old_rank, None)
+
+    def patch_top(self, title_id, old_name, old_rank, new_name):
+        """
+        Поддерживаем закэшированные списки лучших произведений префиксов,
+        которые затронуло изменение. Неполный список содержит все
+        совпадения префикса; если из полного списка уходит произведение
+        или опускается его рейтинг, список сбрасывается до пересчета.
+        """
+
+        prefixes = {
+            name[:length]
+            for name in (old_name, new_name)
+            if name is not None
+            for length in range(1, len(name) + 1)
+        }
+
+        for prefix in prefixes:
+            ids = self.top.get(prefix)
+            if ids is None:
+                continue
+
+            is_in = new_name is not None and new_name.startswith(prefix)
+            full = len(ids) >= self.max_limit
+
+            if title_id in ids:
+                if is_in and (not full or self.rank(title_id) <= old_rank):
+                    ids.sort(key=self.rank)
+                elif not is_in and not full:
+                    ids.remove(title_id)
+                else:
+                    del self.top[prefix]
+            elif is_in and (
+                not full or self.rank(title_id) < self.rank(ids[-1])
+            ):
+                ids.append(title_id)
+                ids.sort(key=self.rank)
+                del ids[self.max_limit:]
+
+    def lookup(self, query, limit=10):
+        prefix = normalize(query)
+        limit = min(limit, self.max_limit)
+        if not prefix or limit < 1:
+            return []
+
+        with self.lock:
+            start = bisect_left(self.keys, (prefix,))
+            end = bisect_left(self.keys, (prefix + PREFIX_END,), start)
+
+            if end - start <= self.scan_limit:
+                ids = heapq.nsmallest(
+                    limit,
+                    (title_id for _, title_id in self.keys[start:end]),
+                    key=self.rank,
+                )
+            else:
+                ids = self.top.get(prefix)
+                if ids is None:
+                    ids = self.top[prefix] = heapq.nsmallest(
+                        self.max_limit,
+                        (title_id for _, title_id in self.keys[start:end]),
+                        key=self.rank,
+                    )
+
+            return [
+                {
+                    "id": title_id,
+                    "name": self.titles[title_id][1],
+                    "rating": self.titles[title_id][2],
+                }
+                for title_id in ids[:limit]
+            ]
+
+    def rebuild(self):
+        started = timezone.now()
+        self.load(
+            Title.objects.order_by()
+            .values_list("id", "name", "rating")
+            .iterator(chunk_size=10000)
+        )
+        self.built_at = self.checked_at = time.monotonic()
+        self.synced_at = started - self.refresh_overlap
+
+    def refresh(self):
+        started = timezone.now()
+        changed = (
+            Title.objects.filter(updated_at__gte=self.synced_at)
+            .order_by()
+            .values_list("id", "name", "rating")
+        )
+        for title_id, name, rating in changed:
+            self.upsert(title_id, name, rating)
+
+        self.checked_at = time.monotonic()
+        self.synced_at = started - self.refresh_overlap
+
+    def ensure_fresh(self):
+        """
+        Догружаем изменения, если пора. Запрос ждет только самого первого
+        построения индекса, остальные обновления выполняет один поток.
+        """
+
+        if (
+            self.built_at is not None
+            and time.monotonic() - self.checked_at < self.refresh_interval
+        ):
+            return
+
+        if not self.update_lock.acquire(blocking=self.built_at is None):
+            return
+
+        try:
+            now = time.monotonic()
+            if self.built_at is None or (
+                now - self.built_at >= self.rebuild_interval
+            ):
+                self.rebuild()
+            elif now - self.checked_at >= self.refresh_interval:
+                self.refresh()
+        finally:
+            self.update_lock.release()
+
+
+title_index = TitlePrefixIndex()
@@ -0,0 +1,150 @@
+import logging
+import re
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+# Порядок, в котором helper проверяет действия: сначала чтение,
+# потом запись, удаление в конце, чтобы объекты были доступны всем.
+METHOD_ORDER = ("get", "post", "patch", "put", "delete")
+
+IGNORED_PATTERN = re.compile(
+    r"^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT|EXPLAIN)\b",
+    re.I,
+)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryLog:
+    """
+    SQL-запросы за время выполнения. Точки сохранения не учитываются:
+    в тестах transaction.atomic создает их запросами, а в рабочем режиме
+    открывает транзакцию без них, и бюджет отличался бы. Не учитываются
+    и планы EXPLAIN, которые снимают журнал медленных запросов
+    и профилировщик.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not IGNORED_PATTERN.match(sql):
+            self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    def record(self):
+        """Контекст, в котором записываются запросы ко всем базам."""
+
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+def should_raise():
+    value = getattr(settings, "QUERY_BUDGET_RAISE", None)
+    return settings.DEBUG if value is None else value
+
+
+def check_budget(view, budget, queries):
+    """
+    Превышение бюджета запросов вызывает исключение в тестах и в режиме
+    отладки, а в остальных случаях пишется в журнал вместе с SQL.
+    """
+
+    if budget is None or len(queries) <= budget:
+        return
+
+    message = f"{view}: {len(queries)} SQL-запросов при бюджете {budget}"
+    details = "\n".join(
+        f"{number}. {sql}" for number, sql in enumerate(queries, start=1)
+    )
+    if should_raise():
+        raise QueryBudgetExceeded(f"{message}\n{details}")
+    logger.warning("%s\n%s", message, details)
+
+
+def get_router_actions(router):
+    """
+    Действия вьюсетов, зарегистрированных в роутере: кортежи
+    (basename, вьюсет, HTTP-метод, действие, имя маршрута, detail).
+    """
+
+    actions = []
+    for prefix, viewset, basename in router.registry:
+        for route in router.get_routes(viewset):
+            for method, action in route.mapping.items():
+                if not hasattr(viewset, action):
+                    continue
+                actions.append(
+                    (
+                        basename,
+                        viewset,
+                        method,
+                        action,
+                        route.name.format(basename=basename),
+                        route.detail,
+                    )
+                )
+    return actions
+
+
+def assert_router_budgets(client, router, kwargs, lookups, payloads):
+    """
+    Проверяет бюджеты всех действий роутера: у каждого действия бюджет
+    должен быть объявлен, а запрос к нему должен пройти успешно и не
+    превысить бюджет. `kwargs` — параметры URL по basename, `lookups` —
+    значение lookup для маршрутов detail, `payloads` — данные запросов
+    на запись по (basename, действие).
+
+    Бюджеты проверяются через QueryBudgetMixin, поэтому на время
+    проверки QUERY_BUDGET_RAISE должен быть включен.
+    """
+
+    actions = get_router_actions(router)
+    missing = sorted(
+        {
+            f"{viewset.__name__}.{action}"
+            for _, viewset, _, action, _, _ in actions
+            if action not in getattr(viewset, "query_budgets", {})
+        }
+    )
+    assert not missing, f"Не объявлены бюджеты запросов: {missing}"
+
+    registry = [basename for _, _, basename in router.registry]
+
+    def order(entry):
+        basename, _, method, *_ = entry
+        position = registry.index(basename)
+        if method == "delete":
+            position = -position
+        return METHOD_ORDER.index(method), position
+
+    for basename, viewset, method, action, name, detail in sorted(
+        actions, key=order
+    ):
+        url_kwargs = dict(kwargs.get(basename, {}))
+        if detail:
+            url_kwargs[viewset.lookup_url_kwarg or viewset.lookup_field] = (
+                lookups[basename]
+            )
+        url = reverse(name, kwargs=url_kwargs)
+
+        if method == "get":
+            response = client.get(url)
+        else:
+            response = getattr(client, method)(
+                url, payloads.get((basename, action)), format="json"
+            )
+
+        assert response.status_code < 400, (
+            f"{method.upper()} {url} ({viewset.__name__}.{action}): "
+            f"{response.status_code} {getattr(response, 'data', '')}"
+        )
@@ -0,0 +1,182 @@
+import csv
+import io
+import json
+import os
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import connections
+from django.utils import timezone
+
+JSON_READ_SIZE = 64 * 1024
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_json_array(file):
+    """
+    Потоково читаем JSON-массив объектов, не загружая файл целиком:
+    объекты по одному разбираются из буфера через raw_decode.
+    """
+
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+
+    while True:
+        chunk = file.read(JSON_READ_SIZE)
+        buffer += chunk
+        position = 0
+
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position == len(buffer):
+                break
+
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("Ожидался JSON-массив объектов")
+                started = True
+                position += 1
+                continue
+
+            if buffer[position] == "]":
+                return
+
+            try:
+                record, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+                break
+
+            yield record
+
+        buffer = buffer[position:]
+        if not chunk:
+            if buffer.strip():
+                raise ValueError("Незавершенный JSON-массив")
+            return
+
+
+def read_records(path):
+    """Записи файла CSV, JSON (массив объектов) или NDJSON как словари."""
+
+    extension = os.path.splitext(path)[1].lower()
+
+    with open(path, encoding="utf-8", newline="") as file:
+        if extension == ".csv":
+            yield from csv.DictReader(file)
+        elif extension in (".ndjson", ".jsonl"):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        elif extension == ".json":
+            yield from iter_json_array(file)
+        else:
+            raise ValueError(f"Неизвестный формат файла: {path}")
+
+
+def copy_field(value):
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_csv(rows):
+    """
+    Строки для COPY ... WITH (FORMAT csv). В этом формате NULL — только
+    пустое поле без кавычек, поэтому все остальные значения, включая
+    пустые строки, записываются в кавычках.
+    """
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(copy_field(value) for value in row) + "\n")
+    buffer.seek(0)
+    return buffer
+
+
+class BulkInserter:
+    """
+    Пакетная вставка подготовленных строк в таблицу модели:
+    COPY на PostgreSQL и executemany на остальных СУБД.
+    Для полей без значения подставляются значения по умолчанию.
+    """
+
+    def __init__(self, model, with_pk=False, using="default"):
+        self.model = model
+        self.connection = connections[using]
+        self.fields = [
+            field
+            for field in model._meta.concrete_fields
+            if with_pk or not field.primary_key
+        ]
+        self.now = timezone.now()
+
+    @property
+    def columns(self):
+        return [field.column for field in self.fields]
+
+    def default(self, field):
+        if field.has_default():
+            return field.get_default()
+        if getattr(field, "auto_now", False) or getattr(
+            field, "auto_now_add", False
+        ):
+            return self.now
+        return None
+
+    def prepare(self, values):
+        return tuple(
+            field.get_db_prep_save(
+                values[field.attname]
+                if values.get(field.attname) is not None
+                else self.default(field),
+                self.connection,
+            )
+            for field in self.fields
+        )
+
+    def insert(self, rows):
+        if not rows:
+            return 0
+
+        rows = [self.prepare(values) for values in rows]
+        table = self.connection.ops.quote_name(self.model._meta.db_table)
+        columns = ", ".join(
+            self.connection.ops.quote_name(column) for column in self.columns
+        )
+
+        with self.connection.cursor() as cursor:
+            if self.connection.vendor == "postgresql":
+                buffer = copy_csv(rows)
+                cursor.copy_expert(
+                    f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+            else:
+                placeholders = ", ".join(["%s"] * len(self.fields))
+                cursor.executemany(
+                    f"INSERT INTO {table} ({columns}) "
+                    f"VALUES ({placeholders})",
+                    rows,
+                )
+
+        return len(rows)
+
+    def reset_sequence(self):
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), [self.model]
+        )
+        with self.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
@@ -0,0 +1,79 @@
+from hashlib import md5
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+
+CATALOG_NAMESPACE = "catalog"
+
+
+def version_key(namespace):
+    return f"{namespace}:version"
+
+
+def stats_key(namespace, name):
+    return f"{namespace}:stats:{name}"
+
+
+def get_version(namespace=CATALOG_NAMESPACE):
+    key = version_key(namespace)
+    cache.add(key, 1, timeout=None)
+
+    return cache.get(key, 1)
+
+
+def bump_version(namespace=CATALOG_NAMESPACE):
+    """
+    Сдвигаем версию пространства имен: ответы, сохраненные под старой
+    версией, больше не читаются и вытесняются из кэша по таймауту.
+    """
+
+    key = version_key(namespace)
+    cache.add(key, 1, timeout=None)
+
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+        return 2
+
+
+def response_key(request, namespace=CATALOG_NAMESPACE):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    location = f"{request.get_host()}{request.path}?{query}"
+    digest = md5(location.encode("utf-8")).hexdigest()
+
+    return f"{namespace}:response:{get_version(namespace)}:{digest}"
+
+
+def get_response_data(request, namespace=CATALOG_NAMESPACE):
+    data = cache.get(response_key(request, namespace))
+    count_request(hit=data is not None, namespace=namespace)
+
+    return data
+
+
+def set_response_data(request, data, namespace=CATALOG_NAMESPACE):
+    cache.set(
+        response_key(request, namespace),
+        data,
+        timeout=settings.CATALOG_CACHE_TIMEOUT,
+    )
+
+
+def count_request(hit, namespace=CATALOG_NAMESPACE):
+    key = stats_key(namespace, "hits" if hit else "misses")
+    cache.add(key, 0, timeout=None)
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_stats(namespace=CATALOG_NAMESPACE):
+    return {
+        "hits": cache.get(stats_key(namespace, "hits"), 0),
+        "misses": cache.get(stats_key(namespace, "misses"), 0),
+        "version": get_version(namespace),
+    }
@@ -0,0 +1,274 @@
+import os
+import threading
+from collections import deque
+from functools import partial
+from time import monotonic
+
+from ..metrics import escape, format_value, registry
+
+DEFAULT_POOL = {
+    "size": 10,
+    "max_age": 300,
+    "check_after": 1.0,
+    "timeout": 10.0,
+}
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Ограниченный пул соединений процесса, общий для потоков воркера.
+
+    Свободное соединение старше `max_age` секунд закрывается и заменяется
+    новым. Соединение, простоявшее без дела дольше `check_after` секунд,
+    перед выдачей проверяется `check`; не прошедшее проверку открывается
+    заново. Если заняты все `size` соединений, поток ждет освобождения
+    не дольше `timeout` секунд.
+    """
+
+    stat_names = (
+        "checkouts",
+        "waits",
+        "wait_seconds",
+        "timeouts",
+        "connects",
+        "reconnects",
+        "expired",
+    )
+
+    def __init__(self, size, max_age, check_after, timeout, check):
+        self.size = size
+        self.max_age = max_age
+        self.check_after = check_after
+        self.timeout = timeout
+        self.check = check
+        self.condition = threading.Condition()
+        self.idle = deque()
+        self.created = {}
+        self.in_use = 0
+        self.stats = dict.fromkeys(self.stat_names, 0)
+
+    def acquire(self, connect):
+        waited_since = None
+
+        with self.condition:
+            while not self.idle and self.in_use >= self.size:
+                now = monotonic()
+                if waited_since is None:
+                    waited_since = now
+                    self.stats["waits"] += 1
+                remaining = self.timeout - (now - waited_since)
+                if remaining <= 0:
+                    self.stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"Нет свободных соединений за {self.timeout} с, "
+                        f"размер пула {self.size}"
+                    )
+                self.condition.wait(remaining)
+
+            # Последнее возвращенное соединение выдается первым:
+            # оно реже остальных нуждается в проверке.
+            entry = self.idle.pop() if self.idle else None
+            self.in_use += 1
+            self.stats["checkouts"] += 1
+            if waited_since is not None:
+                self.stats["wait_seconds"] += monotonic() - waited_since
+
+        try:
+            return self.prepare(entry, connect)
+        except BaseException:
+            with self.condition:
+                self.in_use -= 1
+                self.condition.notify()
+            raise
+
+    def prepare(self, entry, connect):
+        """Проверяем свободное соединение или открываем новое."""
+
+        if entry is not None:
+            connection, created, released = entry
+            now = monotonic()
+            if self.max_age is not None and now - created >= self.max_age:
+                self.count("expired")
+                self.close(connection)
+            elif now - released < self.check_after or self.check(connection):
+                self.created[connection] = created
+                return connection
+            else:
+                self.count("reconnects")
+                self.close(connection)
+
+        connection = connect()
+        self.count("connects")
+        self.created[connection] = monotonic()
+        return connection
+
+    def release(self, connection, discard=False):
+        """
+        Возвращает соединение в пул. Незавершенная транзакция
+        откатывается, соединение с ошибкой закрывается.
+        """
+
+        created = self.created.pop(connection, None)
+        if created is None:
+            discard = True
+        if not discard:
+            try:
+                connection.rollback()
+            except Exception:
+                discard = True
+
+        if discard:
+            self.close(connection)
+
+        with self.condition:
+            self.in_use -= 1
+            if not discard:
+                self.idle.append((connection, created, monotonic()))
+            self.condition.notify()
+
+    def count(self, name):
+        with self.condition:
+            self.stats[name] += 1
+
+    @staticmethod
+    def close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close_idle(self):
+        with self.condition:
+            idle, self.idle = list(self.idle), deque()
+        for connection, _, _ in idle:
+            self.close(connection)
+
+    def snapshot(self):
+        with self.condition:
+            return {
+                **self.stats,
+                "in_use": self.in_use,
+                "idle": len(self.idle),
+                "size": self.size,
+            }
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(alias, options, check):
+    """
+    Пул соединения `alias` текущего процесса. Воркеры gunicorn создают
+    свои пулы после fork и не делят соединения с родителем.
+    """
+
+    key = (alias, os.getpid())
+    with pools_lock:
+        pool = pools.get(key)
+        if pool is None:
+            options = {**DEFAULT_POOL, **options}
+            pool = pools[key] = ConnectionPool(
+                options["size"],
+                options["max_age"],
+                options["check_after"],
+                options["timeout"],
+                check,
+            )
+        return pool
+
+
+def get_pools():
+    pid = os.getpid()
+    with pools_lock:
+        return {
+            alias: pool
+            for (alias, pool_pid), pool in sorted(pools.items())
+            if pool_pid == pid
+        }
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Соединения берутся из пула процесса и возвращаются в него при
+    закрытии. Настройки пула задаются в OPTIONS["pool"] базы: size,
+    max_age, check_after и timeout. Проверку живости соединения
+    выполняет is_connection_usable бэкенда.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    @property
+    def pool(self):
+        return get_pool(
+            self.alias,
+            self.settings_dict["OPTIONS"].get("pool", {}),
+            self.is_connection_usable,
+        )
+
+    def get_new_connection(self, conn_params):
+        connect = partial(super().get_new_connection, conn_params)
+        try:
+            return self.pool.acquire(connect)
+        except PoolTimeout as error:
+            raise self.Database.OperationalError(str(error)) from error
+
+    def _close(self):
+        if self.connection is not None:
+            self.pool.release(
+                self.connection,
+                discard=self.in_atomic_block or self.errors_occurred,
+            )
+
+
+class PoolCollector:
+    """Метрики пулов соединений текущего процесса для /metrics."""
+
+    counters = (
+        ("checkouts", "Выдано соединений из пула."),
+        ("waits", "Ожиданий свободного соединения."),
+        ("wait_seconds", "Суммарное время ожидания соединения."),
+        ("timeouts", "Ожиданий, завершившихся ошибкой по таймауту."),
+        ("connects", "Открыто новых соединений."),
+        ("reconnects", "Соединений, замененных после неудачной проверки."),
+        ("expired", "Соединений, закрытых по max_age."),
+    )
+    gauges = (
+        ("in_use", "Занятых соединений."),
+        ("idle", "Свободных соединений."),
+        ("size", "Размер пула."),
+    )
+
+    def collect(self):
+        snapshots = {
+            alias: pool.snapshot() for alias, pool in get_pools().items()
+        }
+        if not snapshots:
+            return
+
+        for names, kind, suffix in (
+            (self.counters, "counter", "_total"),
+            (self.gauges, "gauge", ""),
+        ):
+            for name, documentation in names:
+                metric = f"yamdb_db_pool_{name}{suffix}"
+                yield f"# HELP {metric} {documentation}"
+                yield f"# TYPE {metric} {kind}"
+                for alias, snapshot in snapshots.items():
+                    yield (
+                        f'{metric}{{alias="{escape(alias)}"}} '
+                        f"{format_value(snapshot[name])}"
+                    )
+
+    def clear(self):
+        pass
+
+
+registry.register(PoolCollector())
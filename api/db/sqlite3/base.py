@@ -0,0 +1,14 @@
+from django.db.backends.sqlite3 import base
+
+from ..pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    """SQLite с пулом соединений: для тестов и локальных бенчмарков."""
+
+    def is_connection_usable(self, connection):
+        try:
+            connection.execute("SELECT 1")
+        except base.Database.Error:
+            return False
+        return True
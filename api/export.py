@@ -0,0 +1,65 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .bulk import chunked
+from .models import Title
+
+EXPORT_CHUNK_SIZE = 2000
+
+TITLE_FIELDS = ("id", "name", "year", "description", "rating", "category")
+
+
+def dump(row):
+    return json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def iter_titles(queryset, chunk_size=None):
+    """
+    Строки NDJSON с произведениями. Произведения читаются курсором
+    на стороне сервера пачками, жанры догружаются одним запросом
+    на пачку, поэтому память не зависит от размера таблицы.
+    """
+
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    rows = (
+        queryset.order_by("id")
+        .values(*TITLE_FIELDS, "category__name", "category__slug")
+        .iterator(chunk_size=chunk_size)
+    )
+
+    for chunk in chunked(rows, chunk_size):
+        genres = {row["id"]: [] for row in chunk}
+        for title_id, name, slug in (
+            Title.genre.through.objects.filter(title_id__in=list(genres))
+            .order_by("genre__name", "genre__id")
+            .values_list("title_id", "genre__name", "genre__slug")
+        ):
+            genres[title_id].append({"name": name, "slug": slug})
+
+        for row in chunk:
+            category_name = row.pop("category__name")
+            category_slug = row.pop("category__slug")
+            row["category"] = row["category"] and {
+                "name": category_name,
+                "slug": category_slug,
+            }
+            row["genre"] = genres[row["id"]]
+            yield dump(row)
+
+
+def iter_reviews(queryset, chunk_size=None):
+    """Строки NDJSON с отзывами, прочитанными курсором на стороне сервера."""
+
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    rows = (
+        queryset.order_by("id")
+        .values(
+            "id", "title_id", "text", "author__username", "score", "pub_date"
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+    for row in rows:
+        row["author"] = row.pop("author__username")
+        yield dump(row)
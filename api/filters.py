@@ -1,7 +1,23 @@
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
 from django_filters import rest_framework as filters
+from rest_framework.filters import BaseFilterBackend
 
 from .models import Title
 
+POSTGRESQL_SEARCH_VECTOR = (
+    "to_tsvector('simple', coalesce(\"titles\".\"name\", '') || ' ' "
+    "|| coalesce(\"titles\".\"description\", ''))"
+)
+POSTGRESQL_SEARCH_QUERY = "plainto_tsquery('simple', %s)"
+
+SQLITE_SEARCH_IDS = "SELECT rowid FROM titles_fts WHERE titles_fts MATCH %s"
+SQLITE_SEARCH_RANK = (
+    "SELECT -bm25(titles_fts) FROM titles_fts "
+    "WHERE titles_fts MATCH %s AND rowid = \"titles\".\"id\""
+)
+
 
 class TitleFilter(filters.FilterSet):
     genre = filters.CharFilter(field_name="genre__slug")
@@ -11,3 +27,67 @@ class TitleFilter(filters.FilterSet):
     class Meta:
         model = Title
         fields = ["genre", "category", "name", "year"]
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск по названию и описанию произведения
+    с сортировкой по релевантности. На PostgreSQL используется
+    GIN-индекс по tsvector, на SQLite — таблица FTS5. На других СУБД
+    каждое слово ищется через icontains без ранжирования.
+    """
+
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, "").split()
+        if not terms:
+            return queryset
+
+        vendor = connections[queryset.db].vendor
+        if vendor == "postgresql":
+            return self.filter_postgresql(queryset, " ".join(terms))
+        if vendor == "sqlite":
+            return self.filter_sqlite(queryset, terms)
+
+        return self.filter_default(queryset, terms)
+
+    def filter_postgresql(self, queryset, query):
+        return (
+            queryset.extra(
+                where=[
+                    f"{POSTGRESQL_SEARCH_VECTOR} @@ {POSTGRESQL_SEARCH_QUERY}"
+                ],
+                params=[query],
+            )
+            .annotate(
+                search_rank=RawSQL(
+                    f"ts_rank({POSTGRESQL_SEARCH_VECTOR}, "
+                    f"{POSTGRESQL_SEARCH_QUERY})",
+                    [query],
+                )
+            )
+            .order_by("-search_rank", "name")
+        )
+
+    def filter_sqlite(self, queryset, terms):
+        query = " ".join(
+            '"{}"'.format(term.replace('"', '""')) for term in terms
+        )
+
+        return (
+            queryset.extra(
+                where=[f"\"titles\".\"id\" IN ({SQLITE_SEARCH_IDS})"],
+                params=[query],
+            )
+            .annotate(search_rank=RawSQL(f"({SQLITE_SEARCH_RANK})", [query]))
+            .order_by("-search_rank", "name")
+        )
+
+    def filter_default(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(
+                Q(name__icontains=term) | Q(description__icontains=term)
+            )
+
+        return queryset.order_by("name")
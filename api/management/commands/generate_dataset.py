@@ -0,0 +1,242 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from api import cache
+from api.bulk import BulkInserter, chunked
+from api.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+GenreTitle = Title.genre.through
+
+USERNAME_PREFIX = "dataset_"
+
+WORDS = (
+    "тень", "ветер", "город", "море", "звезда", "песня", "дорога", "ночь",
+    "огонь", "сад", "река", "зима", "мост", "окно", "сердце", "время",
+    "shadow", "river", "night", "star", "garden", "road", "winter", "fire",
+)
+
+
+def zipf_counts(total, maximum, exponent, rng):
+    """
+    Количество отзывов на произведение по закону Ципфа: произведение
+    с рангом r получает maximum / r ** exponent отзывов, ранги
+    распределяются по произведениям случайно.
+    """
+
+    ranks = list(range(1, total + 1))
+    rng.shuffle(ranks)
+    return [int(maximum / rank ** exponent) for rank in ranks]
+
+
+class Command(BaseCommand):
+    help = (
+        "Генерирует синтетические данные для нагрузочных тестов: "
+        "категории, жанры, произведения, пользователей, отзывы "
+        "с распределением Ципфа и комментарии."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--titles", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--genres", type=int, default=30)
+        parser.add_argument(
+            "--genres-per-title",
+            type=int,
+            default=2,
+            help="Наибольшее количество жанров у произведения.",
+        )
+        parser.add_argument("--users", type=int, default=500)
+        parser.add_argument(
+            "--max-reviews",
+            type=int,
+            default=200,
+            help="Отзывов у самого популярного произведения.",
+        )
+        parser.add_argument(
+            "--zipf",
+            type=float,
+            default=1.1,
+            help="Показатель степени распределения Ципфа.",
+        )
+        parser.add_argument(
+            "--comments-per-review",
+            type=int,
+            default=2,
+            help="Наибольшее количество комментариев к отзыву.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help=(
+                "Удалить каталог, отзывы, комментарии и пользователей, "
+                "созданных этой командой, перед генерацией."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+
+        if options["clear"]:
+            self.clear()
+        elif Title.objects.exists():
+            raise CommandError(
+                "В базе уже есть произведения, используйте --clear"
+            )
+
+        category_ids = self.insert(
+            Category,
+            (
+                {"name": f"Категория {number}", "slug": f"category-{number}"}
+                for number in range(options["categories"])
+            ),
+        )
+        genre_ids = self.insert(
+            Genre,
+            (
+                {"name": f"Жанр {number}", "slug": f"genre-{number}"}
+                for number in range(options["genres"])
+            ),
+        )
+        title_ids = self.insert(
+            Title,
+            (
+                self.title(number, category_ids)
+                for number in range(options["titles"])
+            ),
+        )
+        self.insert(
+            GenreTitle,
+            (
+                {"title_id": title_id, "genre_id": genre_id}
+                for title_id in title_ids
+                for genre_id in self.rng.sample(
+                    genre_ids,
+                    min(
+                        len(genre_ids),
+                        self.rng.randint(0, options["genres_per_title"]),
+                    ),
+                )
+            ),
+        )
+        user_ids = self.insert(
+            User,
+            (
+                {
+                    "username": f"{USERNAME_PREFIX}{number}",
+                    "email": f"{USERNAME_PREFIX}{number}@yamdb.fake",
+                    "date_joined": self.now,
+                }
+                for number in range(options["users"])
+            ),
+        )
+
+        counts = zipf_counts(
+            len(title_ids), options["max_reviews"], options["zipf"], self.rng
+        )
+        review_ids = self.insert(
+            Review,
+            (
+                self.review(title_id, author_id)
+                for title_id, count in zip(title_ids, counts)
+                for author_id in self.rng.sample(
+                    user_ids, min(count, len(user_ids))
+                )
+            ),
+        )
+        self.insert(
+            Comment,
+            (
+                {
+                    "review_id": review_id,
+                    "author_id": self.rng.choice(user_ids),
+                    "text": self.text(12),
+                    "pub_date": self.pub_date(),
+                }
+                for review_id in review_ids
+                for _ in range(
+                    self.rng.randint(0, options["comments_per_review"])
+                )
+            ),
+        )
+
+        started = time.monotonic()
+        Title.recalculate_scores()
+        self.stdout.write(
+            f"ratings: пересчитаны за {time.monotonic() - started:.2f} с"
+        )
+        cache.bump_version()
+
+    def clear(self):
+        with transaction.atomic():
+            for model in (Comment, Review, GenreTitle, Title, Genre, Category):
+                model.objects.all().delete()
+            User.objects.filter(
+                username__startswith=USERNAME_PREFIX
+            ).delete()
+
+    def insert(self, model, rows):
+        """
+        Вставляем строки пачками с заранее назначенными id, чтобы
+        ссылаться на них без чтения из базы. Возвращает список id.
+        """
+
+        inserter = BulkInserter(model, with_pk=True)
+        next_id = (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+        ids = []
+        started = time.monotonic()
+
+        for chunk in chunked(rows, self.batch_size):
+            for row in chunk:
+                row["id"] = next_id
+                ids.append(next_id)
+                next_id += 1
+            with transaction.atomic():
+                inserter.insert(chunk)
+
+        inserter.reset_sequence()
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{model._meta.db_table}: {len(ids)} строк "
+                f"за {elapsed:.2f} с"
+            )
+        )
+        return ids
+
+    def text(self, words):
+        return " ".join(
+            self.rng.choice(WORDS) for _ in range(self.rng.randint(1, words))
+        ).capitalize()
+
+    def pub_date(self):
+        return self.now - timedelta(
+            seconds=self.rng.randint(0, 3 * 365 * 24 * 3600)
+        )
+
+    def title(self, number, category_ids):
+        return {
+            "name": f"{self.text(4)} {number}",
+            "year": self.rng.randint(1900, self.now.year),
+            "description": self.rng.choice([None, self.text(30)]),
+            "category_id": self.rng.choice([None, *category_ids]),
+        }
+
+    def review(self, title_id, author_id):
+        return {
+            "title_id": title_id,
+            "author_id": author_id,
+            "text": self.text(40),
+            "score": self.rng.randint(1, 10),
+            "pub_date": self.pub_date(),
+        }
@@ -0,0 +1,277 @@
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from api import cache
+from api.bulk import BulkInserter, chunked, read_records
+from api.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+GenreTitle = Title.genre.through
+
+# Порядок загрузки: сущность загружается после тех, на которые ссылается.
+# Для ссылок указана модель и поле, по которому ищется значение из колонки
+# с именем ссылки (slug категории, username автора). Колонка `<имя>_id`
+# всегда содержит id.
+ENTITIES = (
+    ("category", Category, {}, ()),
+    ("genre", Genre, {}, ()),
+    (
+        "titles",
+        Title,
+        {"category": (Category, "slug")},
+        ("rating", "score_sum", "score_count", "updated_at"),
+    ),
+    (
+        "genre_title",
+        GenreTitle,
+        {"title": (Title, None), "genre": (Genre, "slug")},
+        (),
+    ),
+    ("users", User, {}, ()),
+    (
+        "review",
+        Review,
+        {"title": (Title, None), "author": (User, "username")},
+        ("updated_at",),
+    ),
+    (
+        "comments",
+        Comment,
+        {"review": (Review, None), "author": (User, "username")},
+        ("updated_at",),
+    ),
+)
+
+
+class Resolver:
+    """
+    Переводит ссылки из файла в id. Значения из колонки `<имя>_id`
+    и ссылки без поля поиска считаются id, остальные ищутся пачкой
+    по полю поиска, даже если состоят из цифр, и кэшируются на всю
+    загрузку.
+    """
+
+    def __init__(self, model, lookup_field):
+        self.model = model
+        self.lookup_field = lookup_field
+        self.ids = {}
+
+    def is_lookup(self, by_id):
+        return self.lookup_field is not None and not by_id
+
+    def prefetch(self, references):
+        missing = {
+            str(value)
+            for value, by_id in references
+            if value not in (None, "")
+            and self.is_lookup(by_id)
+            and str(value) not in self.ids
+        }
+        for chunk in chunked(missing, 500):
+            self.ids.update(
+                self.model.objects.filter(
+                    **{f"{self.lookup_field}__in": chunk}
+                ).values_list(self.lookup_field, "id")
+            )
+
+    def resolve(self, value, by_id=False):
+        if not self.is_lookup(by_id):
+            if isinstance(value, int) or str(value).isdigit():
+                return int(value)
+            raise ValidationError(f"Ожидался id, получено {value!r}")
+        if str(value) not in self.ids:
+            raise ValidationError(
+                f"{self.model._meta.verbose_name} {value!r} не найден"
+            )
+        return self.ids[str(value)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоковая загрузка категорий, жанров, произведений, пользователей, "
+        "отзывов и комментариев из файлов CSV, JSON или NDJSON."
+    )
+
+    def add_arguments(self, parser):
+        for option, *_ in ENTITIES:
+            parser.add_argument(
+                f"--{option.replace('_', '-')}",
+                dest=option,
+                metavar="PATH",
+                help=f"Файл с данными {option} (.csv, .json, .ndjson).",
+            )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Количество строк в одной пачке вставки.",
+        )
+        parser.add_argument(
+            "--skip-invalid",
+            action="store_true",
+            help="Пропускать строки с ошибками вместо остановки загрузки.",
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options["batch_size"]
+        self.skip_invalid = options["skip_invalid"]
+        self.genre_resolver = Resolver(Genre, "slug")
+        imported = set()
+
+        for option, model, references, exclude in ENTITIES:
+            if options[option]:
+                self.import_file(
+                    option, options[option], model, references, exclude
+                )
+                imported.add(option)
+
+        if imported & {"titles", "review"}:
+            started = time.monotonic()
+            Title.recalculate_scores()
+            self.stdout.write(
+                f"ratings: пересчитаны за {time.monotonic() - started:.2f} с"
+            )
+
+        if imported:
+            cache.bump_version()
+
+    def import_file(self, label, path, model, references, exclude):
+        resolvers = {
+            name: Resolver(*target) for name, target in references.items()
+        }
+        inline_genres = model is Title
+        records = read_records(path)
+        started = time.monotonic()
+        inserted = skipped = 0
+        inserter = None
+
+        try:
+            for number, chunk in enumerate(chunked(records, self.batch_size)):
+                if inserter is None:
+                    with_pk = chunk[0].get("id") not in (None, "")
+                    inserter = BulkInserter(model, with_pk=with_pk)
+                    fields = [
+                        field
+                        for field in inserter.fields
+                        if field.name not in exclude
+                    ]
+
+                for name, resolver in resolvers.items():
+                    resolver.prefetch(
+                        self.reference_value(record, name) for record in chunk
+                    )
+
+                rows, genres = [], []
+                first_line = number * self.batch_size + 1
+                for line, record in enumerate(chunk, start=first_line):
+                    try:
+                        rows.append(self.clean(record, fields, resolvers))
+                    except ValidationError as error:
+                        if not self.skip_invalid:
+                            raise CommandError(
+                                f"{label}, запись {line}: {error}"
+                            )
+                        skipped += 1
+                        continue
+
+                    if inline_genres and record.get("genre"):
+                        if rows[-1].get("id") is None:
+                            raise CommandError(
+                                f"{label}, запись {line}: жанры в файле "
+                                "произведений указываются только вместе с id"
+                            )
+                        genres.append((rows[-1]["id"], record["genre"]))
+
+                with transaction.atomic():
+                    inserted += inserter.insert(rows)
+                    if genres:
+                        self.insert_genres(genres)
+        except (DatabaseError, ValueError) as error:
+            raise CommandError(f"{label}: {error}")
+
+        if inserter is not None and "id" in inserter.columns:
+            inserter.reset_sequence()
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        message = (
+            f"{label}: {inserted} строк за {elapsed:.2f} с "
+            f"({inserted / elapsed:.0f} строк/с)"
+        )
+        if skipped:
+            message += f", пропущено {skipped}"
+        self.stdout.write(self.style.SUCCESS(message))
+
+    @staticmethod
+    def reference_value(record, name):
+        """Значение ссылки и признак того, что оно взято из `<имя>_id`."""
+
+        value = record.get(name)
+        if value in (None, ""):
+            return record.get(f"{name}_id"), True
+        return value, False
+
+    def clean(self, record, fields, resolvers):
+        values, errors = {}, {}
+
+        for field in fields:
+            by_id = False
+            if field.name in resolvers:
+                raw, by_id = self.reference_value(record, field.name)
+            else:
+                raw = record.get(field.name)
+
+            if raw in (None, ""):
+                if not (
+                    field.null
+                    or field.primary_key
+                    or field.has_default()
+                    or getattr(field, "auto_now_add", False)
+                ):
+                    errors[field.name] = ["Обязательное поле."]
+                continue
+
+            try:
+                if field.name in resolvers:
+                    value = resolvers[field.name].resolve(raw, by_id)
+                else:
+                    value = field.clean(raw, None)
+            except ValidationError as error:
+                errors[field.name] = error.messages
+                continue
+
+            if field.get_internal_type() == "DateTimeField" and (
+                timezone.is_naive(value)
+            ):
+                value = timezone.make_aware(value, timezone.utc)
+
+            values[field.attname] = value
+
+        if errors:
+            raise ValidationError(errors)
+
+        return values
+
+    def insert_genres(self, genres):
+        resolver = self.genre_resolver
+        pairs = []
+
+        for title_id, raw in genres:
+            slugs = raw if isinstance(raw, list) else str(raw).split(",")
+            pairs.extend(
+                (title_id, str(slug).strip()) for slug in slugs if slug
+            )
+
+        resolver.prefetch((slug, False) for _, slug in pairs)
+        try:
+            rows = [
+                {"title_id": title_id, "genre_id": resolver.resolve(slug)}
+                for title_id, slug in pairs
+            ]
+        except ValidationError as error:
+            raise CommandError(f"titles, жанр: {error}")
+
+        BulkInserter(GenreTitle).insert(rows)
@@ -0,0 +1,100 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+ORDERINGS = {
+    "total": lambda query: query["total"],
+    "mean": lambda query: query["total"] / query["count"],
+    "max": lambda query: query["max"],
+    "count": lambda query: query["count"],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Сводка журнала медленных запросов: запросы, сгруппированные "
+        "по тексту SQL, с суммарным и средним временем."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--log",
+            default=None,
+            metavar="PATH",
+            help="Файл журнала, по умолчанию SLOW_QUERY_LOG.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=10,
+            help="Количество запросов в отчете.",
+        )
+        parser.add_argument(
+            "--order-by",
+            choices=sorted(ORDERINGS),
+            default="total",
+            help="Порядок запросов в отчете.",
+        )
+        parser.add_argument(
+            "--plans",
+            action="store_true",
+            help="Показать план самого долгого выполнения запроса.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["log"] or settings.SLOW_QUERY_LOG
+        queries = {}
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                for line in file:
+                    if line.strip():
+                        self.add(queries, json.loads(line))
+        except FileNotFoundError:
+            raise CommandError(f"Журнал {path} не найден")
+        except ValueError as error:
+            raise CommandError(f"{path}: {error}")
+
+        top = sorted(
+            queries.values(), key=ORDERINGS[options["order_by"]], reverse=True
+        )[: options["limit"]]
+
+        if not top:
+            self.stdout.write("Медленных запросов нет")
+
+        for number, query in enumerate(top, start=1):
+            self.stdout.write(
+                f"{number}. total {query['total'] * 1000:.1f} ms, "
+                f"count {query['count']}, "
+                f"mean {query['total'] / query['count'] * 1000:.1f} ms, "
+                f"max {query['max'] * 1000:.1f} ms"
+            )
+            self.stdout.write(f"   {query['sql']}")
+            for call_site in sorted(query["call_sites"]):
+                self.stdout.write(f"   at {call_site}")
+            if options["plans"] and query["plan"]:
+                for line in query["plan"].splitlines():
+                    self.stdout.write(f"   | {line}")
+            self.stdout.write("")
+
+    @staticmethod
+    def add(queries, entry):
+        query = queries.setdefault(
+            entry["sql"],
+            {
+                "sql": entry["sql"],
+                "count": 0,
+                "total": 0.0,
+                "max": 0.0,
+                "plan": None,
+                "call_sites": set(),
+            },
+        )
+        query["count"] += 1
+        query["total"] += entry["duration"]
+        if entry["duration"] >= query["max"]:
+            query["max"] = entry["duration"]
+            query["plan"] = entry.get("plan")
+        if entry.get("call_site"):
+            query["call_sites"].add(entry["call_site"][0])
@@ -0,0 +1,147 @@
+import threading
+from bisect import bisect_left
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+QUERY_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return str(value)
+
+
+class Histogram:
+    """
+    Гистограмма в формате Prometheus: для каждого набора меток хранятся
+    счетчики корзин, сумма и количество наблюдений.
+    """
+
+    def __init__(self, name, documentation, buckets, labels):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [
+                    [0] * (len(self.buckets) + 1),
+                    0,
+                ]
+            series[0][index] += 1
+            series[1] += value
+
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+
+        with self.lock:
+            series = [
+                (labels, list(counts), total)
+                for labels, (counts, total) in sorted(self.series.items())
+            ]
+
+        for label_values, counts, total in series:
+            labels = ",".join(
+                f'{name}="{escape(value)}"'
+                for name, value in zip(self.labels, label_values)
+            )
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = ",".join(
+                    filter(None, (labels, f'le="{format_value(bound)}"'))
+                )
+                yield f"{self.name}_bucket{{{bucket_labels}}} {cumulative}"
+            suffix = f"{{{labels}}}" if labels else ""
+            yield f"{self.name}_sum{suffix} {format_value(total)}"
+            yield f"{self.name}_count{suffix} {cumulative}"
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def histogram(self, name, documentation, buckets, labels=()):
+        metric = Histogram(name, documentation, buckets, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def register(self, collector):
+        """Сборщик с методами collect() и clear(), например пулы БД."""
+
+        self.metrics.append(collector)
+        return collector
+
+    def render(self):
+        return "".join(
+            f"{line}\n" for metric in self.metrics for line in metric.collect()
+        )
+
+    def clear(self):
+        for metric in self.metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+request_duration = registry.histogram(
+    "yamdb_request_duration_seconds",
+    "Полное время обработки запроса.",
+    DURATION_BUCKETS,
+    ("view", "method", "status"),
+)
+db_duration = registry.histogram(
+    "yamdb_db_duration_seconds",
+    "Время запросов к базе данных за один запрос к API.",
+    DURATION_BUCKETS,
+    ("view",),
+)
+db_queries = registry.histogram(
+    "yamdb_db_queries",
+    "Количество запросов к базе данных за один запрос к API.",
+    QUERY_BUCKETS,
+    ("view",),
+)
+serialization_duration = registry.histogram(
+    "yamdb_serialization_duration_seconds",
+    "Время обхода сериализатора (serializer.data или ValuesReader) "
+    "в list и retrieve без запросов к базе данных внутри него.",
+    DURATION_BUCKETS,
+    ("view",),
+)
+response_render_duration = registry.histogram(
+    "yamdb_response_render_duration_seconds",
+    "Время рендеринга данных ответа в JSON рендерером DRF.",
+    DURATION_BUCKETS,
+    ("view",),
+)
+response_size = registry.histogram(
+    "yamdb_response_size_bytes",
+    "Размер тела ответа.",
+    SIZE_BUCKETS,
+    ("view",),
+)
@@ -0,0 +1,159 @@
+from contextlib import ExitStack, contextmanager, nullcontext
+from time import perf_counter
+
+from django.db import connections
+
+from . import metrics, profiler
+
+
+def get_view_name(request, view_func):
+    """
+    Имя представления для метрик: `TitleViewSet.list` для вьюсетов,
+    имя функции для представлений на @api_view и обычных функций.
+    """
+
+    actions = getattr(view_func, "actions", None)
+    view_class = getattr(view_func, "cls", None)
+
+    if actions:
+        action = actions.get(request.method.lower(), request.method.lower())
+        return f"{view_class.__name__}.{action}"
+
+    if view_class is not None and view_class.__name__ != "WrappedAPIView":
+        return f"{view_class.__name__}.{request.method.lower()}"
+
+    return getattr(view_func, "__name__", type(view_func).__name__)
+
+
+class RequestTimings:
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+        self.render = 0.0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += perf_counter() - started
+            self.queries += 1
+
+    @contextmanager
+    def serializing(self):
+        """
+        Замеряет обход сериализатора без запросов к БД внутри него:
+        они уже учтены во времени db.
+        """
+
+        started, db = perf_counter(), self.db
+        try:
+            yield
+        finally:
+            self.serialize += perf_counter() - started - (self.db - db)
+
+    def timed_render(self, render):
+        def wrapper():
+            started = perf_counter()
+            try:
+                return render()
+            finally:
+                self.render += perf_counter() - started
+
+        return wrapper
+
+
+def timed_serialization(request):
+    """
+    Контекст для замера сериализации ответа. Без RequestMetricsMiddleware
+    ничего не замеряет.
+    """
+
+    timings = getattr(request, "timings", None)
+    if timings is None:
+        return nullcontext()
+
+    return timings.serializing()
+
+
+class RequestMetricsMiddleware:
+    """
+    Замеряет время запроса, число и время запросов к БД, время
+    сериализации и рендеринга ответа и его размер. Значения копятся
+    в гистограммах `api.metrics` по представлению и действию,
+    администраторам они отдаются в заголовке Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = request.timings = RequestTimings()
+        started = perf_counter()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(timings.record_query)
+                )
+            response = self.get_response(request)
+
+        total = perf_counter() - started
+        view = getattr(request, "metrics_view", None)
+        if view is None:
+            return response
+
+        metrics.request_duration.observe(
+            total, view, request.method, str(response.status_code)
+        )
+        metrics.db_duration.observe(timings.db, view)
+        metrics.db_queries.observe(timings.queries, view)
+        metrics.serialization_duration.observe(timings.serialize, view)
+        metrics.response_render_duration.observe(timings.render, view)
+        if not response.streaming:
+            metrics.response_size.observe(len(response.content), view)
+
+        user = getattr(request, "user", None)
+        if getattr(user, "is_admin", False):
+            response["Server-Timing"] = self.server_timing(timings, total)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_view = get_view_name(request, view_func)
+
+    def process_template_response(self, request, response):
+        response.render = request.timings.timed_render(response.render)
+        return response
+
+    @staticmethod
+    def server_timing(timings, total):
+        app = total - timings.db - timings.serialize - timings.render
+        return ", ".join(
+            (
+                f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} '
+                f'queries"',
+                f"app;dur={app * 1000:.1f}",
+                f"serialize;dur={timings.serialize * 1000:.1f}",
+                f"render;dur={timings.render * 1000:.1f}",
+                f"total;dur={total * 1000:.1f}",
+            )
+        )
+
+
+class ProfilerMiddleware:
+    """
+    Профилирует отдельный запрос администратора, пришедший с заголовком
+    `X-Profile` или параметром `?profile=1`. Остальные запросы проходят
+    без изменений.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if profiler.is_requested(request) and profiler.is_allowed(request):
+            return profiler.profile_request(request, self.get_response)
+
+        return self.get_response(request)
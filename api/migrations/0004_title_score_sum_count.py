@@ -0,0 +1,44 @@
+# Generated by Django 3.0.5 on 2026-10-18 19:05
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_score_totals(apps, schema_editor):
+    Review = apps.get_model("api", "Review")
+    Title = apps.get_model("api", "Title")
+
+    totals = (
+        Review.objects.filter(score__isnull=False)
+        .values("title_id")
+        .annotate(score_sum=Sum("score"), score_count=Count("score"))
+        .order_by()
+    )
+
+    for row in totals:
+        Title.objects.filter(pk=row["title_id"]).update(
+            score_sum=row["score_sum"],
+            score_count=row["score_count"],
+            rating=row["score_sum"] // row["score_count"],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_auto_20210206_1504"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="title",
+            name="score_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_score_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.0.5 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_title_score_sum_count"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="comment",
+            options={"ordering": ["-pub_date", "-id"]},
+        ),
+        migrations.AlterModelOptions(
+            name="review",
+            options={"ordering": ["-pub_date", "-id"]},
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["review", "-pub_date", "-id"],
+                name="comment_review_pub_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["title", "-pub_date", "-id"],
+                name="review_title_pub_date_idx",
+            ),
+        ),
+    ]
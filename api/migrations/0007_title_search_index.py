@@ -0,0 +1,82 @@
+# Generated by Django 3.0.5 on 2026-10-18 19:14
+
+from django.db import migrations
+
+POSTGRESQL_FORWARD = [
+    """
+    CREATE INDEX titles_search_idx ON titles USING gin (
+        to_tsvector(
+            'simple',
+            coalesce(name, '') || ' ' || coalesce(description, '')
+        )
+    )
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS titles_search_idx",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE titles_fts USING fts5(
+        name, description, content='titles', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER titles_fts_insert AFTER INSERT ON titles BEGIN
+        INSERT INTO titles_fts (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER titles_fts_delete AFTER DELETE ON titles BEGIN
+        INSERT INTO titles_fts (titles_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER titles_fts_update AFTER UPDATE OF name, description
+    ON titles BEGIN
+        INSERT INTO titles_fts (titles_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO titles_fts (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO titles_fts (titles_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS titles_fts_insert",
+    "DROP TRIGGER IF EXISTS titles_fts_delete",
+    "DROP TRIGGER IF EXISTS titles_fts_update",
+    "DROP TABLE IF EXISTS titles_fts",
+]
+
+
+def run_for_vendor(postgresql, sqlite):
+    def run(apps, schema_editor):
+        statements = {
+            "postgresql": postgresql,
+            "sqlite": sqlite,
+        }.get(schema_editor.connection.vendor, [])
+
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(POSTGRESQL_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRESQL_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
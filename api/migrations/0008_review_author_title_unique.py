@@ -0,0 +1,76 @@
+# Generated by Django 3.0.5 on 2026-10-18 19:20
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def remove_duplicate_reviews(apps, schema_editor):
+    """
+    Оставляем самый ранний отзыв автора на произведение, остальные
+    удаляем вместе с комментариями и пересчитываем оценки затронутых
+    произведений, иначе ограничение уникальности не создастся.
+    """
+
+    Review = apps.get_model("api", "Review")
+    Title = apps.get_model("api", "Title")
+
+    duplicates = (
+        Review.objects.values("author", "title")
+        .annotate(reviews=Count("id"))
+        .filter(reviews__gt=1)
+        .order_by()
+    )
+
+    title_ids = set()
+    for row in duplicates:
+        reviews = Review.objects.filter(
+            author=row["author"], title=row["title"]
+        ).order_by("pub_date", "id")
+        earliest = reviews.values_list("id", flat=True).first()
+        reviews.exclude(pk=earliest).delete()
+        title_ids.add(row["title"])
+
+    if not title_ids:
+        return
+
+    totals = (
+        Review.objects.filter(title__in=title_ids, score__isnull=False)
+        .values("title_id")
+        .annotate(score_sum=Sum("score"), score_count=Count("score"))
+        .order_by()
+    )
+
+    Title.objects.filter(pk__in=title_ids).update(
+        score_sum=0, score_count=0, rating=None
+    )
+    for row in totals:
+        Title.objects.filter(pk=row["title_id"]).update(
+            score_sum=row["score_sum"],
+            score_count=row["score_count"],
+            rating=row["score_sum"] // row["score_count"],
+        )
+
+    # Удаление оставило отложенные проверки внешних ключей, с которыми
+    # PostgreSQL не выполнит ALTER TABLE в той же транзакции.
+    if schema_editor.connection.vendor == "postgresql":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_title_search_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_reviews, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="review",
+            constraint=models.UniqueConstraint(
+                fields=("author", "title"), name="review_author_title_unique"
+            ),
+        ),
+    ]
@@ -1,10 +1,468 @@
-from rest_framework import mixins, viewsets
+from hashlib import md5
+
+from django.conf import settings
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from rest_framework import mixins, status, viewsets
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from . import cache, replicas
+from .budgets import QueryLog, check_budget
+from .bulk import chunked
+from .middleware import timed_serialization
+from .pagination import SwitchablePagination
+from .renderers import StreamingJSONRenderer
+
+
+class TimedListMixin(mixins.ListModelMixin):
+    """
+    list DRF с отдельным замером обхода сериализатора: время попадает
+    в метрику сериализации и в запись serialize заголовка Server-Timing.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with timed_serialization(request):
+                data = self.get_serializer(page, many=True).data
+            return self.get_paginated_response(data)
+
+        with timed_serialization(request):
+            data = self.get_serializer(queryset, many=True).data
+        return Response(data)
+
+
+class TimedRetrieveMixin(mixins.RetrieveModelMixin):
+    """retrieve DRF с отдельным замером обхода сериализатора."""
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+
+        with timed_serialization(request):
+            data = self.get_serializer(instance).data
+        return Response(data)
+
+
+class TimedModelViewSet(
+    TimedListMixin, TimedRetrieveMixin, viewsets.ModelViewSet
+):
+    pass
 
 
 class CustomViewSet(
-    mixins.ListModelMixin,
+    TimedListMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet,
 ):
     pass
+
+
+CONDITIONAL_HEADERS = ("ETag", "Last-Modified")
+
+
+def conditional_response(request, headers):
+    """
+    Ответ 304 (или 412) по заголовкам ETag и Last-Modified ресурса,
+    если запрос условный и ресурс не изменился, иначе None.
+    """
+
+    if not headers:
+        return None
+
+    last_modified = headers.get("Last-Modified")
+    response = get_conditional_response(
+        request,
+        etag=headers.get("ETag"),
+        last_modified=last_modified and parse_http_date_safe(last_modified),
+    )
+
+    if response is not None:
+        for header, value in headers.items():
+            response[header] = value
+
+    return response
+
+
+class NotModified(Exception):
+    """Прерывает действие ответом 304 (или 412) до сериализации."""
+
+    def __init__(self, response):
+        self.response = response
+
+
+def is_conditional(request):
+    return any(
+        header in request.META
+        for header in (
+            "HTTP_IF_NONE_MATCH",
+            "HTTP_IF_MODIFIED_SINCE",
+            "HTTP_IF_MATCH",
+            "HTTP_IF_UNMODIFIED_SINCE",
+        )
+    )
+
+
+class ConditionalGetMixin:
+    """
+    Отдаем ETag, вычисленный по версиям строк ответа (id и updated_at),
+    а не по телу ответа, и Last-Modified для отдельного объекта.
+
+    Для списка версии берутся из строк уже выбранной страницы, поэтому
+    ETag не требует запросов по всей выборке; вместе с ними учитывается
+    количество и наличие следующей страницы, если пагинатор их знает.
+    Условный запрос к неизменившейся странице получает 304 после запроса
+    страницы, но без сериализации. Отдельный объект по условному запросу
+    проверяется одним запросом его updated_at.
+    """
+
+    version_lookups = ("updated_at",)
+
+    def get_etag(self, request, *parts):
+        version = "|".join(
+            (request.get_full_path(), str(cache.get_version()))
+            + tuple(str(part) for part in parts)
+        )
+        return quote_etag(md5(version.encode("utf-8")).hexdigest())
+
+    def get_object_headers(self, request, pk, updated_at):
+        return {
+            "ETag": self.get_etag(request, pk, updated_at.isoformat()),
+            "Last-Modified": http_date(updated_at.timestamp()),
+        }
+
+    def get_page_headers(self, request, page):
+        versions = [
+            (row["id"], row["updated_at"])
+            if isinstance(row, dict)
+            else (row.pk, row.updated_at)
+            for row in page
+        ]
+        paginator = getattr(self.paginator, "paginator", self.paginator)
+        django_page = getattr(paginator, "page", None)
+        count = getattr(getattr(django_page, "paginator", None), "count", "")
+
+        return {
+            "ETag": self.get_etag(
+                request,
+                count,
+                getattr(paginator, "has_next", ""),
+                ",".join(
+                    f"{pk}@{updated_at.isoformat()}"
+                    for pk, updated_at in versions
+                ),
+            )
+        }
+
+    def check_conditional(self, request, headers):
+        self.conditional_headers = headers
+        if is_conditional(request):
+            response = conditional_response(request, headers)
+            if response is not None:
+                raise NotModified(response)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+
+        # Потоковая страница остается ленивым срезом, ETag для нее нет.
+        if self.action == "list" and isinstance(page, list):
+            self.check_conditional(
+                self.request, self.get_page_headers(self.request, page)
+            )
+
+        return page
+
+    def retrieve_state(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return (
+            self.filter_queryset(self.get_queryset())
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .order_by()
+            .values_list("pk", "updated_at")
+            .first()
+        )
+
+    def conditional(self, handler, request, *args, **kwargs):
+        if request.method != "GET":
+            return handler(request, *args, **kwargs)
+
+        self.conditional_headers = {}
+        try:
+            if self.action == "retrieve" and is_conditional(request):
+                state = self.retrieve_state()
+                if state is not None:
+                    self.check_conditional(
+                        request, self.get_object_headers(request, *state)
+                    )
+            response = handler(request, *args, **kwargs)
+        except NotModified as error:
+            return error.response
+
+        if response.status_code == status.HTTP_200_OK:
+            headers = self.conditional_headers
+            if self.action == "retrieve" and not headers:
+                instance = getattr(self, "conditional_object", None)
+                if instance is not None:
+                    headers = self.get_object_headers(
+                        request, instance.pk, instance.updated_at
+                    )
+            for header, value in headers.items():
+                response[header] = value
+
+        return response
+
+    def get_object(self):
+        instance = super().get_object()
+        self.conditional_object = instance
+        return instance
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class CatalogInvalidationMixin:
+    """
+    Любая успешная запись через представление сдвигает версию кэша
+    каталога, поэтому сохраненные ранее ответы больше не отдаются.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            cache.bump_version()
+
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class CatalogCacheMixin(CatalogInvalidationMixin):
+    """
+    Кэшируем список объектов для анонимных запросов. Ключ строится
+    из пути и отсортированных параметров запроса.
+    """
+
+    cached_actions = ("list",)
+
+    def is_cacheable(self, request):
+        return request.method == "GET" and not request.user.is_authenticated
+
+    def caches_response(self, request):
+        """Ответ на запрос будет сохранен в кэш каталога."""
+
+        if self.action not in self.cached_actions or not (
+            self.is_cacheable(request)
+        ):
+            return False
+
+        is_streaming = getattr(self, "is_streaming", None)
+        return not (
+            self.action == "list" and is_streaming and is_streaming(request)
+        )
+
+    def cached(self, handler, request, *args, **kwargs):
+        if not self.is_cacheable(request):
+            return handler(request, *args, **kwargs)
+
+        entry = cache.get_response_data(request)
+        if entry is not None:
+            data, headers = entry
+            return conditional_response(request, headers) or Response(
+                data, headers={**headers, "X-Cache": "HIT"}
+            )
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK and not (
+            response.streaming
+        ):
+            headers = {
+                header: response[header]
+                for header in CONDITIONAL_HEADERS
+                if response.has_header(header)
+            }
+            cache.set_response_data(request, (response.data, headers))
+        response["X-Cache"] = "MISS"
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+
+class CatalogDetailCacheMixin(CatalogCacheMixin):
+    """Кэшируем для анонимных запросов также и отдельный объект."""
+
+    cached_actions = ("list", "retrieve")
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
+
+
+class ValuesListMixin:
+    """
+    Список без экземпляров моделей: страница читается через values()
+    и представляется `values_reader`, вывод совпадает с сериализатором.
+    Если действие использует другой сериализатор, работает обычный list.
+    """
+
+    values_reader = None
+
+    def list(self, request, *args, **kwargs):
+        reader = self.values_reader
+        if reader is None or (
+            reader.serializer_class is not self.get_serializer_class()
+        ):
+            return super().list(request, *args, **kwargs)
+
+        queryset = reader.values(
+            self.filter_queryset(self.get_queryset()),
+            *getattr(self, "version_lookups", ()),
+        )
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with timed_serialization(request):
+                data = reader.represent(page)
+            return self.get_paginated_response(data)
+
+        with timed_serialization(request):
+            data = reader.represent(queryset)
+        return Response(data)
+
+
+class StreamingListMixin:
+    """
+    Потоковый список по `?pagination=stream`: страница читается из базы
+    пачками по STREAMING_CHUNK_SIZE, каждая пачка сериализуется
+    и сразу отдается клиенту, поэтому память воркера зависит от размера
+    пачки, а не страницы. Связи prefetch_related догружаются на пачку,
+    `values_reader` представления используется, если он задан.
+    """
+
+    def is_streaming(self, request):
+        paginator = self.paginator
+        return isinstance(paginator, SwitchablePagination) and (
+            paginator.get_mode(request, self) == "stream"
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_streaming(request):
+            return super().list(request, *args, **kwargs)
+
+        page = self.paginate_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        envelope = self.paginator.paginator.get_envelope(
+            self.iter_results(page)
+        )
+
+        return StreamingHttpResponse(
+            StreamingJSONRenderer().iter_render(envelope),
+            content_type="application/json",
+        )
+
+    def iter_results(self, queryset):
+        chunk_size = settings.STREAMING_CHUNK_SIZE
+        reader = getattr(self, "values_reader", None)
+
+        if reader is not None and (
+            reader.serializer_class is self.get_serializer_class()
+        ):
+            rows = reader.values(queryset).iterator(chunk_size=chunk_size)
+            for chunk in chunked(rows, chunk_size):
+                yield from reader.represent(chunk)
+            return
+
+        lookups = queryset._prefetch_related_lookups
+        objects = queryset.iterator(chunk_size=chunk_size)
+        for chunk in chunked(objects, chunk_size):
+            prefetch_related_objects(chunk, *lookups)
+            yield from self.get_serializer(chunk, many=True).data
+
+
+class QueryBudgetMixin:
+    """
+    Ограничение количества SQL-запросов на действие вьюсета:
+    `query_budgets = {"list": 4, "create": 6}`. Запросы считаются
+    по всем базам на время dispatch, превышение обрабатывает
+    `api.budgets.check_budget`. Потоковые ответы читают базу пачками,
+    число их запросов зависит от размера страницы и не проверяется.
+
+    Бюджет проверяется после выполнения действия, поэтому запись,
+    превысившая бюджет, к этому моменту уже сохранена: в режиме отладки
+    клиент получит 500 за изменения, которые остались в базе. Запрос
+    не оборачивается в транзакцию, чтобы тесты и отладка выполняли
+    запись так же, как рабочий режим.
+    """
+
+    query_budgets = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        log = QueryLog()
+        with log.record():
+            response = super().dispatch(request, *args, **kwargs)
+
+        action = getattr(self, "action", None)
+        if not response.streaming:
+            check_budget(
+                f"{type(self).__name__}.{action}",
+                self.query_budgets.get(action),
+                log.queries,
+            )
+
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Запросы на чтение читают из случайной реплики READ_REPLICAS,
+    если пользователь недавно ничего не записывал. Успешная запись
+    закрепляет чтения пользователя за основной базой, чтобы он сразу
+    видел свои изменения. Ответы, которые попадут в кэш каталога,
+    читаются из основной базы: иначе отстающая реплика сохранила бы
+    устаревшие данные под новой версией кэша на CATALOG_CACHE_TIMEOUT.
+    """
+
+    replica_token = None
+
+    def reads_replica(self, request):
+        if request.method not in SAFE_METHODS or replicas.is_pinned(
+            request.user
+        ):
+            return False
+
+        caches_response = getattr(self, "caches_response", None)
+        return not (caches_response and caches_response(request))
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        if self.reads_replica(request):
+            alias = replicas.choose_replica()
+            if alias is not None:
+                self.replica_token = replicas.read_alias.set(alias)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+
+        if self.replica_token is not None:
+            alias = replicas.read_alias.get()
+            replicas.read_alias.reset(self.replica_token)
+            self.replica_token = None
+            if response.streaming:
+                response.streaming_content = replicas.iter_with_alias(
+                    alias, response.streaming_content
+                )
+        elif request.method not in SAFE_METHODS and (
+            response.status_code < 400
+        ):
+            replicas.pin(request.user)
+
+        return response
@@ -1,6 +1,7 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models.functions import datetime
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Now, NullIf, datetime
 
 from users.models import User
 
@@ -43,6 +44,8 @@ class Title(models.Model):
     )
     description = models.TextField(blank=True, null=True)
     rating = models.IntegerField(blank=True, null=True)
+    score_sum = models.PositiveIntegerField(default=0, editable=False)
+    score_count = models.PositiveIntegerField(default=0, editable=False)
     category = models.ForeignKey(
         Category,
         on_delete=models.SET_NULL,
@@ -54,6 +57,7 @@ class Title(models.Model):
     genre = models.ManyToManyField(
         Genre, related_name="titles", blank=True, db_table="genre_title"
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = "titles"
@@ -61,6 +65,63 @@ class Title(models.Model):
         verbose_name_plural = "titles"
         ordering = ["name"]
 
+    @classmethod
+    def change_score(cls, title_id, added=None, removed=None):
+        """
+        Атомарно сдвигаем сумму и количество оценок произведения одним
+        UPDATE и выводим из них рейтинг, не перечитывая все отзывы.
+        """
+
+        delta_sum = (added or 0) - (removed or 0)
+        delta_count = (added is not None) - (removed is not None)
+
+        if not delta_sum and not delta_count:
+            return
+
+        score_sum = F("score_sum") + delta_sum
+        score_count = F("score_count") + delta_count
+
+        cls.objects.filter(pk=title_id).update(
+            score_sum=score_sum,
+            score_count=score_count,
+            rating=score_sum / NullIf(score_count, 0),
+            updated_at=Now(),
+        )
+
+    @classmethod
+    def recalculate_scores(cls):
+        """
+        Пересчитываем суммы, количества оценок и рейтинги всех произведений
+        одним UPDATE, например после массовой загрузки отзывов.
+        """
+
+        scores = (
+            Review.objects.filter(title=OuterRef("pk"), score__isnull=False)
+            .order_by()
+            .values("title")
+        )
+        score_sum = Coalesce(
+            Subquery(
+                scores.annotate(total=Sum("score")).values("total"),
+                output_field=models.IntegerField(),
+            ),
+            0,
+        )
+        score_count = Coalesce(
+            Subquery(
+                scores.annotate(total=Count("score")).values("total"),
+                output_field=models.IntegerField(),
+            ),
+            0,
+        )
+
+        cls.objects.update(
+            score_sum=score_sum,
+            score_count=score_count,
+            rating=score_sum / NullIf(score_count, 0),
+            updated_at=Now(),
+        )
+
 
 class Review(models.Model):
     title = models.ForeignKey(
@@ -94,10 +155,22 @@ class Review(models.Model):
         auto_now_add=True,
         db_index=True,
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = "review"
-        ordering = ["-pub_date"]
+        ordering = ["-pub_date", "-id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["author", "title"], name="review_author_title_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["title", "-pub_date", "-id"],
+                name="review_title_pub_date_idx",
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -121,7 +194,14 @@ class Comment(models.Model):
     pub_date = models.DateTimeField(
         verbose_name="Дата публикации комментария", auto_now_add=True
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = "comments"
-        ordering = ["-pub_date"]
+        ordering = ["-pub_date", "-id"]
+        indexes = [
+            models.Index(
+                fields=["review", "-pub_date", "-id"],
+                name="comment_review_pub_date_idx",
+            ),
+        ]
@@ -0,0 +1,318 @@
+import json
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PubDateCursorPagination(BasePagination):
+    """
+    Keyset-пагинация по паре (pub_date, id) от новых записей к старым.
+    Страница выбирается условием по индексу, а не OFFSET, поэтому время
+    ответа не зависит от глубины страницы. Количество записей не считается.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = "Неверный курсор"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            reverse, position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by("pub_date", "id")
+        else:
+            queryset = queryset.order_by("-pub_date", "-id")
+
+        if position is not None:
+            pub_date, pk = position
+            if reverse:
+                queryset = queryset.filter(
+                    Q(pub_date__gte=pub_date)
+                    & (Q(pub_date__gt=pub_date) | Q(id__gt=pk))
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(pub_date__lte=pub_date)
+                    & (Q(pub_date__lt=pub_date) | Q(id__lt=pk))
+                )
+
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_more = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            querystring = b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring)
+
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+            pub_date = parse_datetime(tokens["d"][0])
+            pk = int(tokens["i"][0])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return reverse, (pub_date, pk)
+
+    @staticmethod
+    def get_position(instance):
+        if isinstance(instance, dict):
+            return instance["pub_date"], instance["id"]
+        return instance.pub_date, instance.id
+
+    def encode_cursor(self, instance, reverse):
+        pub_date, pk = self.get_position(instance)
+        tokens = {"d": pub_date.isoformat(), "i": pk}
+        if reverse:
+            tokens["r"] = "1"
+
+        querystring = parse.urlencode(tokens)
+        encoded = b64encode(querystring.encode("ascii")).decode("ascii")
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+
+class NoCountPagination(PageNumberPagination):
+    """
+    Постраничная пагинация без COUNT(*): запрашиваем на одну запись
+    больше страницы, чтобы узнать, есть ли следующая.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        page_number = request.query_params.get(self.page_query_param, 1)
+        try:
+            self.number = int(page_number)
+        except ValueError:
+            self.number = 0
+
+        if self.number < 1:
+            raise NotFound(self.invalid_page_message)
+
+        offset = (self.number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+
+        if not results and self.number > 1:
+            raise NotFound(self.invalid_page_message)
+
+        self.request = request
+        self.has_next = len(results) > page_size
+
+        return results[:page_size]
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.number + 1)
+
+    def get_previous_link(self):
+        if self.number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.number - 1)
+
+
+class EstimatedCountPaginator(DjangoPaginator):
+    """
+    Берет количество записей из оценки планировщика PostgreSQL.
+    На небольших выборках и других СУБД считает точно.
+    """
+
+    exact_count_threshold = 1000
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate_count()
+
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+
+        return estimate
+
+    def estimate_count(self):
+        """
+        Оценка Plan Rows из EXPLAIN (FORMAT JSON). QuerySet.explain()
+        возвращает str() от уже разобранного драйвером списка, а не JSON,
+        поэтому план запрашиваем через курсор.
+        """
+
+        queryset = self.object_list
+        connection = connections[queryset.db]
+
+        if connection.vendor != "postgresql":
+            return None
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    django_paginator_class = EstimatedCountPaginator
+
+
+class StreamingPagination(PageNumberPagination):
+    """
+    Постраничная пагинация для потоковой выдачи: страница остается
+    ленивым срезом queryset, который представление читает пачками.
+    Размер страницы задается параметром `page_size`.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = settings.STREAMING_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        page_number = request.query_params.get(self.page_query_param, 1)
+        if page_number in self.last_page_strings:
+            page_number = paginator.num_pages
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as error:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=page_number, message=str(error)
+                )
+            )
+
+        self.request = request
+        return self.page.object_list
+
+    def get_envelope(self, results):
+        return {
+            "count": self.page.paginator.count,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": results,
+        }
+
+
+class SwitchablePagination(BasePagination):
+    """
+    Выбирает способ пагинации по параметру запроса `pagination`:
+    `page` с точным количеством, `nocount` без подсчета и `estimate`
+    с оценкой количества, `stream` для потоковой выдачи больших
+    страниц. Способ по умолчанию задается атрибутом `pagination_mode`
+    у представления.
+    """
+
+    mode_query_param = "pagination"
+    default_mode = "page"
+    modes = {
+        "page": PageNumberPagination,
+        "nocount": NoCountPagination,
+        "estimate": EstimatedCountPagination,
+        "stream": StreamingPagination,
+    }
+
+    def get_mode(self, request, view=None):
+        mode = request.query_params.get(self.mode_query_param)
+
+        if mode not in self.modes:
+            return getattr(view, "pagination_mode", self.default_mode)
+
+        return mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.modes[self.get_mode(request, view)]()
+
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+
+class PubDatePagination(SwitchablePagination):
+    """
+    Пагинация отзывов и комментариев: постраничная по умолчанию
+    и keyset-пагинация по `?pagination=cursor`.
+    """
+
+    modes = {
+        **SwitchablePagination.modes,
+        "cursor": PubDateCursorPagination,
+    }
@@ -5,6 +5,8 @@ from rest_framework.permissions import (
     IsAdminUser,
 )
 
+from users.authentication import MetricsTokenAuthentication
+
 
 class PermissionMixin:
     def get_permissions(self):
@@ -29,5 +31,14 @@ class IsAuthorOrStaff(BasePermission):
         return (
             request.method in SAFE_METHODS
             or request.user.role in ["admin", "moderator"]
-            or obj.author == request.user
+            or obj.author_id == request.user.id
+        )
+
+
+class IsMetricsScraper(BasePermission):
+    """Запрос сборщика метрик с токеном METRICS_TOKEN."""
+
+    def has_permission(self, request, view):
+        return isinstance(
+            request.successful_authenticator, MetricsTokenAuthentication
         )
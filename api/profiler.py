@@ -0,0 +1,248 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import uuid
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from users.models import UserRole
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}T[0-9]{12}-[0-9a-f]{8}$")
+STATS_LIMIT = 40
+
+
+class ProfileStore:
+    """
+    Кольцевой буфер профилей на диске: для каждого профиля хранятся
+    pstats, текстовый отчет и метаданные. После записи нового профиля
+    старые удаляются, пока их не останется не больше `size`.
+    """
+
+    extensions = ("json", "txt", "pstats")
+
+    def __init__(self, directory, size):
+        self.directory = directory
+        self.size = size
+
+    def path(self, profile_id, extension):
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            raise FileNotFoundError(profile_id)
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def ids(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name[: -len(".json")]
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        )
+
+    def save(self, profile, summary, meta):
+        os.makedirs(self.directory, exist_ok=True)
+        now = timezone.now()
+        profile_id = f"{now:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+        profile.dump_stats(self.path(profile_id, "pstats"))
+        summary_path = self.path(profile_id, "txt")
+        with open(summary_path, "w", encoding="utf-8") as file:
+            file.write(summary)
+        # Метаданные пишутся последними: по ним профиль виден в списке.
+        temporary = self.path(profile_id, "json") + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"id": profile_id, **meta}, file, ensure_ascii=False)
+        os.replace(temporary, self.path(profile_id, "json"))
+
+        self.prune()
+        return profile_id
+
+    def prune(self):
+        ids = self.ids()
+        for profile_id in ids[: max(len(ids) - self.size, 0)]:
+            for extension in self.extensions:
+                try:
+                    os.remove(self.path(profile_id, extension))
+                except FileNotFoundError:
+                    pass
+
+    def list(self):
+        profiles = []
+        for profile_id in reversed(self.ids()):
+            try:
+                meta_path = self.path(profile_id, "json")
+                with open(meta_path, encoding="utf-8") as file:
+                    profiles.append(json.load(file))
+            except (FileNotFoundError, ValueError):
+                continue
+        return profiles
+
+
+def get_store():
+    return ProfileStore(settings.PROFILER_DIR, settings.PROFILER_RING_SIZE)
+
+
+def is_requested(request):
+    return bool(
+        request.META.get(PROFILE_HEADER)
+        or request.GET.get(PROFILE_QUERY_PARAM)
+    )
+
+
+def is_allowed(request):
+    """
+    Профилировать запрос может только пользователь с ролью admin.
+    Пользователь определяется теми же классами аутентификации, что
+    и в API, до вызова представления.
+    """
+
+    drf_request = Request(
+        request,
+        authenticators=[
+            authentication()
+            for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ],
+    )
+    try:
+        user = drf_request.user
+    except APIException:
+        return False
+
+    return getattr(user, "role", None) == UserRole.ADMIN
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "alias": context["connection"].alias,
+                    "sql": sql,
+                    "params": params,
+                    "many": many,
+                    "duration": perf_counter() - started,
+                }
+            )
+
+
+def explain(query, analyze=False):
+    """
+    План запроса SELECT. ANALYZE выполняет запрос повторно и доступен
+    только на PostgreSQL, на других СУБД снимается обычный план.
+    """
+
+    if query["many"] or not query["sql"].lstrip().upper().startswith(
+        "SELECT"
+    ):
+        return None
+
+    connection = connections[query["alias"]]
+    options = {}
+    if analyze and connection.vendor == "postgresql":
+        options["analyze"] = True
+    prefix = connection.ops.explain_query_prefix(**options)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"{prefix} {query['sql']}", query["params"])
+            return "\n".join(
+                " ".join(str(value) for value in row)
+                for row in cursor.fetchall()
+            )
+    except DatabaseError as error:
+        return f"EXPLAIN не выполнен: {error}"
+
+
+def format_summary(request, response, duration, queries, profile):
+    lines = [
+        f"{request.method} {request.get_full_path()}",
+        f"view: {getattr(request, 'metrics_view', '-')}",
+        f"status: {response.status_code}",
+        f"duration: {duration * 1000:.1f} ms",
+        f"sql: {len(queries)} queries, "
+        f"{sum(query['duration'] for query in queries) * 1000:.1f} ms",
+        "",
+    ]
+
+    plans = {}
+    for number, query in enumerate(queries, start=1):
+        if query["sql"] not in plans:
+            plans[query["sql"]] = explain(query)
+        lines += [
+            f"-- {number}. {query['duration'] * 1000:.2f} ms "
+            f"[{query['alias']}]",
+            query["sql"],
+            f"params: {query['params']!r}",
+        ]
+        if plans[query["sql"]]:
+            lines += ["plan:", plans[query["sql"]]]
+        lines.append("")
+
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(
+        STATS_LIMIT
+    )
+    lines += [
+        f"profile (top {STATS_LIMIT} by cumulative time):",
+        stream.getvalue(),
+    ]
+
+    return "\n".join(lines)
+
+
+def profile_request(request, get_response):
+    """
+    Выполняем запрос под cProfile, записывая SQL. После ответа для
+    запросов SELECT снимаются планы EXPLAIN, профиль сохраняется
+    в кольцевой буфер, его id возвращается в заголовке X-Profile-Id.
+    """
+
+    recorder = QueryRecorder()
+    profile = cProfile.Profile()
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        started = perf_counter()
+        profile.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profile.disable()
+        duration = perf_counter() - started
+
+    summary = format_summary(
+        request, response, duration, recorder.queries, profile
+    )
+    profile_id = get_store().save(
+        profile,
+        summary,
+        {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "view": getattr(request, "metrics_view", None),
+            "status": response.status_code,
+            "duration": round(duration * 1000, 3),
+            "queries": len(recorder.queries),
+            "created": timezone.now().isoformat(),
+        },
+    )
+    response["X-Profile-Id"] = profile_id
+
+    return response
@@ -0,0 +1,231 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import cached_property
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# Поля, представление которых совпадает со значением из базы.
+PLAIN_FIELDS = (
+    serializers.CharField,
+    serializers.SlugField,
+    serializers.IntegerField,
+)
+
+
+class DateTimeConverter:
+    """
+    Быстрое представление DateTimeField в ISO 8601. Часовой пояс поля,
+    который может быть активирован на время запроса, определяется один
+    раз на страницу в bind(), а не для каждого значения.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def bind(self):
+        field = self.field
+        field_timezone = getattr(field, "timezone", field.default_timezone())
+        if field_timezone is None:
+            return field.to_representation
+
+        def convert(value):
+            if isinstance(value, str) or value.tzinfo is None:
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            if value.endswith("+00:00"):
+                value = value[:-6] + "Z"
+            return value
+
+        return convert
+
+
+def get_converter(field):
+    if type(field) in PLAIN_FIELDS:
+        return None
+    if isinstance(field, serializers.DateTimeField):
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        if output_format and output_format.lower() == ISO_8601:
+            return DateTimeConverter(field)
+    return field.to_representation
+
+
+def bind_converter(convert):
+    if isinstance(convert, DateTimeConverter):
+        return convert.bind()
+    return convert
+
+
+def bind(fields):
+    return [
+        (name, lookup, bind_converter(convert))
+        for name, lookup, convert in fields
+    ]
+
+
+def get_plain(name, field, prefix=""):
+    if field.source == "*" or isinstance(
+        field,
+        (
+            serializers.BaseSerializer,
+            serializers.RelatedField,
+            serializers.ManyRelatedField,
+        ),
+    ):
+        raise ImproperlyConfigured(
+            f"Поле {name} ({type(field).__name__}) не поддерживается"
+        )
+
+    return name, prefix + field.source, get_converter(field)
+
+
+def get_plain_plan(serializer, prefix=""):
+    return [
+        get_plain(name, field, prefix)
+        for name, field in serializer.fields.items()
+    ]
+
+
+def convert_values(fields, values):
+    return {
+        name: value if convert is None or value is None else convert(value)
+        for (name, _, convert), value in zip(fields, values)
+    }
+
+
+class ValuesReader:
+    """
+    Представление объектов сериализатора, собранное из строк .values()
+    без создания экземпляров моделей и вызова полей DRF.
+
+    План полей вычисляется один раз по полям сериализатора: простые
+    поля берутся из строки как есть, остальные через to_representation
+    поля, вложенный сериализатор внешнего ключа читается через JOIN,
+    а вложенный сериализатор ManyToMany догружается одним запросом
+    на страницу в порядке сортировки связанной модели, как prefetch.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def model(self):
+        return self.serializer_class.Meta.model
+
+    @cached_property
+    def plan(self):
+        plan = []
+
+        for name, field in self.serializer_class().fields.items():
+            source = field.source
+
+            if isinstance(field, serializers.ListSerializer):
+                relation = self.model._meta.get_field(source)
+                if not relation.many_to_many:
+                    raise ImproperlyConfigured(
+                        f"Поле {name}: ожидалась связь ManyToMany"
+                    )
+                plan.append(
+                    ("many", name, relation, get_plain_plan(field.child))
+                )
+            elif isinstance(field, serializers.BaseSerializer):
+                fields = get_plain_plan(field, source + "__")
+                plan.append(("nested", name, source, fields))
+            elif isinstance(field, serializers.SlugRelatedField):
+                plan.append(
+                    ("value", name, f"{source}__{field.slug_field}", None)
+                )
+            else:
+                plan.append(("value", *get_plain(name, field)))
+
+        return plan
+
+    @cached_property
+    def lookups(self):
+        lookups = ["id"]
+
+        for kind, name, source, fields in self.plan:
+            if kind == "value":
+                lookups.append(source)
+            elif kind == "nested":
+                lookups.append(source)
+                lookups.extend(lookup for _, lookup, _ in fields)
+
+        return list(dict.fromkeys(lookups))
+
+    def values(self, queryset, *extra):
+        """
+        Строки для представления с сохранением фильтров и сортировки.
+        `extra` — дополнительные поля строки, не попадающие в ответ.
+        """
+
+        return queryset.prefetch_related(None).values(
+            *dict.fromkeys((*self.lookups, *extra))
+        )
+
+    def get_many(self, relation, fields, ids):
+        through = relation.remote_field.through
+        source = relation.m2m_field_name()
+        target = relation.m2m_reverse_field_name()
+        ordering = [
+            f"-{target}__{order[1:]}"
+            if order.startswith("-")
+            else f"{target}__{order}"
+            for order in relation.related_model._meta.ordering
+        ]
+
+        related = {pk: [] for pk in ids}
+        rows = (
+            through.objects.filter(**{f"{source}__in": ids})
+            .order_by(*ordering)
+            .values_list(
+                f"{source}_id",
+                *(f"{target}__{lookup}" for _, lookup, _ in fields),
+            )
+        )
+        for pk, *values in rows:
+            related[pk].append(convert_values(fields, values))
+
+        return related
+
+    def represent(self, rows):
+        """Список представлений для строк, полученных из values()."""
+
+        rows = list(rows)
+        ids = [row["id"] for row in rows]
+        plan = [
+            (
+                kind,
+                name,
+                source,
+                bind_converter(extra) if kind == "value" else bind(extra),
+            )
+            for kind, name, source, extra in self.plan
+        ]
+        many = {
+            name: self.get_many(relation, fields, ids)
+            for kind, name, relation, fields in plan
+            if kind == "many"
+        }
+
+        return [self.represent_row(plan, row, many) for row in rows]
+
+    def represent_row(self, plan, row, many):
+        data = {}
+
+        for kind, name, source, extra in plan:
+            if kind == "value":
+                value = row[source]
+                if extra is not None and value is not None:
+                    value = extra(value)
+                data[name] = value
+            elif kind == "nested":
+                data[name] = (
+                    None
+                    if row[source] is None
+                    else convert_values(
+                        extra, [row[lookup] for _, lookup, _ in extra]
+                    )
+                )
+            else:
+                data[name] = many[name][row["id"]]
+
+        return data
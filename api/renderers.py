@@ -0,0 +1,52 @@
+from collections.abc import Iterator
+
+from rest_framework.renderers import JSONRenderer
+
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+class StreamingJSONRenderer(JSONRenderer):
+    """
+    JSON по частям: значения-итераторы выводятся как массивы элемент
+    за элементом, остальное кодируется как в JSONRenderer. Тело ответа
+    не собирается в памяти целиком, поэтому его можно отдать через
+    StreamingHttpResponse. Мелкие части склеиваются в блоки до
+    `STREAM_BUFFER_SIZE` байт.
+    """
+
+    def iter_render(self, data):
+        buffer = []
+        size = 0
+
+        for chunk in self.iter_chunks(data):
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= STREAM_BUFFER_SIZE:
+                yield b"".join(buffer)
+                buffer, size = [], 0
+
+        if buffer:
+            yield b"".join(buffer)
+
+    def iter_chunks(self, data):
+        if isinstance(data, dict) and any(
+            isinstance(value, Iterator) for value in data.values()
+        ):
+            yield b"{"
+            for number, (key, value) in enumerate(data.items()):
+                if number:
+                    yield b","
+                yield self.render(str(key)) + b":"
+                yield from self.iter_chunks(value)
+            yield b"}"
+        elif isinstance(data, Iterator):
+            yield b"["
+            for number, item in enumerate(data):
+                if number:
+                    yield b","
+                yield from self.iter_chunks(item)
+            yield b"]"
+        elif data is None:
+            yield b"null"
+        else:
+            yield self.render(data)
@@ -0,0 +1,70 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Реплика, из которой читает текущий запрос; None — основная база.
+read_alias = ContextVar("read_alias", default=None)
+
+
+def pin_key(user_id):
+    return f"replicas:pin:{user_id}"
+
+
+def choose_replica():
+    replicas = settings.READ_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+def pin(user):
+    """
+    После записи чтения пользователя на REPLICA_PIN_TIMEOUT секунд
+    уходят в основную базу, пока реплики догоняют изменения. Отметка
+    хранится в кэше, поэтому при нескольких процессах кэш должен быть
+    общим (CACHE_BACKEND), иначе ее видит только процесс, принявший
+    запись.
+    """
+
+    if user.is_authenticated and settings.READ_REPLICAS:
+        cache.set(pin_key(user.pk), True, settings.REPLICA_PIN_TIMEOUT)
+
+
+def is_pinned(user):
+    return user.is_authenticated and bool(cache.get(pin_key(user.pk)))
+
+
+def iter_with_alias(alias, content):
+    """Потоковый ответ читает из той же реплики, что и представление."""
+
+    previous = read_alias.get()
+    read_alias.set(alias)
+    try:
+        yield from content
+    finally:
+        read_alias.set(previous)
+
+
+class ReplicaRouter:
+    """
+    Чтения запроса идут в реплику, выбранную представлением
+    (ReplicaReadMixin), остальные запросы и записи — в основную базу.
+    Внутри транзакции основной базы чтения тоже остаются в ней.
+    """
+
+    def db_for_read(self, model, **hints):
+        # Таблица DatabaseCache хранит отметки pin и версию кэша каталога,
+        # отставание реплики для них недопустимо.
+        if model._meta.app_label == "django_cache":
+            return None
+        alias = read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
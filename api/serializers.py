@@ -1,5 +1,6 @@
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from .models import Category, Comment, Genre, Review, Title
 
@@ -28,12 +29,43 @@ class TitleReadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = "__all__"
+        exclude = ("score_sum", "score_count", "updated_at")
+
+
+class SlugManyRelatedField(serializers.ManyRelatedField):
+    """
+    Список slug проверяется одним запросом на все значения,
+    а не запросом на каждое, как у SlugRelatedField(many=True).
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+
+        child = self.child_relation
+        slugs = [str(value) for value in data]
+        objects = {
+            getattr(obj, child.slug_field): obj
+            for obj in child.get_queryset().filter(
+                **{f"{child.slug_field}__in": slugs}
+            )
+        }
+        for slug in slugs:
+            if slug not in objects:
+                child.fail(
+                    "does_not_exist", slug_name=child.slug_field, value=slug
+                )
+
+        return [objects[slug] for slug in dict.fromkeys(slugs)]
 
 
 class TitleCreateSerializer(serializers.ModelSerializer):
-    genre = serializers.SlugRelatedField(
-        slug_field="slug", many=True, queryset=Genre.objects.all()
+    genre = SlugManyRelatedField(
+        child_relation=serializers.SlugRelatedField(
+            slug_field="slug", queryset=Genre.objects.all()
+        )
     )
     category = serializers.SlugRelatedField(
         slug_field="slug", queryset=Category.objects.all()
@@ -41,7 +73,8 @@ class TitleCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = "__all__"
+        exclude = ("score_sum", "score_count", "updated_at")
+        read_only_fields = ("rating",)
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -51,26 +84,40 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        exclude = ("title",)
-
-    def validate(self, attrs):
-
-        if (
-            Review.objects.filter(
-                author=self.context["request"].user, title=self.get_title()
-            ).exists()
-            and self.context["request"].method != "PATCH"
-        ):
-            raise serializers.ValidationError("Вы уже оставили отзыв")
-
-        return attrs
-
-    def get_title(self):
-        title = get_object_or_404(
-            Title, id=self.context.get("view").kwargs.get("title_id")
-        )
-
-        return title
+        exclude = ("title", "updated_at")
+
+    def create(self, validated_data):
+        """
+        Один отзыв автора на произведение гарантирует уникальное
+        ограничение в базе, нарушение отдаем как ошибку валидации.
+        Остальные ошибки целостности пробрасываем дальше.
+        """
+
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not self.is_duplicate(validated_data):
+                raise
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ["Вы уже оставили отзыв"]}
+            )
+
+    @staticmethod
+    def is_duplicate(validated_data):
+        """
+        Ошибка вызвана ограничением review_author_title_unique: отзыв
+        этого автора на произведение уже есть. Проверяем по данным,
+        а не по тексту ошибки, который у SQLite не содержит имени
+        ограничения.
+        """
+
+        author = validated_data.get("author")
+        title_id = validated_data.get("title_id")
+        if author is None or title_id is None:
+            return False
+
+        return Review.objects.filter(author=author, title_id=title_id).exists()
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -80,4 +127,4 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Comment
-        exclude = ("review",)
+        exclude = ("review", "updated_at")
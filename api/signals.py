@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .autocomplete import title_index
+from .models import Title
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, **kwargs):
+    if title_index.built_at is None:
+        return
+
+    transaction.on_commit(
+        lambda: title_index.upsert(instance.id, instance.name, instance.rating)
+    )
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, **kwargs):
+    if title_index.built_at is None:
+        return
+
+    title_id = instance.id
+    transaction.on_commit(lambda: title_index.remove(title_id))
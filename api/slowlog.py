@@ -0,0 +1,124 @@
+import json
+import logging
+import os
+import sys
+import threading
+from time import perf_counter
+
+from django.conf import settings
+from django.utils import timezone
+
+from .profiler import explain
+
+logger = logging.getLogger(__name__)
+
+write_lock = threading.Lock()
+local = threading.local()
+
+
+def get_call_site(limit=5):
+    """
+    Кадры кода проекта, из которых выполнен запрос, начиная с ближайшего:
+    представление, сериализатор, фильтр. Код Django и библиотек пропускается.
+    """
+
+    root = os.path.join(settings.BASE_DIR, "")
+    skip = {
+        __file__,
+        os.path.join(root, "api", "middleware.py"),
+        os.path.join(root, "api", "budgets.py"),
+    }
+    frames = []
+    frame = sys._getframe(1)
+
+    while frame is not None and len(frames) < limit:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(root)
+            and filename not in skip
+            and "site-packages" not in filename
+        ):
+            frames.append(
+                f"{os.path.relpath(filename, root)}:{frame.f_lineno} "
+                f"in {frame.f_code.co_name}"
+            )
+        frame = frame.f_back
+
+    return frames
+
+
+def write_entry(entry):
+    path = settings.SLOW_QUERY_LOG
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+
+    with write_lock:
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(line)
+
+
+def log_slow_query(execute, sql, params, many, context):
+    """
+    Обертка выполнения SQL: запросы дольше `SLOW_QUERY_THRESHOLD` секунд
+    пишутся в журнал `SLOW_QUERY_LOG` вместе с параметрами, местом вызова
+    и, если включен `SLOW_QUERY_EXPLAIN`, планом. Запросы самого журнала
+    (EXPLAIN) не проверяются.
+    """
+
+    threshold = settings.SLOW_QUERY_THRESHOLD
+    if threshold is None or getattr(local, "active", False):
+        return execute(sql, params, many, context)
+
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = perf_counter() - started
+        if duration >= threshold:
+            local.active = True
+            try:
+                record(sql, params, many, context, duration)
+            except Exception:
+                logger.exception("Не удалось записать медленный запрос")
+            finally:
+                local.active = False
+
+
+def record(sql, params, many, context, duration):
+    alias = context["connection"].alias
+    call_site = get_call_site()
+    plan = None
+    if settings.SLOW_QUERY_EXPLAIN:
+        plan = explain(
+            {"alias": alias, "sql": sql, "params": params, "many": many},
+            analyze=settings.SLOW_QUERY_EXPLAIN_ANALYZE,
+        )
+
+    logger.warning(
+        "Медленный запрос %.1f мс из %s: %s",
+        duration * 1000,
+        call_site[0] if call_site else "-",
+        sql,
+    )
+    write_entry(
+        {
+            "time": timezone.now().isoformat(),
+            "alias": alias,
+            "duration": round(duration, 6),
+            "sql": sql,
+            "params": None if many else params,
+            "call_site": call_site,
+            "plan": plan,
+        }
+    )
+
+
+def install(connection, **kwargs):
+    """
+    Подключаем журнал к каждому новому соединению с БД. Обертка ставится
+    первой: connection.execute_wrapper() снимает последнюю обертку списка,
+    а соединение может открыться внутри такого блока.
+    """
+
+    if log_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, log_slow_query)
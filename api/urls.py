@@ -9,6 +9,12 @@ from .views import (
     GenreViewSet,
     ReviewViewSet,
     TitleViewSet,
+    cache_stats,
+    export_reviews,
+    export_titles,
+    profile_detail,
+    profile_stats,
+    profiles,
 )
 
 router_v1_auth = [
@@ -34,5 +40,11 @@ router_v1.register(
 
 urlpatterns = [
     path("v1/auth/", include(router_v1_auth)),
+    path("v1/cache/stats/", cache_stats),
+    path("v1/export/titles.ndjson", export_titles),
+    path("v1/export/reviews.ndjson", export_reviews),
+    path("v1/profiles/", profiles),
+    path("v1/profiles/<str:profile_id>/", profile_detail),
+    path("v1/profiles/<str:profile_id>/pstats", profile_stats),
     path("v1/", include(router_v1.urls)),
 ]
@@ -1,13 +1,51 @@
-from django.db.models import Avg
+from django.db import transaction
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets
+from rest_framework import filters, status
+from rest_framework.decorators import (
+    action,
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
 
-from .filters import TitleFilter
-from .mixins import CustomViewSet
+from users.authentication import (
+    ClaimsJWTAuthentication,
+    MetricsTokenAuthentication,
+    get_model_user,
+)
+from users.permissions import IsAdminOrSuperUser
+
+from . import cache, export, metrics, profiler
+from .autocomplete import title_index
+from .filters import TitleFilter, TitleSearchFilter
+from .mixins import (
+    CatalogCacheMixin,
+    CatalogDetailCacheMixin,
+    CatalogInvalidationMixin,
+    ConditionalGetMixin,
+    CustomViewSet,
+    QueryBudgetMixin,
+    ReplicaReadMixin,
+    StreamingListMixin,
+    TimedModelViewSet,
+    ValuesListMixin,
+)
 from .models import Category, Genre, Review, Title
-from .permissions import IsAuthorOrStaff, PermissionMixin
+from .pagination import PubDatePagination
+from .permissions import IsAuthorOrStaff, IsMetricsScraper, PermissionMixin
+from .readers import ValuesReader
 from .serializers import (
     CategorySerializer,
     CommentSerializer,
@@ -18,24 +56,70 @@ from .serializers import (
 )
 
 
-class TitleViewSet(PermissionMixin, viewsets.ModelViewSet):
+class TitleViewSet(
+    QueryBudgetMixin,
+    ReplicaReadMixin,
+    CatalogDetailCacheMixin,
+    ConditionalGetMixin,
+    PermissionMixin,
+    StreamingListMixin,
+    ValuesListMixin,
+    TimedModelViewSet,
+):
     """
     Выводим все произведения. Используем класс ModelViewSet,
     чтобы получить полный набор операций чтения и записи по умолчанию.
-    Делаем фильтр по нужным полям.
+    Делаем фильтр по нужным полям и полнотекстовый поиск по параметру
+    search. Категорию и жанры подгружаем заранее,
+    чтобы страница выдачи не порождала запросов на каждое произведение.
     """
 
-    queryset = Title.objects.all()
-    filter_backends = (DjangoFilterBackend,)
+    queryset = Title.objects.select_related("category").prefetch_related(
+        "genre"
+    )
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter)
     filterset_class = TitleFilter
+    values_reader = ValuesReader(TitleReadSerializer)
+    query_budgets = {
+        "list": 4,
+        "retrieve": 3,
+        "create": 8,
+        "update": 9,
+        "partial_update": 9,
+        "destroy": 8,
+        "autocomplete": 2,
+    }
 
     def get_serializer_class(self):
         if self.action in ("create", "update", "partial_update"):
             return TitleCreateSerializer
         return TitleReadSerializer
 
+    @action(detail=False)
+    def autocomplete(self, request):
+        """
+        Подсказки по началу названия из индекса в памяти процесса,
+        лучшие по рейтингу. Параметры: q и limit.
+        """
+
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            limit = 10
+
+        title_index.ensure_fresh()
+        results = title_index.lookup(request.query_params.get("q", ""), limit)
+
+        return Response(results, status=status.HTTP_200_OK)
 
-class CategoryViewSet(PermissionMixin, CustomViewSet):
+
+class CategoryViewSet(
+    QueryBudgetMixin,
+    ReplicaReadMixin,
+    CatalogCacheMixin,
+    PermissionMixin,
+    CustomViewSet,
+):
     """
     Выводим все категории. Используем класс CustomViewSet,
     для предоставления действий, которые используются для обеспечения
@@ -47,9 +131,16 @@ class CategoryViewSet(PermissionMixin, CustomViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
     lookup_field = "slug"
+    query_budgets = {"list": 3, "create": 3, "destroy": 5}
 
 
-class GenreViewSet(PermissionMixin, CustomViewSet):
+class GenreViewSet(
+    QueryBudgetMixin,
+    ReplicaReadMixin,
+    CatalogCacheMixin,
+    PermissionMixin,
+    CustomViewSet,
+):
     """
     Выводим все жанры. Используем класс CustomViewSet,
     для предоставления действий, которые используются для обеспечения
@@ -61,9 +152,18 @@ class GenreViewSet(PermissionMixin, CustomViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
     lookup_field = "slug"
-
-
-class ReviewViewSet(viewsets.ModelViewSet):
+    query_budgets = {"list": 3, "create": 3, "destroy": 4}
+
+
+class ReviewViewSet(
+    QueryBudgetMixin,
+    ReplicaReadMixin,
+    CatalogInvalidationMixin,
+    ConditionalGetMixin,
+    StreamingListMixin,
+    ValuesListMixin,
+    TimedModelViewSet,
+):
     """
     Получить список всех отзывов. Доступ: без токена. Создать новый отзыв.
     Доступ: аутентифицированные пользователи. Получить отзыв по id. Доступ:
@@ -73,40 +173,96 @@ class ReviewViewSet(viewsets.ModelViewSet):
     """
 
     serializer_class = ReviewSerializer
+    values_reader = ValuesReader(ReviewSerializer)
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAuthorOrStaff,
     )
+    pagination_class = PubDatePagination
+    title = None
+    query_budgets = {
+        "list": 4,
+        "retrieve": 3,
+        "create": 4,
+        "update": 6,
+        "partial_update": 6,
+        "destroy": 7,
+    }
 
     def get_title(self):
-        title_id = self.kwargs.get("title_id")
-        title = get_object_or_404(Title, id=title_id)
+        """
+        Произведение из URL загружаем один раз за запрос: его используют
+        get_queryset, perform_create и контекст сериализатора.
+        """
 
-        return title
+        if self.title is None:
+            self.title = get_object_or_404(
+                Title, id=self.kwargs.get("title_id")
+            )
 
-    def get_queryset(self):
-        title = self.get_title()
+        return self.title
 
-        return title.reviews.all()
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["title"] = self.get_title()
 
-    def rating_update(self, serializer):
-        title = self.get_title()
+        return context
 
-        serializer.save(author=self.request.user, title_id=title.id)
+    def get_queryset(self):
+        title = self.get_title()
 
-        title.rating = Review.objects.filter(title=title).aggregate(
-            Avg("score")
-        )["score__avg"]
-        title.save(update_fields=["rating"])
+        return title.reviews.select_related("author")
 
     def perform_create(self, serializer):
-        self.rating_update(serializer)
+        title = self.get_title()
 
+        with transaction.atomic():
+            review = serializer.save(
+                author=get_model_user(self.request.user), title_id=title.id
+            )
+            Title.change_score(title.id, added=review.score)
+
+    def get_locked_score(self, instance):
+        """
+        Оценка отзыва, перечитанная под блокировкой строки: параллельный
+        запрос мог изменить или удалить отзыв после get_object().
+        """
+
+        try:
+            return (
+                Review.objects.select_for_update()
+                .values_list("score", flat=True)
+                .get(pk=instance.pk)
+            )
+        except Review.DoesNotExist:
+            raise Http404
+
+    @transaction.atomic
     def perform_update(self, serializer):
-        self.rating_update(serializer)
-
-
-class CommentViewSet(viewsets.ModelViewSet):
+        old_score = self.get_locked_score(serializer.instance)
+        review = serializer.save()
+
+        Title.change_score(
+            review.title_id, added=review.score, removed=old_score
+        )
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        score = self.get_locked_score(instance)
+        deleted, _ = Review.objects.filter(pk=instance.pk).delete()
+
+        if deleted:
+            Title.change_score(instance.title_id, removed=score)
+
+
+class CommentViewSet(
+    QueryBudgetMixin,
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    StreamingListMixin,
+    ValuesListMixin,
+    TimedModelViewSet,
+):
     """
     Получить список всех комментариев к отзыву по id. Доступ: без токена.
     Создать новый комментарий для отзыва. Доступ: аутентифицированные
@@ -117,24 +273,173 @@ class CommentViewSet(viewsets.ModelViewSet):
     """
 
     serializer_class = CommentSerializer
+    values_reader = ValuesReader(CommentSerializer)
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAuthorOrStaff,
     )
+    pagination_class = PubDatePagination
+    review = None
+    query_budgets = {
+        "list": 4,
+        "retrieve": 3,
+        "create": 3,
+        "update": 4,
+        "partial_update": 4,
+        "destroy": 4,
+    }
 
     def get_review(self):
-        review_id = self.kwargs.get("review_id")
-        title_id = self.kwargs.get("title_id")
-        review = get_object_or_404(Review, id=review_id, title__id=title_id)
+        """Отзыв из URL загружаем один раз за запрос."""
+
+        if self.review is None:
+            self.review = get_object_or_404(
+                Review,
+                id=self.kwargs.get("review_id"),
+                title_id=self.kwargs.get("title_id"),
+            )
 
-        return review
+        return self.review
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["review"] = self.get_review()
+
+        return context
 
     def get_queryset(self):
         review = self.get_review()
 
-        return review.comments.all()
+        return review.comments.select_related("author")
 
     def perform_create(self, serializer):
         review = self.get_review()
 
-        serializer.save(author=self.request.user, review_id=review.id)
+        serializer.save(
+            author=get_model_user(self.request.user), review_id=review.id
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminOrSuperUser])
+def cache_stats(request):
+    """Счетчики попаданий и промахов кэша каталога."""
+
+    return Response(cache.get_stats(), status=status.HTTP_200_OK)
+
+
+def get_export_titles(request):
+    """
+    Произведения для выгрузки с фильтрами TitleFilter и параметром
+    updated_since (дата и время в формате ISO 8601).
+    """
+
+    filterset = TitleFilter(request.query_params, queryset=Title.objects.all())
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+
+    queryset = filterset.qs
+    updated_since = request.query_params.get("updated_since")
+
+    if updated_since:
+        try:
+            updated_since = parse_datetime(updated_since)
+        except ValueError:
+            updated_since = None
+        if updated_since is None:
+            raise ValidationError(
+                {"updated_since": ["Ожидается дата и время ISO 8601."]}
+            )
+        if timezone.is_naive(updated_since):
+            updated_since = timezone.make_aware(updated_since, timezone.utc)
+
+    return queryset, updated_since
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminOrSuperUser])
+def export_titles(request):
+    """Потоковая выгрузка произведений в формате NDJSON."""
+
+    titles, updated_since = get_export_titles(request)
+    if updated_since:
+        titles = titles.filter(updated_at__gte=updated_since)
+
+    return StreamingHttpResponse(
+        export.iter_titles(titles), content_type="application/x-ndjson"
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminOrSuperUser])
+def export_reviews(request):
+    """
+    Потоковая выгрузка отзывов в формате NDJSON. Фильтры TitleFilter
+    отбирают произведения, к которым относятся отзывы.
+    """
+
+    titles, updated_since = get_export_titles(request)
+    reviews = Review.objects.all()
+
+    if titles.query.where:
+        reviews = reviews.filter(title__in=titles.values("id"))
+    if updated_since:
+        reviews = reviews.filter(updated_at__gte=updated_since)
+
+    return StreamingHttpResponse(
+        export.iter_reviews(reviews), content_type="application/x-ndjson"
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminOrSuperUser])
+def profiles(request):
+    """Список сохраненных профилей запросов, новые первыми."""
+
+    return Response(profiler.get_store().list())
+
+
+def open_profile(profile_id, extension, mode="r"):
+    try:
+        path = profiler.get_store().path(profile_id, extension)
+        return open(path, mode, encoding=None if "b" in mode else "utf-8")
+    except FileNotFoundError:
+        raise Http404
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminOrSuperUser])
+def profile_detail(request, profile_id):
+    """Текстовый отчет профиля: SQL с планами и сводка cProfile."""
+
+    with open_profile(profile_id, "txt") as file:
+        return HttpResponse(
+            file.read(), content_type="text/plain; charset=utf-8"
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminOrSuperUser])
+def profile_stats(request, profile_id):
+    """Файл pstats профиля для анализа в pstats или snakeviz."""
+
+    return FileResponse(
+        open_profile(profile_id, "pstats", "rb"),
+        as_attachment=True,
+        filename=f"{profile_id}.pstats",
+    )
+
+
+@api_view(["GET"])
+@authentication_classes([MetricsTokenAuthentication, ClaimsJWTAuthentication])
+@permission_classes([IsMetricsScraper | IsAdminOrSuperUser])
+def metrics_view(request):
+    """
+    Метрики в текстовом формате Prometheus для администраторов
+    и сборщика с токеном METRICS_TOKEN. Метрики хранятся в памяти
+    процесса, поэтому каждый воркер gunicorn отдает только свои.
+    """
+
+    return HttpResponse(
+        metrics.registry.render(), content_type="text/plain; version=0.0.4"
+    )
@@ -28,6 +28,8 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    "api.middleware.ProfilerMiddleware",
+    "api.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -73,6 +75,56 @@ DATABASES = {
     }
 }
 
+# Пул соединений включается переменной DB_POOL_SIZE. Соединения берутся
+# из пула процесса (api.db.postgresql), общего для потоков воркера,
+# и возвращаются в него в конце запроса, поэтому CONN_MAX_AGE остается 0.
+# max_age — срок жизни соединения в секундах, check_after — сколько
+# секунд простоя соединение выдается без проверки SELECT 1, timeout —
+# сколько секунд ждать свободного соединения.
+if os.environ.get("DB_POOL_SIZE"):
+    DATABASES["default"]["ENGINE"] = "api.db.postgresql"
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "size": int(os.environ["DB_POOL_SIZE"]),
+            "max_age": int(os.environ.get("DB_POOL_MAX_AGE", 300)),
+            "check_after": float(os.environ.get("DB_POOL_CHECK_AFTER", 1)),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+        },
+    }
+
+# Реплики для чтения: адреса через запятую в DB_REPLICA_HOSTS,
+# остальные параметры подключения совпадают с основной базой.
+READ_REPLICAS = []
+for number, host in enumerate(
+    filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    READ_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["api.replicas.ReplicaRouter"]
+
+# Сколько секунд после записи чтения пользователя идут в основную базу.
+REPLICA_PIN_TIMEOUT = 5
+
+
+# Кэш по умолчанию живет в памяти процесса. Если процессов несколько,
+# задайте общий бэкенд: иначе сброс состояния пользователя доходит
+# до других процессов только через JWT_USER_STATE_TIMEOUT секунд.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+CATALOG_CACHE_TIMEOUT = 60 * 5
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -110,20 +162,29 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.ClaimsJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination"
-                                ".PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.SwitchablePagination",
     "PAGE_SIZE": 10,
 }
 
+# Потоковая выдача списков (?pagination=stream): наибольший размер
+# страницы и размер пачки, которой страница читается из базы.
+STREAMING_MAX_PAGE_SIZE = 10000
+STREAMING_CHUNK_SIZE = 500
+
 
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
+EMAIL_QUEUE_WORKERS = 2
+EMAIL_QUEUE_BATCH_SIZE = 50
+EMAIL_QUEUE_RETRIES = 3
+EMAIL_QUEUE_BACKOFF = 1
+
 
 AUTH_USER_MODEL = "users.User"
 
@@ -132,3 +193,32 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=180),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
+
+# Сколько секунд кэшируется состояние пользователя для проверки токена.
+# С кэшем в памяти процесса это и наибольшая задержка, с которой другие
+# процессы видят блокировку или смену роли.
+# 0 отключает проверку: пользователь берется только из токена.
+JWT_USER_STATE_TIMEOUT = 30
+
+
+# Bearer-токен сборщика метрик для /metrics; без него метрики доступны
+# только администраторам.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+
+PROFILER_DIR = os.path.join(BASE_DIR, "profiles")
+PROFILER_RING_SIZE = 20
+
+
+# Порог медленного запроса в секундах, None отключает журнал.
+SLOW_QUERY_THRESHOLD = 0.2
+# EXPLAIN выполняется синхронно внутри запроса к API, поэтому план
+# снимается только по явному включению.
+SLOW_QUERY_EXPLAIN = False
+SLOW_QUERY_EXPLAIN_ANALYZE = False
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, "logs", "slow_queries.jsonl")
+
+# Превышение бюджета SQL-запросов действия вьюсета (query_budgets):
+# True вызывает исключение, False пишет предупреждение в журнал,
+# None вызывает исключение только при DEBUG.
+QUERY_BUDGET_RAISE = None
@@ -0,0 +1,74 @@
+"""
+Микробенчмарк автодополнения: поиск по префиксу в индексе названий.
+
+Запуск из корня проекта:
+    python -m benchmarks.autocomplete --titles 1000000
+"""
+import argparse
+import os
+import random
+import string
+import time
+
+
+def main():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
+
+    import django
+
+    django.setup()
+
+    from api.autocomplete import TitlePrefixIndex
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--titles", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    alphabet = string.ascii_lowercase + "абвгдежзиклмнопрстуфхцчшэюя"
+
+    def random_name():
+        words = rng.randint(1, 4)
+        return " ".join(
+            "".join(rng.choices(alphabet, k=rng.randint(2, 10)))
+            for _ in range(words)
+        )
+
+    rows = [
+        (title_id, random_name(), rng.choice([None, *range(1, 11)]))
+        for title_id in range(1, args.titles + 1)
+    ]
+
+    index = TitlePrefixIndex()
+    started = time.perf_counter()
+    index.load(rows)
+    elapsed = time.perf_counter() - started
+    print(f"build: {args.titles} titles in {elapsed:.2f}s")
+
+    queries = [
+        rows[rng.randrange(len(rows))][1][: rng.randint(1, 6)]
+        for _ in range(args.lookups)
+    ]
+
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.lookup(query, 10)
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    for name, share in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        value = timings[min(len(timings) - 1, int(len(timings) * share))]
+        print(f"lookup {name}: {value * 1000:.3f} ms")
+
+    started = time.perf_counter()
+    for title_id, name, rating in rows[:1000]:
+        index.upsert(title_id, name, (rating or 0) % 10 + 1)
+    elapsed = (time.perf_counter() - started) / 1000
+    print(f"upsert mean: {elapsed * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Бенчмарк всех GET-маршрутов api.urls через тестовый клиент Django
+на синтетических данных из `manage.py generate_dataset`.
+
+Для каждого маршрута выводятся p50/p95/p99 времени ответа, количество
+SQL-запросов и пик выделенной памяти. Результат сравнивается
+с сохраненной базовой линией: если запросов стало больше или время
+и память выросли сильнее допуска, команда завершается с кодом 1.
+
+Запуск из корня проекта (создает и удаляет тестовую базу SQLite):
+    python -m benchmarks.endpoints
+    python -m benchmarks.endpoints --save-baseline
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Дополнительные варианты запросов к спискам.
+VARIANTS = (
+    "/api/v1/titles/?search={title_word}",
+    "/api/v1/titles/?genre=genre-1&year={title_year}",
+    "/api/v1/titles/?pagination=nocount",
+    "/api/v1/titles/?pagination=stream&page_size=500",
+    "/api/v1/titles/{title_id}/reviews/?pagination=cursor",
+    "/api/v1/titles/autocomplete/?q={title_prefix}",
+)
+
+GROUP_PATTERN = re.compile(r"\(\?P<(\w+)>[^)]*\)|<(?:\w+:)?(\w+)>")
+
+
+def iter_patterns(patterns, prefix=""):
+    from django.urls import URLResolver
+
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern).lstrip("^").rstrip("$")
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(pattern.url_patterns, route)
+        else:
+            yield route, pattern
+
+
+def allows_get(callback):
+    actions = getattr(callback, "actions", None)
+    if actions is not None:
+        return "get" in actions
+    view_class = getattr(callback, "cls", None)
+    return view_class is None or hasattr(view_class, "get")
+
+
+def get_routes(samples):
+    """
+    GET-маршруты api.urls: шаблон маршрута с именами параметров,
+    по которому результаты сравниваются с базовой линией, и URL
+    с подставленными значениями.
+    """
+
+    from api import urls
+
+    routes = {}
+    for route, pattern in iter_patterns(urls.urlpatterns, "/api/"):
+        if "format" in pattern.pattern.regex.groupindex or not allows_get(
+            pattern.callback
+        ):
+            continue
+
+        basename = (pattern.name or "").split("-")[0]
+
+        def value(match):
+            name = match.group(1) or match.group(2)
+            if name == "pk":
+                return str(samples[f"{basename}_pk"])
+            return str(samples[name])
+
+        def name(match):
+            return "{%s}" % (match.group(1) or match.group(2))
+
+        template = GROUP_PATTERN.sub(name, route).replace("\\.", ".")
+        routes.setdefault(
+            template, GROUP_PATTERN.sub(value, route).replace("\\.", ".")
+        )
+
+    for variant in VARIANTS:
+        routes.setdefault(variant, variant.format(**samples))
+    return routes
+
+
+def get_samples(client):
+    from django.db.models import Count
+
+    from api.models import Category, Comment, Review, Title
+    from users.models import User
+
+    title = Title.objects.annotate(total=Count("reviews")).order_by(
+        "-total", "id"
+    )[0]
+    review = (
+        Review.objects.filter(title=title)
+        .annotate(total=Count("comments"))
+        .order_by("-total", "id")[0]
+    )
+    comment = Comment.objects.filter(review=review).order_by("id").first()
+    profile = client.get("/api/v1/titles/?profile=1")
+
+    return {
+        "title_id": title.id,
+        "title_word": title.name.split()[0],
+        "title_prefix": title.name[:2],
+        "title_year": title.year,
+        "titles_pk": title.id,
+        "review_id": review.id,
+        "reviews_pk": review.id,
+        "comments_pk": comment.id if comment else 0,
+        "username": User.objects.order_by("id")[0].username,
+        "slug": Category.objects.order_by("id")[0].slug,
+        "profile_id": profile["X-Profile-Id"],
+    }
+
+
+def request(client, url):
+    response = client.get(url)
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(client, url, iterations, warmup):
+    from django.db import connection
+
+    for _ in range(warmup):
+        status = request(client, url).status_code
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        request(client, url)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        request(client, url)
+
+    tracemalloc.start()
+    try:
+        request(client, url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "status": status,
+        "p50": round(percentile(timings, 0.5), 3),
+        "p95": round(percentile(timings, 0.95), 3),
+        "p99": round(percentile(timings, 0.99), 3),
+        "queries": counter.count,
+        "alloc_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, tolerance, floor):
+    """Список регрессий относительно базовой линии."""
+
+    regressions = [
+        f"{route}: маршрута нет в базовой линии, обновите ее"
+        for route in results
+        if route not in baseline
+    ]
+    regressions.extend(
+        f"{route}: маршрут из базовой линии не проверен"
+        for route in baseline
+        if route not in results
+    )
+
+    for route, result in results.items():
+        base = baseline.get(route)
+        if base is None:
+            continue
+        if result["queries"] > base["queries"]:
+            regressions.append(
+                f"{route}: запросов {result['queries']} > {base['queries']}"
+            )
+        for metric, limit in (("p50", floor), ("alloc_kb", floor * 100)):
+            allowed = max(base[metric] * (1 + tolerance), base[metric] + limit)
+            if result[metric] > allowed:
+                regressions.append(
+                    f"{route}: {metric} {result[metric]} > {base[metric]} "
+                    f"(+{tolerance:.0%})"
+                )
+    return regressions
+
+
+def main():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings_qa")
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--titles", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.0,
+        help="Допустимый рост p50 и памяти относительно базовой линии.",
+    )
+    parser.add_argument(
+        "--floor",
+        type=float,
+        default=2.0,
+        help="Рост p50 в мс, который не считается регрессией.",
+    )
+    args = parser.parse_args()
+
+    from django.core.paginator import UnorderedObjectListWarning
+
+    warnings.simplefilter("ignore", UnorderedObjectListWarning)
+    setup_test_environment()
+    settings.PROFILER_DIR = tempfile.mkdtemp()
+    settings.SLOW_QUERY_THRESHOLD = None
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        call_command(
+            "generate_dataset",
+            titles=args.titles,
+            users=args.users,
+            stdout=open(os.devnull, "w"),
+        )
+        results = run(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+            file.write("\n")
+        print(f"Базовая линия сохранена в {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("Базовой линии нет, сохраните ее с --save-baseline")
+        return
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.tolerance, args.floor)
+    if regressions:
+        print("\nРегрессии относительно базовой линии:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("\nРегрессий нет")
+
+
+def run(args):
+    from django.test import Client
+
+    from users.authentication import ClaimsRefreshToken
+    from users.models import User, UserRole
+
+    admin = User.objects.create(
+        username="benchmark_admin",
+        email="benchmark_admin@yamdb.fake",
+        role=UserRole.ADMIN,
+        is_staff=True,
+    )
+    token = ClaimsRefreshToken.for_user(admin).access_token
+    client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    results = {}
+    print(
+        f"{'route':<60} {'status':>6} {'p50':>8} {'p95':>8} {'p99':>8} "
+        f"{'queries':>7} {'alloc KB':>9}"
+    )
+    for route, url in get_routes(get_samples(client)).items():
+        result = results[route] = measure(
+            client, url, args.iterations, args.warmup
+        )
+        print(
+            f"{route:<60} {result['status']:>6} {result['p50']:>8.2f} "
+            f"{result['p95']:>8.2f} {result['p99']:>8.2f} "
+            f"{result['queries']:>7} {result['alloc_kb']:>9.1f}"
+        )
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
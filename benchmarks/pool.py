@@ -0,0 +1,133 @@
+"""
+Бенчмарк пула соединений: сколько времени на запрос к API экономит
+соединение из пула по сравнению с открытием нового соединения.
+
+Каждый «запрос» повторяет жизненный цикл соединения Django при
+CONN_MAX_AGE = 0: соединение открывается, выполняется SELECT 1,
+соединение закрывается (с пулом — возвращается в пул). Потоки
+имитируют потоковые воркеры gunicorn, у каждого свое соединение
+Django, пул общий.
+
+Запуск из корня проекта против базы из настроек (PostgreSQL из .env):
+    python -m benchmarks.pool --requests 2000 --threads 4
+Локально на SQLite:
+    DJANGO_SETTINGS_MODULE=tests.settings_qa python -m benchmarks.pool
+"""
+import argparse
+import os
+import threading
+import time
+
+from benchmarks.endpoints import percentile
+
+POOLED_ENGINES = {
+    "django.db.backends.postgresql": "api.db.postgresql",
+    "django.db.backends.sqlite3": "api.db.sqlite3",
+}
+
+
+def get_engines(settings_dict):
+    engine = settings_dict["ENGINE"]
+    for plain, pooled in POOLED_ENGINES.items():
+        if engine in (plain, pooled):
+            return plain, pooled
+    raise SystemExit(f"Для {engine} нет бэкенда с пулом")
+
+
+def run(engine, settings_dict, alias, requests, threads):
+    from django.db.utils import load_backend
+
+    backend = load_backend(engine)
+    timings = [[] for _ in range(threads)]
+
+    def work(number):
+        connection = backend.DatabaseWrapper(dict(settings_dict), alias)
+        for _ in range(requests // threads):
+            started = time.perf_counter()
+            connection.ensure_connection()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            connection.close()
+            timings[number].append((time.perf_counter() - started) * 1000)
+
+    workers = [
+        threading.Thread(target=work, args=(number,))
+        for number in range(threads)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    values = [value for timing in timings for value in timing]
+    return {
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 0.5),
+        "p99": percentile(values, 0.99),
+        "rps": len(values) / elapsed,
+    }
+
+
+def main():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
+
+    import django
+
+    django.setup()
+
+    from django.db import connections
+
+    from api.db.pool import get_pools
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--check-after", type=float, default=1.0)
+    args = parser.parse_args()
+
+    settings_dict = connections["default"].settings_dict
+    plain, pooled = get_engines(settings_dict)
+    options = {
+        key: value
+        for key, value in settings_dict["OPTIONS"].items()
+        if key != "pool"
+    }
+    plain_settings = {**settings_dict, "ENGINE": plain, "OPTIONS": options}
+    pooled_settings = {
+        **settings_dict,
+        "ENGINE": pooled,
+        "OPTIONS": {
+            **options,
+            "pool": {
+                "size": args.pool_size,
+                "check_after": args.check_after,
+            },
+        },
+    }
+
+    results = {
+        "без пула": run(
+            plain, plain_settings, "benchmark", args.requests, args.threads
+        ),
+        "с пулом": run(
+            pooled, pooled_settings, "benchmark", args.requests, args.threads
+        ),
+    }
+
+    print(f"{'':<10} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'rps':>9}")
+    for name, result in results.items():
+        print(
+            f"{name:<10} {result['mean']:>9.3f} {result['p50']:>9.3f} "
+            f"{result['p99']:>9.3f} {result['rps']:>9.0f}"
+        )
+    saved = results["без пула"]["mean"] - results["с пулом"]["mean"]
+    print(f"\nэкономия на запрос: {saved:.3f} мс")
+    print(f"пул: {get_pools()['benchmark'].snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
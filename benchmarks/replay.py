@@ -0,0 +1,494 @@
+"""
+Нагрузочное воспроизведение записанных запросов к API на локально
+запущенном gunicorn или runserver.
+
+Файл запросов — JSON Lines, по одному запросу в строке:
+    {"method": "GET", "path": "/api/v1/titles/?search=ночь"}
+    {"method": "POST", "path": "/api/v1/titles/1/reviews/1/comments/",
+     "body": {"text": "..."}, "auth": true}
+
+Строки без `path` пропускаются. Запросы воспроизводятся по кругу,
+пока не будет отправлено `--requests` запросов или не пройдет
+`--duration` секунд. С `--rate` нагрузка открытая: запросы поступают
+с заданной частотой независимо от ответов сервера, задержка считается
+от запланированного времени отправки. Без `--rate` каждый из
+`--concurrency` исполнителей отправляет следующий запрос сразу после
+ответа на предыдущий.
+
+Для запросов с `"auth": true` токен получается через
+/api/v1/auth/token/. Если код подтверждения не передан, команда
+записывает новый код пользователю с указанной почтой в базе локального
+сервера. Пользователя с ролью `--role` (по умолчанию user) она создает
+только с флагом `--create-user` и не удаляет после прогона.
+
+Запуск из корня проекта (воркер gunicorn.conf.py по умолчанию один;
+при GUNICORN_WORKERS больше 1 нужен общий кэш CACHE_BACKEND):
+    gunicorn api_yamdb.wsgi -c gunicorn.conf.py &
+    python -m benchmarks.replay benchmarks/requests.jsonl \\
+        --url http://127.0.0.1:8000 --concurrency 16 --duration 30
+    python -m benchmarks.replay benchmarks/requests.jsonl \\
+        --mode asyncio --rate 200 --requests 5000 --json report.json
+"""
+import argparse
+import asyncio
+import http.client
+import itertools
+import json
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+from benchmarks.endpoints import percentile
+
+TOKEN_PATH = "/api/v1/auth/token/"
+ID_PATTERN = re.compile(r"/\d+(?=/|$)")
+
+
+def load_calls(path):
+    calls = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            call = json.loads(line)
+            if not isinstance(call, dict) or "path" not in call:
+                continue
+            calls.append(
+                {
+                    "method": call.get("method", "GET").upper(),
+                    "path": quote(call["path"], safe="/?&=%:+,"),
+                    "body": call.get("body"),
+                    "auth": bool(call.get("auth")),
+                    "route": call.get("route"),
+                }
+            )
+    return calls
+
+
+def get_route(call):
+    """Маршрут для отчета: путь без строки запроса, id заменены на {id}."""
+
+    if call["route"]:
+        return f"{call['method']} {call['route']}"
+    path = ID_PATTERN.sub("/{id}", urlsplit(call["path"]).path)
+    return f"{call['method']} {path}"
+
+
+def encode_request(call, host, token, keep_alive=True):
+    headers = {"Host": host, "Accept": "application/json"}
+    body = b""
+    if call["body"] is not None:
+        body = json.dumps(call["body"]).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+    if call["auth"] and token:
+        headers["Authorization"] = f"Bearer {token}"
+    if not keep_alive:
+        headers["Connection"] = "close"
+    headers["Content-Length"] = str(len(body))
+    return headers, body
+
+
+def request_json(url, method, path, body):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port)
+    try:
+        headers, payload = encode_request(
+            {"method": method, "body": body, "auth": False},
+            parts.netloc,
+            None,
+        )
+        connection.request(method, path, payload, headers)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+    finally:
+        connection.close()
+
+
+def local_confirmation_code(email, role="user", create=False):
+    """
+    Новый код подтверждения для пользователя локального сервера.
+    Отсутствующий пользователь создается только при create=True,
+    иначе выбрасывается LookupError.
+    """
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
+
+    import django
+
+    django.setup()
+
+    from uuid import uuid4
+
+    from users.models import User
+
+    if create:
+        user, _ = User.objects.get_or_create(
+            email=email,
+            defaults={"username": email.split("@")[0], "role": role},
+        )
+    else:
+        user = User.objects.filter(email=email).first()
+        if user is None:
+            raise LookupError(
+                f"Пользователь {email} не найден: создайте его "
+                "или передайте --create-user"
+            )
+    user.confirmation_code = str(uuid4())
+    user.save(update_fields=["confirmation_code"])
+    return user.confirmation_code
+
+
+def get_token(url, email, confirmation_code):
+    status, data = request_json(
+        url,
+        "POST",
+        TOKEN_PATH,
+        {"email": email, "confirmation_code": confirmation_code},
+    )
+    if status != 200 or not data or "access" not in data:
+        raise RuntimeError(f"Токен не получен: {status} {data}")
+    return data["access"]
+
+
+class Stats:
+    """Задержки и ошибки по маршрутам, общие для всех исполнителей."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.started = None
+        self.finished = None
+
+    def record(self, route, latency, status, error=None):
+        with self.lock:
+            stats = self.routes.setdefault(
+                route, {"latencies": [], "errors": 0, "statuses": {}}
+            )
+            stats["latencies"].append(latency)
+            key = str(status) if error is None else type(error).__name__
+            stats["statuses"][key] = stats["statuses"].get(key, 0) + 1
+            if error is not None or status >= 400:
+                stats["errors"] += 1
+
+    def report(self):
+        elapsed = max(self.finished - self.started, 1e-9)
+        report = {}
+        for route, stats in sorted(self.routes.items()):
+            latencies = [latency * 1000 for latency in stats["latencies"]]
+            report[route] = {
+                "requests": len(latencies),
+                "rps": round(len(latencies) / elapsed, 2),
+                "error_rate": round(stats["errors"] / len(latencies), 4),
+                "statuses": stats["statuses"],
+                "p50": round(percentile(latencies, 0.5), 3),
+                "p95": round(percentile(latencies, 0.95), 3),
+                "p99": round(percentile(latencies, 0.99), 3),
+                "max": round(max(latencies), 3),
+            }
+        return report
+
+
+def iter_calls(calls, total, duration):
+    """Запросы по кругу с ограничением по количеству и времени."""
+
+    deadline = None if duration is None else time.monotonic() + duration
+    for number, call in enumerate(itertools.cycle(calls)):
+        if total is not None and number >= total:
+            return
+        if deadline is not None and time.monotonic() >= deadline:
+            return
+        yield call
+
+
+def iter_arrivals(rate, poisson, rng):
+    """Моменты поступления запросов открытой нагрузки от начала теста."""
+
+    moment = 0.0
+    while True:
+        yield moment
+        moment += rng.expovariate(rate) if poisson else 1 / rate
+
+
+class ThreadRunner:
+    """Исполнители в потоках, у каждого свое keep-alive соединение."""
+
+    def __init__(self, url, token, concurrency, timeout):
+        self.parts = urlsplit(url)
+        self.token = token
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    def connect(self):
+        return http.client.HTTPConnection(
+            self.parts.hostname, self.parts.port, timeout=self.timeout
+        )
+
+    def send(self, connection, call):
+        headers, body = encode_request(call, self.parts.netloc, self.token)
+        connection.request(call["method"], call["path"], body, headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+
+    def worker(self, tasks, stats):
+        connection = self.connect()
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            scheduled, call = task
+            if scheduled is not None:
+                time.sleep(max(scheduled - time.monotonic(), 0))
+            started = time.monotonic() if scheduled is None else scheduled
+            try:
+                status = self.send(connection, call)
+            except (OSError, http.client.HTTPException) as error:
+                connection.close()
+                connection = self.connect()
+                stats.record(
+                    get_route(call), time.monotonic() - started, 0, error
+                )
+            else:
+                latency = time.monotonic() - started
+                stats.record(get_route(call), latency, status)
+        connection.close()
+
+    def run(self, calls, arrivals, stats):
+        tasks = queue.Queue(maxsize=self.concurrency * 2)
+        threads = [
+            threading.Thread(target=self.worker, args=(tasks, stats))
+            for _ in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+
+        stats.started = time.monotonic()
+        for call in calls:
+            scheduled = None
+            if arrivals is not None:
+                scheduled = stats.started + next(arrivals)
+                time.sleep(max(scheduled - time.monotonic() - 0.05, 0))
+            tasks.put((scheduled, call))
+        for _ in threads:
+            tasks.put(None)
+        for thread in threads:
+            thread.join()
+        stats.finished = time.monotonic()
+
+
+class AsyncioRunner:
+    """
+    Запросы в цикле asyncio: одновременно выполняется не больше
+    `concurrency` запросов, каждый в отдельном соединении.
+    """
+
+    def __init__(self, url, token, concurrency, timeout):
+        self.parts = urlsplit(url)
+        self.token = token
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    async def send(self, call):
+        headers, body = encode_request(
+            call, self.parts.netloc, self.token, keep_alive=False
+        )
+        reader, writer = await asyncio.open_connection(
+            self.parts.hostname, self.parts.port
+        )
+        try:
+            head = "".join(
+                f"{name}: {value}\r\n" for name, value in headers.items()
+            )
+            writer.write(
+                f"{call['method']} {call['path']} HTTP/1.1\r\n{head}\r\n"
+                .encode("latin-1")
+                + body
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                raise http.client.RemoteDisconnected(call["path"])
+            while await reader.read(65536):
+                pass
+            return int(status_line.split()[1])
+        finally:
+            writer.close()
+
+    async def execute(self, call, started, limit, stats):
+        async with limit:
+            try:
+                status = await asyncio.wait_for(self.send(call), self.timeout)
+            except (OSError, asyncio.TimeoutError, ValueError) as error:
+                stats.record(
+                    get_route(call), time.monotonic() - started, 0, error
+                )
+            else:
+                latency = time.monotonic() - started
+                stats.record(get_route(call), latency, status)
+
+    async def run_async(self, calls, arrivals, stats):
+        limit = asyncio.Semaphore(self.concurrency)
+        pending = set()
+        stats.started = time.monotonic()
+
+        for call in calls:
+            if arrivals is None:
+                await limit.acquire()
+                limit.release()
+                started = time.monotonic()
+            else:
+                started = stats.started + next(arrivals)
+                await asyncio.sleep(max(started - time.monotonic(), 0))
+            task = asyncio.ensure_future(
+                self.execute(call, started, limit, stats)
+            )
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            # Отдаем управление, чтобы задача заняла семафор.
+            await asyncio.sleep(0)
+
+        if pending:
+            await asyncio.wait(pending)
+        stats.finished = time.monotonic()
+
+    def run(self, calls, arrivals, stats):
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self.run_async(calls, arrivals, stats))
+        finally:
+            loop.close()
+
+
+RUNNERS = {"threads": ThreadRunner, "asyncio": AsyncioRunner}
+
+
+def replay(
+    url,
+    calls,
+    mode="threads",
+    concurrency=8,
+    rate=None,
+    poisson=False,
+    total=None,
+    duration=None,
+    token=None,
+    timeout=30.0,
+    seed=0,
+):
+    """Воспроизводит запросы и возвращает отчет по маршрутам."""
+
+    if total is None and duration is None:
+        total = len(calls)
+    arrivals = None
+    if rate is not None:
+        arrivals = iter_arrivals(rate, poisson, random.Random(seed))
+
+    stats = Stats()
+    runner = RUNNERS[mode](url, token, concurrency, timeout)
+    runner.run(iter_calls(calls, total, duration), arrivals, stats)
+    return stats.report()
+
+
+def print_report(report):
+    print(
+        f"{'route':<55} {'requests':>8} {'rps':>8} {'errors':>7} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    for route, stats in report.items():
+        print(
+            f"{route:<55} {stats['requests']:>8} {stats['rps']:>8.1f} "
+            f"{stats['error_rate']:>7.2%} {stats['p50']:>8.2f} "
+            f"{stats['p95']:>8.2f} {stats['p99']:>8.2f}"
+        )
+    requests = sum(stats["requests"] for stats in report.values())
+    errors = sum(
+        stats["requests"] * stats["error_rate"] for stats in report.values()
+    )
+    rps = sum(stats["rps"] for stats in report.values())
+    print(
+        f"\nвсего: {requests} запросов, {rps:.1f} rps, "
+        f"ошибок {errors / max(requests, 1):.2%}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("calls", help="Файл JSON Lines с запросами.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--mode", choices=sorted(RUNNERS), default="threads")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Запросов в секунду для открытой нагрузки.",
+    )
+    parser.add_argument(
+        "--poisson",
+        action="store_true",
+        help="Интервалы между запросами по экспоненциальному закону.",
+    )
+    parser.add_argument("--requests", type=int)
+    parser.add_argument("--duration", type=float)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--email", default="replay@yamdb.fake")
+    parser.add_argument("--confirmation-code")
+    parser.add_argument(
+        "--create-user",
+        action="store_true",
+        help="Создать пользователя --email, если его нет. Пользователь "
+        "остается в базе после прогона.",
+    )
+    parser.add_argument(
+        "--role",
+        default="user",
+        help="Роль пользователя, создаваемого с --create-user.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Сохранить отчет в файл JSON.")
+    args = parser.parse_args()
+
+    calls = load_calls(args.calls)
+    if not calls:
+        sys.exit(f"В {args.calls} нет запросов")
+
+    token = None
+    if any(call["auth"] for call in calls):
+        code = args.confirmation_code
+        if code is None:
+            try:
+                code = local_confirmation_code(
+                    args.email, args.role, args.create_user
+                )
+            except LookupError as error:
+                sys.exit(str(error))
+        token = get_token(args.url, args.email, code)
+
+    report = replay(
+        args.url,
+        calls,
+        mode=args.mode,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        poisson=args.poisson,
+        total=args.requests,
+        duration=args.duration,
+        token=token,
+        timeout=args.timeout,
+        seed=args.seed,
+    )
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+            file.write("\n")
+
+
+if __name__ == "__main__":
+    main()
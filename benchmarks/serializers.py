@@ -0,0 +1,124 @@
+"""
+Бенчмарк чтения списков: сериализаторы DRF против ValuesReader
+на страницах по 100 объектов, вместе с запросами к БД и рендерингом JSON.
+
+Запуск из корня проекта (создает и удаляет тестовую базу SQLite):
+    python -m benchmarks.serializers --titles 2000 --pages 200
+"""
+import argparse
+import os
+import random
+import time
+
+
+def measure(function, pages):
+    function()
+    started = time.perf_counter()
+    for _ in range(pages):
+        function()
+    return pages / (time.perf_counter() - started)
+
+
+def main():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings_qa")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--titles", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        run(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def run(args):
+    from rest_framework.renderers import JSONRenderer
+
+    from api.models import Category, Genre, Review, Title
+    from api.readers import ValuesReader
+    from api.serializers import ReviewSerializer, TitleReadSerializer
+    from users.models import User
+
+    rng = random.Random(args.seed)
+    # bulk_create на SQLite не возвращает id, поэтому объекты перечитываем.
+    Category.objects.bulk_create(
+        Category(name=f"Категория {number}", slug=f"category-{number}")
+        for number in range(10)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f"Жанр {number}", slug=f"genre-{number}")
+        for number in range(20)
+    )
+    categories = list(Category.objects.all())
+    genres = list(Genre.objects.all())
+    Title.objects.bulk_create(
+        Title(
+            name=f"Произведение {number}",
+            year=rng.randint(1900, 2020),
+            description=rng.choice([None, "Описание произведения"]),
+            rating=rng.choice([None, *range(1, 11)]),
+            category=rng.choice([None, *categories]),
+        )
+        for number in range(args.titles)
+    )
+    titles = list(Title.objects.values_list("id", flat=True))
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title_id=title_id, genre_id=genre.id)
+        for title_id in titles
+        for genre in rng.sample(genres, rng.randint(0, 3))
+    )
+    User.objects.bulk_create(
+        User(username=f"user{number}", email=f"user{number}@yamdb.fake")
+        for number in range(args.page_size)
+    )
+    users = list(User.objects.all())
+    Review.objects.bulk_create(
+        Review(title_id=titles[0], author=user, text="Текст отзыва", score=5)
+        for user in users
+    )
+
+    renderer = JSONRenderer()
+    cases = (
+        (
+            "titles",
+            TitleReadSerializer,
+            Title.objects.select_related("category").prefetch_related("genre"),
+        ),
+        ("reviews", ReviewSerializer, Review.objects.select_related("author")),
+    )
+
+    for name, serializer_class, queryset in cases:
+        reader = ValuesReader(serializer_class)
+
+        def serializer_page():
+            page = list(queryset[: args.page_size])
+            return renderer.render(serializer_class(page, many=True).data)
+
+        def reader_page():
+            page = reader.values(queryset)[: args.page_size]
+            return renderer.render(reader.represent(page))
+
+        assert serializer_page() == reader_page(), f"{name}: вывод отличается"
+
+        slow = measure(serializer_page, args.pages)
+        fast = measure(reader_page, args.pages)
+        print(
+            f"{name}: serializer {slow:.0f} pages/s, "
+            f"values reader {fast:.0f} pages/s, x{fast / slow:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
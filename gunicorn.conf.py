@@ -0,0 +1,12 @@
+import os
+
+# Потоковые воркеры делят пул соединений процесса (DB_POOL_SIZE),
+# поэтому пул не должен быть меньше GUNICORN_THREADS.
+# Кэш каталога, состояние пользователей и привязка чтений к основной
+# базе хранятся в кэше Django. С кэшем в памяти процесса их сброс виден
+# только одному воркеру, поэтому GUNICORN_WORKERS больше 1 требует
+# общего кэша (CACHE_BACKEND).
+bind = "0.0.0.0:8000"
+workers = int(os.environ.get("GUNICORN_WORKERS", 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+worker_class = "gthread" if threads > 1 else "sync"
@@ -6,4 +6,8 @@ root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 
 
-pytest_plugins = []
+pytest_plugins = [
+    "tests.fixtures.fixture_user",
+    "tests.fixtures.fixture_data",
+    "tests.fixtures.fixture_cache",
+]
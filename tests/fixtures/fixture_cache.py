@@ -0,0 +1,19 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_title_index():
+    from api.autocomplete import title_index
+
+    title_index.built_at = None
+    yield
+    title_index.built_at = None
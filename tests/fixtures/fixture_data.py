@@ -0,0 +1,29 @@
+import pytest
+
+
+@pytest.fixture
+def category():
+    from api.models import Category
+
+    return Category.objects.create(name="Фильм", slug="movie")
+
+
+@pytest.fixture
+def genres():
+    from api.models import Genre
+
+    return [
+        Genre.objects.create(name="Драма", slug="drama"),
+        Genre.objects.create(name="Комедия", slug="comedy"),
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from api.models import Title
+
+    title = Title.objects.create(
+        name="Тестовое произведение", year=2000, category=category
+    )
+    title.genre.set(genres)
+    return title
@@ -4,5 +4,21 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
-    }
+        "TEST": {"NAME": os.path.join(BASE_DIR, "test_db.sqlite3")},
+    },
+    # Отдельная база в роли реплики. Данные в нее не реплицируются,
+    # поэтому по ней видно, из какой базы читал запрос. Тесты включают
+    # ее через READ_REPLICAS.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(BASE_DIR, "replica.sqlite3"),
+        "TEST": {"NAME": os.path.join(BASE_DIR, "test_replica.sqlite3")},
+    },
 }
+
+READ_REPLICAS = []
+
+QUERY_BUDGET_RAISE = True
+
+# Тесты не пишут в журнал медленных запросов проекта.
+SLOW_QUERY_THRESHOLD = None
@@ -0,0 +1,103 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def get_token(client, user):
+    user.confirmation_code = "code"
+    user.save(update_fields=["confirmation_code"])
+
+    response = client.post(
+        "/api/v1/auth/token/",
+        data={"email": user.email, "confirmation_code": "code"},
+    )
+    assert response.status_code == 200
+    return response.json()["access"]
+
+
+def users_queries(queries):
+    return [query for query in queries if 'FROM "users"' in query["sql"]]
+
+
+@pytest.fixture
+def token_client(client, user):
+    api_client = APIClient()
+    api_client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {get_token(client, user)}"
+    )
+    return api_client
+
+
+class TestClaimsAuthentication:
+    @pytest.mark.django_db
+    def test_get_without_auth_queries(self, token_client, title):
+        token_client.get(f"/api/v1/titles/{title.id}/reviews/")
+
+        with CaptureQueriesContext(connection) as context:
+            response = token_client.get(f"/api/v1/titles/{title.id}/reviews/")
+
+        assert response.status_code == 200
+        assert users_queries(context.captured_queries) == [], (
+            "Проверьте, что пользователь берется из токена и кэша"
+        )
+
+    @pytest.mark.django_db
+    def test_stateless_mode(self, settings, token_client, title):
+        settings.JWT_USER_STATE_TIMEOUT = 0
+
+        with CaptureQueriesContext(connection) as context:
+            response = token_client.get(f"/api/v1/titles/{title.id}/")
+
+        assert response.status_code == 200
+        assert users_queries(context.captured_queries) == []
+
+    @pytest.mark.django_db
+    def test_create_review(self, token_client, user, title):
+        response = token_client.post(
+            f"/api/v1/titles/{title.id}/reviews/",
+            data={"text": "Текст", "score": 7},
+        )
+
+        assert response.status_code == 201
+        assert response.json()["author"] == user.username
+
+    @pytest.mark.django_db
+    def test_inactive_user_is_rejected(self, token_client, user, title):
+        token_client.get(f"/api/v1/titles/{title.id}/")
+
+        user.is_active = False
+        user.save()
+
+        response = token_client.post(
+            f"/api/v1/titles/{title.id}/reviews/",
+            data={"text": "Текст", "score": 7},
+        )
+        assert response.status_code == 401
+
+    @pytest.mark.django_db
+    def test_role_change_applies(self, client, user):
+        api_client = APIClient()
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {get_token(client, user)}"
+        )
+        assert api_client.get("/api/v1/users/").status_code == 403
+
+        user.role = "admin"
+        user.save()
+
+        assert api_client.get("/api/v1/users/").status_code == 200
+
+    @pytest.mark.django_db
+    def test_token_without_claims(self, user, title):
+        api_client = APIClient()
+        token = RefreshToken.for_user(user).access_token
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        response = api_client.post(
+            f"/api/v1/titles/{title.id}/reviews/",
+            data={"text": "Текст", "score": 7},
+        )
+
+        assert response.status_code == 201
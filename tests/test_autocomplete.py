@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+from api.autocomplete import TitlePrefixIndex, normalize, title_index
+from api.models import Title
+
+
+def brute_force(titles, query, limit):
+    prefix = normalize(query)
+    matches = [
+        (rating is None, -(rating or 0), normalize(name), title_id)
+        for title_id, (name, rating) in titles.items()
+        if normalize(name).startswith(prefix)
+    ]
+    return [title_id for *_, title_id in sorted(matches)[:limit]]
+
+
+class TestTitlePrefixIndex:
+    def test_lookup_orders_by_rating(self):
+        index = TitlePrefixIndex()
+        index.load(
+            [(1, "Матрица", 7), (2, "Мастер и Маргарита", 9), (3, "Мама", None)]
+        )
+
+        assert [title["id"] for title in index.lookup(" ма ")] == [2, 1, 3]
+        assert [title["id"] for title in index.lookup("МАТ")] == [1]
+        assert index.lookup("") == []
+
+    def test_incremental_updates_match_full_scan(self):
+        index = TitlePrefixIndex()
+        index.max_limit = 5
+        index.scan_limit = 0
+        rng = random.Random(0)
+        titles = {}
+        names = ["аб", "абв", "аг", "б", "ба", "ббб"]
+
+        for step in range(2000):
+            title_id = rng.randrange(40)
+            if rng.random() < 0.2:
+                titles.pop(title_id, None)
+                index.remove(title_id)
+            else:
+                name = rng.choice(names) + str(rng.randrange(3))
+                rating = rng.choice([None, *range(1, 11)])
+                titles[title_id] = (name, rating)
+                index.upsert(title_id, name, rating)
+
+            query = rng.choice(["а", "аб", "б", "ба", "в"])
+            assert [title["id"] for title in index.lookup(query, 5)] == (
+                brute_force(titles, query, 5)
+            ), f"Расхождение с полным перебором на шаге {step}"
+
+
+class TestAutocompleteEndpoint:
+    @pytest.mark.django_db
+    def test_autocomplete(self, client, category):
+        Title.objects.create(name="Звездные войны", year=1977, rating=9)
+        Title.objects.create(name="Звездный путь", year=1979, rating=7)
+        Title.objects.create(name="Зеленая миля", year=1999, rating=10)
+
+        response = client.get("/api/v1/titles/autocomplete/", {"q": "звезд"})
+
+        assert response.status_code == 200
+        assert [title["name"] for title in response.json()] == [
+            "Звездные войны",
+            "Звездный путь",
+        ], "Проверьте, что подсказки упорядочены по рейтингу"
+
+    @pytest.mark.django_db(transaction=True)
+    def test_autocomplete_follows_changes(self, client):
+        title = Title.objects.create(name="Дюна", year=1984)
+        assert client.get("/api/v1/titles/autocomplete/", {"q": "дю"}).json()
+
+        title.name = "Солярис"
+        title.save()
+        assert not client.get(
+            "/api/v1/titles/autocomplete/", {"q": "дю"}
+        ).json(), "Проверьте, что индекс обновляется при изменении названия"
+
+        title.delete()
+        assert not client.get(
+            "/api/v1/titles/autocomplete/", {"q": "сол"}
+        ).json(), "Проверьте, что удаленное произведение уходит из индекса"
+
+    @pytest.mark.django_db
+    def test_autocomplete_picks_up_rating_updates(self, client):
+        first = Title.objects.create(name="Альфа", year=2000)
+        Title.objects.create(name="Альфа 2", year=2001)
+        client.get("/api/v1/titles/autocomplete/", {"q": "аль"})
+
+        Title.change_score(first.id, added=3)
+        title_index.checked_at -= title_index.refresh_interval
+
+        response = client.get("/api/v1/titles/autocomplete/", {"q": "аль"})
+        assert response.json()[0] == {"id": first.id, "name": "Альфа", "rating": 3}
@@ -0,0 +1,119 @@
+import logging
+
+import pytest
+from django.test import override_settings
+
+from api.budgets import QueryBudgetExceeded, assert_router_budgets
+from api.models import Comment, Genre, Review
+from api.urls import router_v1
+from api.views import TitleViewSet
+
+
+@pytest.fixture
+def objects(title, user, admin):
+    review = Review.objects.create(
+        title=title, author=user, text="Отзыв", score=7
+    )
+    comment = Comment.objects.create(
+        review=review, author=user, text="Комментарий"
+    )
+    return review, comment
+
+
+class TestQueryBudgets:
+    @pytest.mark.django_db
+    def test_router_budgets(self, admin_client, title, objects):
+        review, comment = objects
+
+        assert_router_budgets(
+            admin_client,
+            router_v1,
+            kwargs={
+                "reviews": {"title_id": title.id},
+                "comments": {"title_id": title.id, "review_id": review.id},
+            },
+            lookups={
+                "users": "TestUser",
+                "titles": title.id,
+                "categories": "movie",
+                "genres": "drama",
+                "reviews": review.id,
+                "comments": comment.id,
+            },
+            payloads={
+                ("users", "create"): {
+                    "username": "budget",
+                    "email": "budget@yamdb.fake",
+                },
+                ("users", "update"): {
+                    "username": "TestUser",
+                    "email": "testuser@yamdb.fake",
+                    "bio": "Полное обновление",
+                },
+                ("users", "partial_update"): {"bio": "Биография"},
+                ("users", "me"): {"first_name": "Админ"},
+                ("titles", "create"): {
+                    "name": "Новое",
+                    "year": 2001,
+                    "category": "movie",
+                    "genre": ["drama", "comedy"],
+                },
+                ("titles", "update"): {
+                    "name": "Обновленное",
+                    "year": 2002,
+                    "category": "movie",
+                    "genre": ["comedy"],
+                },
+                ("titles", "partial_update"): {"year": 2003},
+                ("categories", "create"): {"name": "Книга", "slug": "book"},
+                ("genres", "create"): {"name": "Ужасы", "slug": "horror"},
+                ("reviews", "create"): {"text": "Мой отзыв", "score": 9},
+                ("reviews", "update"): {"text": "Новый текст", "score": 3},
+                ("reviews", "partial_update"): {"score": 5},
+                ("comments", "create"): {"text": "Еще комментарий"},
+                ("comments", "update"): {"text": "Исправлено"},
+                ("comments", "partial_update"): {"text": "Исправлено"},
+            },
+        )
+
+    @pytest.mark.django_db
+    def test_exceeded(self, client, title, monkeypatch):
+        monkeypatch.setitem(TitleViewSet.query_budgets, "retrieve", 0)
+
+        with pytest.raises(QueryBudgetExceeded) as error:
+            client.get(f"/api/v1/titles/{title.id}/")
+
+        assert "TitleViewSet.retrieve" in str(error.value)
+        assert "SELECT" in str(error.value)
+
+    @pytest.mark.django_db
+    @override_settings(QUERY_BUDGET_RAISE=False)
+    def test_exceeded_logged(self, client, title, monkeypatch, caplog):
+        monkeypatch.setitem(TitleViewSet.query_budgets, "retrieve", 0)
+
+        with caplog.at_level(logging.WARNING, logger="api.budgets"):
+            response = client.get(f"/api/v1/titles/{title.id}/")
+
+        assert response.status_code == 200
+        assert "при бюджете 0" in caplog.text
+        assert 'FROM "titles"' in caplog.text
+
+    @pytest.mark.django_db
+    def test_title_genres_checked_in_one_query(self, admin_client, category):
+        for number in range(6):
+            Genre.objects.create(name=f"Жанр {number}", slug=f"genre-{number}")
+        data = {
+            "name": "Много жанров",
+            "year": 2001,
+            "category": "movie",
+            "genre": [f"genre-{number}" for number in range(6)],
+        }
+
+        response = admin_client.post("/api/v1/titles/", data, format="json")
+        assert response.status_code == 201
+        assert len(response.json()["genre"]) == 6
+
+        data["genre"] = ["genre-1", "unknown"]
+        response = admin_client.post("/api/v1/titles/", data, format="json")
+        assert response.status_code == 400
+        assert "unknown" in str(response.json()["genre"])
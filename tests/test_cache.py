@@ -0,0 +1,66 @@
+import pytest
+
+from api.models import Review
+
+
+class TestCatalogCache:
+    @pytest.mark.django_db
+    def test_anonymous_list_is_cached(
+        self, client, title, django_assert_num_queries
+    ):
+        first = client.get("/api/v1/titles/?year=2000&name=Тест")
+        assert first["X-Cache"] == "MISS"
+
+        with django_assert_num_queries(0):
+            second = client.get("/api/v1/titles/?name=Тест&year=2000")
+
+        assert second["X-Cache"] == "HIT", (
+            "Проверьте, что ключ кэша не зависит от порядка параметров"
+        )
+        assert second.json() == first.json()
+
+    @pytest.mark.django_db
+    def test_authenticated_requests_bypass_cache(self, user_client, title):
+        user_client.get("/api/v1/titles/")
+        response = user_client.get("/api/v1/titles/")
+
+        assert "X-Cache" not in response
+
+    @pytest.mark.django_db
+    def test_write_invalidates_catalog(self, client, admin_client, genres):
+        client.get("/api/v1/genres/")
+
+        admin_client.post(
+            "/api/v1/genres/", data={"name": "Ужасы", "slug": "horror"}
+        )
+        response = client.get("/api/v1/genres/")
+
+        assert response["X-Cache"] == "MISS", (
+            "Проверьте, что запись сбрасывает кэш каталога"
+        )
+        assert response.json()["count"] == len(genres) + 1
+
+    @pytest.mark.django_db
+    def test_review_refreshes_cached_rating(self, client, user_client, title):
+        client.get(f"/api/v1/titles/{title.id}/")
+
+        user_client.post(
+            f"/api/v1/titles/{title.id}/reviews/",
+            data={"text": "-", "score": 8},
+        )
+
+        assert client.get(f"/api/v1/titles/{title.id}/").json()["rating"] == 8
+        assert Review.objects.count() == 1
+
+    @pytest.mark.django_db
+    def test_stats(self, client, admin_client, title):
+        client.get("/api/v1/categories/")
+        client.get("/api/v1/categories/")
+
+        response = admin_client.get("/api/v1/cache/stats/")
+        assert response.status_code == 200
+        assert (response.json()["hits"], response.json()["misses"]) == (1, 1)
+
+    @pytest.mark.django_db
+    def test_stats_admin_only(self, user_client):
+        assert user_client.get("/api/v1/cache/stats/").status_code == 403
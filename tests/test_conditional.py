@@ -0,0 +1,91 @@
+import pytest
+
+from api.models import Review
+
+
+class TestConditionalGet:
+    @pytest.mark.django_db
+    def test_title_etag_and_not_modified(
+        self, user_client, title, django_assert_num_queries
+    ):
+        url = f"/api/v1/titles/{title.id}/"
+        response = user_client.get(url)
+
+        assert response.has_header("ETag"), (
+            "Проверьте, что ответ с произведением содержит ETag"
+        )
+        assert response.has_header("Last-Modified")
+
+        with django_assert_num_queries(1):
+            not_modified = user_client.get(
+                url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        assert not_modified.status_code == 304, (
+            "Проверьте, что неизменившийся ресурс возвращает 304"
+        )
+        assert not_modified["ETag"] == response["ETag"]
+
+        modified = user_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        assert modified.status_code == 304
+
+    @pytest.mark.django_db
+    def test_etag_changes_with_reviews(self, user_client, title):
+        url = f"/api/v1/titles/{title.id}/reviews/"
+        etag = user_client.get(url)["ETag"]
+
+        user_client.post(url, data={"text": "-", "score": 6})
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200, (
+            "Проверьте, что новый отзыв меняет ETag списка отзывов"
+        )
+        assert response["ETag"] != etag
+
+        title_url = f"/api/v1/titles/{title.id}/"
+        title_etag = user_client.get(title_url)["ETag"]
+        review = Review.objects.get()
+        user_client.patch(f"{url}{review.id}/", data={"score": 2})
+
+        assert user_client.get(
+            title_url, HTTP_IF_NONE_MATCH=title_etag
+        ).status_code == 200, (
+            "Проверьте, что изменение оценки меняет ETag произведения"
+        )
+
+    @pytest.mark.django_db
+    def test_cached_response_keeps_validators(self, client, title):
+        url = f"/api/v1/titles/{title.id}/"
+        etag = client.get(url)["ETag"]
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304, (
+            "Проверьте, что ответ из кэша тоже учитывает If-None-Match"
+        )
+
+    @pytest.mark.django_db
+    def test_missing_title(self, client):
+        assert client.get("/api/v1/titles/0/").status_code == 404
+
+    @pytest.mark.django_db
+    def test_list_etag_changes_on_delete(
+        self, user_client, admin_client, title
+    ):
+        url = f"/api/v1/titles/{title.id}/reviews/"
+        for client, score in ((user_client, 3), (admin_client, 9)):
+            client.post(url, data={"text": "-", "score": score})
+        response = user_client.get(url)
+
+        assert not response.has_header("Last-Modified"), (
+            "Проверьте, что список не отдает Last-Modified"
+        )
+
+        admin_client.delete(f"{url}{Review.objects.earliest('id').id}/")
+
+        assert user_client.get(
+            url, HTTP_IF_NONE_MATCH=response["ETag"]
+        ).status_code == 200, (
+            "Проверьте, что удаление не последнего отзыва меняет ETag"
+        )
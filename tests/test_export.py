@@ -0,0 +1,105 @@
+import json
+
+import pytest
+from django.utils import timezone
+
+from api import export
+from api.models import Review, Title
+
+
+def read_lines(response):
+    assert response["Content-Type"] == "application/x-ndjson"
+    content = b"".join(response.streaming_content).decode("utf-8")
+    return [json.loads(line) for line in content.splitlines()]
+
+
+class TestExport:
+    @pytest.mark.django_db
+    def test_titles(self, admin_client, title):
+        Title.objects.create(name="Без категории", year=2001)
+
+        response = admin_client.get("/api/v1/export/titles.ndjson")
+
+        assert response.status_code == 200
+        rows = read_lines(response)
+        assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+        assert rows[0] == {
+            "id": title.id,
+            "name": title.name,
+            "year": 2000,
+            "description": None,
+            "rating": None,
+            "category": {"name": "Фильм", "slug": "movie"},
+            "genre": [
+                {"name": "Драма", "slug": "drama"},
+                {"name": "Комедия", "slug": "comedy"},
+            ],
+        }
+        assert rows[1]["category"] is None
+        assert rows[1]["genre"] == []
+
+    @pytest.mark.django_db
+    def test_titles_filters(self, admin_client, title):
+        Title.objects.create(name="Без категории", year=2001)
+
+        response = admin_client.get(
+            "/api/v1/export/titles.ndjson?category=movie"
+        )
+        assert [row["id"] for row in read_lines(response)] == [title.id]
+
+        since = (timezone.now() + timezone.timedelta(days=1)).isoformat()
+        response = admin_client.get(
+            "/api/v1/export/titles.ndjson", {"updated_since": since}
+        )
+        assert read_lines(response) == []
+
+        response = admin_client.get(
+            "/api/v1/export/titles.ndjson?updated_since=yesterday"
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.django_db
+    def test_reviews(self, admin_client, user, admin, title):
+        other = Title.objects.create(name="Другое", year=2001)
+        review = Review.objects.create(
+            title=title, author=user, text="Текст", score=7
+        )
+        Review.objects.create(title=other, author=admin, text="-", score=3)
+
+        response = admin_client.get(
+            "/api/v1/export/reviews.ndjson?category=movie"
+        )
+
+        rows = read_lines(response)
+        assert len(rows) == 1
+        assert rows[0]["id"] == review.id
+        assert rows[0]["author"] == user.username
+        assert rows[0]["title_id"] == title.id
+
+        response = admin_client.get("/api/v1/export/reviews.ndjson")
+        assert len(read_lines(response)) == 2
+
+    @pytest.mark.django_db
+    def test_only_admin(self, client, user_client, title):
+        for url in (
+            "/api/v1/export/titles.ndjson",
+            "/api/v1/export/reviews.ndjson",
+        ):
+            assert client.get(url).status_code == 401
+            assert user_client.get(url).status_code == 403
+
+    @pytest.mark.django_db
+    def test_queries_per_chunk(
+        self, admin_client, title, monkeypatch, django_assert_max_num_queries
+    ):
+        for year in range(2001, 2006):
+            Title.objects.create(name=f"Произведение {year}", year=year)
+        monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 2)
+
+        response = admin_client.get("/api/v1/export/titles.ndjson")
+        with django_assert_max_num_queries(6):
+            rows = read_lines(response)
+
+        assert len(rows) == 6, (
+            "Проверьте, что жанры догружаются одним запросом на пачку"
+        )
@@ -0,0 +1,107 @@
+import io
+import random
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count, Sum
+
+from api.management.commands.generate_dataset import zipf_counts
+from api.models import Category, Comment, Genre, Review, Title
+from benchmarks.endpoints import compare
+from users.models import User
+
+
+def generate(**options):
+    options = {
+        "titles": 50,
+        "categories": 3,
+        "genres": 5,
+        "users": 40,
+        "max_reviews": 30,
+        **options,
+    }
+    call_command("generate_dataset", stdout=io.StringIO(), **options)
+
+
+class TestGenerateDataset:
+    def test_zipf_counts(self):
+        counts = zipf_counts(100, 200, 1.0, random.Random(0))
+
+        assert sorted(counts, reverse=True)[:3] == [200, 100, 66]
+        assert sum(counts) < 200 * 6
+
+    @pytest.mark.django_db(transaction=True)
+    def test_generate(self):
+        generate()
+
+        assert Category.objects.count() == 3
+        assert Genre.objects.count() == 5
+        assert Title.objects.count() == 50
+        users = User.objects.filter(username__startswith="dataset_")
+        assert users.count() == 40
+
+        reviews = sorted(
+            Title.objects.annotate(total=Count("reviews")).values_list(
+                "total", flat=True
+            ),
+            reverse=True,
+        )
+        assert reviews[0] == 30
+        assert reviews[0] > 5 * reviews[len(reviews) // 2]
+        assert Review.objects.count() == sum(reviews)
+        assert Comment.objects.exists()
+
+        title = Title.objects.filter(reviews__isnull=False).first()
+        scores = title.reviews.aggregate(total=Sum("score"), count=Count("id"))
+        assert title.rating == scores["total"] // scores["count"]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_requires_clear(self):
+        generate(titles=5)
+
+        with pytest.raises(CommandError):
+            generate(titles=5)
+
+        generate(titles=7, users=10, clear=True)
+        assert Title.objects.count() == 7
+        users = User.objects.filter(username__startswith="dataset_")
+        assert users.count() == 10
+
+        last = Title.objects.order_by("-id")[0]
+        assert Title.objects.create(name="Новое", year=2020).id > last.id
+
+
+class TestBenchmarkCompare:
+    def test_compare(self):
+        baseline = {"/a": {"queries": 3, "p50": 10.0, "alloc_kb": 100.0}}
+
+        assert compare(
+            {"/a": {"queries": 3, "p50": 14.0, "alloc_kb": 120.0}},
+            baseline,
+            tolerance=0.5,
+            floor=2.0,
+        ) == []
+        regressions = compare(
+            {
+                "/a": {"queries": 4, "p50": 30.0, "alloc_kb": 100.0},
+                "/b": {"queries": 9, "p50": 1.0, "alloc_kb": 1.0},
+            },
+            baseline,
+            tolerance=0.5,
+            floor=2.0,
+        )
+        assert regressions == [
+            "/b: маршрута нет в базовой линии, обновите ее",
+            "/a: запросов 4 > 3",
+            "/a: p50 30.0 > 10.0 (+50%)",
+        ]
+
+    def test_compare_missing_route(self):
+        regressions = compare(
+            {},
+            {"/a": {"queries": 3, "p50": 10.0, "alloc_kb": 100.0}},
+            tolerance=0.5,
+            floor=2.0,
+        )
+
+        assert regressions == ["/a: маршрут из базовой линии не проверен"]
@@ -0,0 +1,218 @@
+import json
+from contextlib import contextmanager
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from api.bulk import BulkInserter
+from api.models import Comment, Genre, Review, Title
+from users.models import User
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    files = {
+        "category.csv": "id,name,slug\n1,Фильм,movie\n2,Книга,book\n",
+        "genre.ndjson": "\n".join(
+            json.dumps(genre)
+            for genre in (
+                {"id": 1, "name": "Драма", "slug": "drama"},
+                {"id": 2, "name": "Комедия", "slug": "comedy"},
+            )
+        ),
+        "titles.json": json.dumps(
+            [
+                {
+                    "id": 1,
+                    "name": "Матрица",
+                    "year": 1999,
+                    "category": "movie",
+                    "genre": ["drama", "comedy"],
+                },
+                {"id": 2, "name": "Идиот", "year": 1869, "category_id": 2},
+            ]
+        ),
+        "genre_title.csv": "title_id,genre\n2,drama\n",
+        "users.csv": (
+            "id,username,email,role,bio,first_name,last_name\n"
+            "1,neo,neo@yamdb.fake,user,,,\n"
+            "2,trinity,trinity@yamdb.fake,moderator,Био,,\n"
+        ),
+        "review.csv": (
+            "id,title_id,text,author,author_id,score,pub_date\n"
+            "1,1,Отлично,neo,,10,2021-01-24T18:42:37Z\n"
+            "2,1,Хорошо,,2,7,2021-01-25T18:42:37Z\n"
+            "3,2,Сложно,neo,,5,\n"
+        ),
+        "comments.ndjson": json.dumps(
+            {"id": 1, "review_id": 1, "text": "Согласен", "author": "trinity"}
+        ),
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_text(content, encoding="utf-8")
+
+    return {
+        name.split(".")[0].replace("_", "-"): str(tmp_path / name)
+        for name in files
+    }
+
+
+class TestImportYamdb:
+    @pytest.mark.django_db
+    def test_import_all(self, dataset, capsys):
+        call_command(
+            "import_yamdb",
+            *(f"--{option}={path}" for option, path in dataset.items()),
+            batch_size=2,
+        )
+
+        matrix = Title.objects.get(pk=1)
+        assert matrix.category.slug == "movie"
+        assert sorted(matrix.genre.values_list("slug", flat=True)) == [
+            "comedy",
+            "drama",
+        ], "Проверьте, что жанры из файла произведений загружены"
+        assert list(
+            Title.objects.get(pk=2).genre.values_list("slug", flat=True)
+        ) == ["drama"]
+        assert (matrix.score_sum, matrix.score_count, matrix.rating) == (
+            17,
+            2,
+            8,
+        ), "Проверьте, что рейтинги пересчитаны после загрузки"
+        assert User.objects.get(username="trinity").role == "moderator"
+        assert Review.objects.get(pk=1).pub_date.day == 24
+        assert Comment.objects.get().author.username == "trinity"
+        assert "строк/с" in capsys.readouterr().out
+
+    @pytest.mark.django_db
+    def test_new_rows_get_fresh_ids(self, dataset, tmp_path):
+        call_command("import_yamdb", f"--genre={dataset['genre']}")
+        path = tmp_path / "more_genres.csv"
+        path.write_text("name,slug\nУжасы,horror\n", encoding="utf-8")
+
+        call_command("import_yamdb", f"--genre={path}")
+
+        assert Genre.objects.get(slug="horror").pk == 3
+
+    @pytest.mark.django_db
+    def test_invalid_row_stops_import(self, tmp_path):
+        path = tmp_path / "titles.csv"
+        path.write_text("name,year\nБудущее,3000\n", encoding="utf-8")
+
+        with pytest.raises(CommandError, match="запись 1"):
+            call_command("import_yamdb", f"--titles={path}")
+
+        assert not Title.objects.exists()
+
+    @pytest.mark.django_db
+    def test_skip_invalid(self, dataset, tmp_path):
+        call_command("import_yamdb", f"--users={dataset['users']}")
+        path = tmp_path / "titles.csv"
+        path.write_text(
+            "id,name,year\n1,Будущее,3000\n2,Прошлое,1900\n", encoding="utf-8"
+        )
+
+        call_command("import_yamdb", f"--titles={path}", skip_invalid=True)
+
+        assert list(Title.objects.values_list("name", flat=True)) == [
+            "Прошлое"
+        ]
+
+    @pytest.mark.django_db
+    def test_digit_values_resolved_by_lookup_field(self, tmp_path):
+        categories = tmp_path / "category.csv"
+        categories.write_text(
+            "id,name,slug\n1,Фильм,movie\n2,Год,1\n", encoding="utf-8"
+        )
+        titles = tmp_path / "titles.csv"
+        titles.write_text(
+            "id,name,year,category\n1,1984,1949,1\n", encoding="utf-8"
+        )
+
+        call_command(
+            "import_yamdb", f"--category={categories}", f"--titles={titles}"
+        )
+
+        assert Title.objects.get().category.slug == "1", (
+            "Проверьте, что значение колонки со slug ищется по slug, "
+            "даже если состоит из цифр"
+        )
+
+    @pytest.mark.django_db
+    def test_id_column_requires_id(self, dataset, tmp_path):
+        call_command("import_yamdb", f"--category={dataset['category']}")
+        path = tmp_path / "titles.csv"
+        path.write_text(
+            "id,name,year,category_id\n1,Матрица,1999,movie\n",
+            encoding="utf-8",
+        )
+
+        with pytest.raises(CommandError, match="Ожидался id"):
+            call_command("import_yamdb", f"--titles={path}")
+
+    @pytest.mark.django_db
+    def test_inline_genres_require_title_id(self, dataset, tmp_path):
+        call_command("import_yamdb", f"--genre={dataset['genre']}")
+        path = tmp_path / "titles.json"
+        path.write_text(
+            json.dumps([{"name": "Матрица", "year": 1999, "genre": "drama"}]),
+            encoding="utf-8",
+        )
+
+        with pytest.raises(CommandError, match="вместе с id"):
+            call_command("import_yamdb", f"--titles={path}")
+
+        assert not Title.objects.exists()
+
+
+class FakeCopyConnection:
+    """Соединение PostgreSQL, запоминающее данные COPY."""
+
+    vendor = "postgresql"
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.ops = connection.ops
+        self.copied = []
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    def copy_expert(self, sql, file):
+        self.copied.append((sql, file.read()))
+
+
+class TestBulkInserter:
+    @pytest.mark.django_db
+    def test_copy_writes_null_unquoted(self):
+        inserter = BulkInserter(Title, with_pk=True)
+        inserter.connection = FakeCopyConnection(inserter.connection)
+
+        inserter.insert(
+            [
+                {
+                    "id": 1,
+                    "name": 'Фильм "1"',
+                    "year": 2000,
+                    "description": "",
+                    "rating": None,
+                    "category_id": None,
+                }
+            ]
+        )
+
+        (sql, data), = inserter.connection.copied
+        assert "FORMAT csv" in sql
+        values = dict(zip(inserter.columns, data.rstrip("\n").split(",")))
+        assert values["name"] == '"Фильм ""1"""'
+        assert values["year"] == '"2000"'
+        assert values["description"] == '""', (
+            "Пустая строка должна остаться строкой, а не NULL"
+        )
+        assert values["rating"] == ""
+        assert values["category"] == ""
@@ -0,0 +1,87 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+
+from users.mail import mail_queue
+from users.utils import send_message
+
+
+class FlakyBackend(EmailBackend):
+    failures = 0
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if FlakyBackend.failures:
+            FlakyBackend.failures -= 1
+            raise ConnectionError("Почтовый сервер недоступен")
+        return super().send_messages(messages)
+
+
+class TestMailQueue:
+    @pytest.mark.django_db
+    def test_confirmation_code_is_queued(self, client):
+        response = client.post(
+            "/api/v1/auth/email/", data={"email": "new@yamdb.fake"}
+        )
+
+        assert response.status_code == 200
+        assert mail_queue.join(timeout=5)
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ["new@yamdb.fake"]
+        assert mail.outbox[0].subject == "Код подтверждения"
+
+    def test_retry_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = "tests.test_mail.FlakyBackend"
+        settings.EMAIL_QUEUE_BACKOFF = 0
+        FlakyBackend.failures = 2
+
+        send_message("Тема", "Текст", "user@yamdb.fake")
+
+        assert mail_queue.join(timeout=5)
+        assert [message.to for message in mail.outbox] == [
+            ["user@yamdb.fake"]
+        ], "Проверьте, что неотправленное письмо отправляется повторно"
+
+    def test_gives_up_after_retries(self, settings, caplog):
+        settings.EMAIL_BACKEND = "tests.test_mail.FlakyBackend"
+        settings.EMAIL_QUEUE_BACKOFF = 0
+        settings.EMAIL_QUEUE_RETRIES = 1
+        FlakyBackend.failures = 2
+
+        send_message("Тема", "Текст", "user@yamdb.fake")
+
+        assert mail_queue.join(timeout=5)
+        assert mail.outbox == []
+        assert "не отправлено после 2 попыток" in caplog.text
+
+    def test_batch_uses_one_connection(self, settings):
+        settings.EMAIL_BACKEND = "tests.test_mail.FlakyBackend"
+        FlakyBackend.failures = 1
+        FlakyBackend.opened = 0
+        messages = [
+            mail.EmailMessage("Тема", "-", to=[f"{number}@yamdb.fake"])
+            for number in range(5)
+        ]
+
+        failed = mail_queue.send_batch(messages)
+
+        assert FlakyBackend.opened == 1
+        assert failed == messages[:1]
+        assert len(mail.outbox) == 4
+
+    def test_file_backend(self, settings, tmp_path):
+        settings.EMAIL_BACKEND = (
+            "django.core.mail.backends.filebased.EmailBackend"
+        )
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+
+        send_message("Тема", "Текст письма", "user@yamdb.fake")
+
+        assert mail_queue.join(timeout=5)
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1
+        assert "user@yamdb.fake" in files[0].read_text()
@@ -0,0 +1,107 @@
+import pytest
+
+from api import metrics
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    metrics.registry.clear()
+
+
+class TestRequestMetrics:
+    @pytest.mark.django_db
+    def test_server_timing_for_admin(self, admin_client, title):
+        response = admin_client.get("/api/v1/titles/")
+
+        timing = response["Server-Timing"]
+        for name in ("db", "app", "serialize", "render", "total"):
+            assert f"{name};dur=" in timing
+        assert 'desc="3 queries"' in timing
+
+    @pytest.mark.django_db
+    def test_no_server_timing_for_users(self, client, user_client, title):
+        assert "Server-Timing" not in client.get("/api/v1/titles/")
+        assert "Server-Timing" not in user_client.get("/api/v1/titles/")
+
+    @pytest.mark.django_db
+    def test_metrics_by_view_and_action(
+        self, client, user_client, admin_client, title
+    ):
+        client.get("/api/v1/titles/")
+        client.get(f"/api/v1/titles/{title.id}/")
+        user_client.post(
+            f"/api/v1/titles/{title.id}/reviews/",
+            data={"text": "-", "score": 5},
+        )
+
+        response = admin_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain")
+        text = response.content.decode()
+        assert "# TYPE yamdb_request_duration_seconds histogram" in text
+        assert (
+            'yamdb_request_duration_seconds_count{view="TitleViewSet.list",'
+            'method="GET",status="200"} 1'
+        ) in text
+        assert 'yamdb_db_queries_count{view="TitleViewSet.retrieve"} 1' in (
+            text
+        )
+        assert (
+            'yamdb_db_queries_bucket{view="TitleViewSet.list",le="4"} 1'
+        ) in text
+        assert (
+            'yamdb_request_duration_seconds_count{view="ReviewViewSet.create",'
+            'method="POST",status="201"} 1'
+        ) in text
+        assert 'yamdb_response_size_bytes_count{view="TitleViewSet.list"}' in (
+            text
+        )
+
+        assert (
+            'yamdb_response_render_duration_seconds_count'
+            '{view="TitleViewSet.list"} 1'
+        ) in text
+        for view in ("TitleViewSet.list", "TitleViewSet.retrieve"):
+            assert (
+                'yamdb_serialization_duration_seconds_count'
+                f'{{view="{view}"}} 1'
+            ) in text, "Проверьте, что время сериализации замеряется"
+
+    @pytest.mark.django_db
+    def test_metrics_access(self, settings, client, user_client, admin):
+        settings.METRICS_TOKEN = "scraper-token"
+
+        assert client.get("/metrics").status_code == 401, (
+            "Проверьте, что /metrics недоступен анонимным пользователям"
+        )
+        assert user_client.get("/metrics").status_code == 403
+        assert client.get(
+            "/metrics", HTTP_AUTHORIZATION="Bearer wrong-token"
+        ).status_code == 401
+
+        response = client.get(
+            "/metrics", HTTP_AUTHORIZATION="Bearer scraper-token"
+        )
+        assert response.status_code == 200
+        assert "yamdb_request_duration_seconds" in response.content.decode()
+
+
+class TestHistogram:
+    def test_collect(self):
+        histogram = metrics.Histogram(
+            "test_seconds", "Тест.", (0.1, 1), ("view",)
+        )
+        histogram.observe(0.05, 'a"b')
+        histogram.observe(0.5, 'a"b')
+        histogram.observe(5, 'a"b')
+
+        assert list(histogram.collect()) == [
+            "# HELP test_seconds Тест.",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{view="a\\"b",le="0.1"} 1',
+            'test_seconds_bucket{view="a\\"b",le="1"} 2',
+            'test_seconds_bucket{view="a\\"b",le="+Inf"} 3',
+            'test_seconds_sum{view="a\\"b"} 5.55',
+            'test_seconds_count{view="a\\"b"} 3',
+        ]
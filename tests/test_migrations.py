@@ -0,0 +1,60 @@
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+BEFORE = [("api", "0007_title_search_index")]
+AFTER = [("api", "0008_review_author_title_unique")]
+
+
+def migrate(targets):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate(targets)
+
+    return executor.loader.project_state(targets).apps
+
+
+class TestReviewUniqueMigration:
+    @pytest.mark.django_db(transaction=True)
+    def test_duplicate_reviews_removed(self):
+        apps = migrate(BEFORE)
+        User = apps.get_model("users", "User")
+        Category = apps.get_model("api", "Category")
+        Title = apps.get_model("api", "Title")
+        Review = apps.get_model("api", "Review")
+        Comment = apps.get_model("api", "Comment")
+
+        author = User.objects.create(username="author", email="a@yamdb.fake")
+        other = User.objects.create(username="other", email="o@yamdb.fake")
+        category = Category.objects.create(name="Фильм", slug="film")
+        title = Title.objects.create(name="-", year=2000, category=category)
+
+        earliest = Review.objects.create(
+            title=title, author=author, text="-", score=2
+        )
+        duplicate = Review.objects.create(
+            title=title, author=author, text="-", score=10
+        )
+        Review.objects.create(title=title, author=other, text="-", score=6)
+        Comment.objects.create(review=duplicate, author=other, text="-")
+        Title.objects.filter(pk=title.pk).update(
+            score_sum=18, score_count=3, rating=6
+        )
+
+        apps = migrate(AFTER)
+        Review = apps.get_model("api", "Review")
+        title = apps.get_model("api", "Title").objects.get(pk=title.pk)
+
+        assert list(
+            Review.objects.filter(author_id=author.id).values_list(
+                "id", flat=True
+            )
+        ) == [earliest.id], (
+            "Проверьте, что миграция оставляет самый ранний отзыв автора"
+        )
+        assert not apps.get_model("api", "Comment").objects.exists()
+        assert (title.score_sum, title.score_count, title.rating) == (
+            8,
+            2,
+            4,
+        ), "Проверьте, что миграция пересчитывает оценки произведения"
@@ -0,0 +1,89 @@
+import pytest
+from django.db import connection
+
+from api.models import Title
+from api.pagination import EstimatedCountPaginator
+from api.views import TitleViewSet
+
+
+@pytest.fixture
+def titles(category):
+    return [
+        Title.objects.create(
+            name=f"Произведение {number:02}", year=2000, category=category
+        )
+        for number in range(15)
+    ]
+
+
+class TestPaginationModes:
+    @pytest.mark.django_db
+    def test_nocount_mode(self, client, titles, django_assert_num_queries):
+        # Без COUNT: только страница произведений и жанры.
+        with django_assert_num_queries(2):
+            data = client.get("/api/v1/titles/?pagination=nocount").json()
+
+        assert "count" not in data, (
+            "Проверьте, что в режиме nocount количество не считается"
+        )
+        assert len(data["results"]) == 10
+        assert data["previous"] is None
+
+        data = client.get(data["next"]).json()
+        assert len(data["results"]) == 5
+        assert data["next"] is None
+        assert data["previous"].endswith("?pagination=nocount")
+
+    @pytest.mark.django_db
+    def test_nocount_page_out_of_range(self, client, titles):
+        response = client.get("/api/v1/titles/?pagination=nocount&page=3")
+        assert response.status_code == 404
+
+    @pytest.mark.django_db
+    def test_estimate_mode_falls_back_to_exact_count(self, client, titles):
+        data = client.get("/api/v1/titles/?pagination=estimate").json()
+        assert data["count"] == len(titles), (
+            "Проверьте, что на SQLite количество считается точно"
+        )
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        "plan",
+        (
+            [{"Plan": {"Plan Rows": 5000}}],
+            '[{"Plan": {"Plan Rows": 5000}}]',
+        ),
+    )
+    def test_estimate_reads_plan_rows(self, titles, monkeypatch, plan):
+        executed = []
+
+        class PlanCursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+            def execute(self, sql, params):
+                executed.append(sql)
+
+            def fetchone(self):
+                return (plan,)
+
+        monkeypatch.setattr(connection, "vendor", "postgresql")
+        monkeypatch.setattr(connection, "cursor", PlanCursor)
+
+        paginator = EstimatedCountPaginator(Title.objects.all(), 10)
+        assert paginator.count == 5000, (
+            "Проверьте, что количество берется из Plan Rows плана PostgreSQL"
+        )
+        assert executed[0].startswith("EXPLAIN (FORMAT JSON) SELECT")
+
+    @pytest.mark.django_db
+    def test_viewset_default_mode(self, client, titles, monkeypatch):
+        monkeypatch.setattr(
+            TitleViewSet, "pagination_mode", "nocount", raising=False
+        )
+
+        assert "count" not in client.get("/api/v1/titles/").json()
+        assert "count" in client.get("/api/v1/titles/?pagination=page").json()
@@ -0,0 +1,214 @@
+import threading
+import time
+
+import pytest
+from django.db import connections
+from django.db.utils import load_backend
+
+from api.db import pool
+from api.metrics import registry
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**options):
+    options = {
+        "size": 2,
+        "max_age": None,
+        "check_after": 60,
+        "timeout": 1,
+        "check": lambda connection: True,
+        **options,
+    }
+    return pool.ConnectionPool(**options)
+
+
+@pytest.fixture
+def pooled_settings(tmp_path, django_db_blocker):
+    settings_dict = {
+        **connections["default"].settings_dict,
+        "ENGINE": "api.db.sqlite3",
+        "NAME": str(tmp_path / "pooled.sqlite3"),
+        "OPTIONS": {"pool": {"size": 2}},
+    }
+    with django_db_blocker.unblock():
+        yield settings_dict
+    for key in [key for key in pool.pools if key[0] == "pooled"]:
+        pool.pools.pop(key).close_idle()
+
+
+class TestConnectionPool:
+    def test_reuses_idle_connection(self):
+        connection_pool = make_pool()
+
+        first = connection_pool.acquire(FakeConnection)
+        connection_pool.release(first)
+        second = connection_pool.acquire(FakeConnection)
+
+        assert second is first
+        assert first.rollbacks == 1
+        stats = connection_pool.snapshot()
+        assert stats["checkouts"] == 2
+        assert stats["connects"] == 1
+        assert stats["in_use"] == 1
+
+    def test_max_age(self):
+        connection_pool = make_pool(max_age=0)
+
+        first = connection_pool.acquire(FakeConnection)
+        connection_pool.release(first)
+        second = connection_pool.acquire(FakeConnection)
+
+        assert second is not first and first.closed
+        assert connection_pool.snapshot()["expired"] == 1
+
+    def test_health_check(self):
+        checked = []
+
+        def check(connection):
+            checked.append(connection)
+            return False
+
+        connection_pool = make_pool(check_after=0, check=check)
+        first = connection_pool.acquire(FakeConnection)
+        connection_pool.release(first)
+        second = connection_pool.acquire(FakeConnection)
+
+        assert checked == [first]
+        assert second is not first and first.closed
+        assert connection_pool.snapshot()["reconnects"] == 1
+
+    def test_recent_connection_is_not_checked(self):
+        def check(connection):
+            raise AssertionError("Соединение проверено без необходимости")
+
+        connection_pool = make_pool(check=check)
+        first = connection_pool.acquire(FakeConnection)
+        connection_pool.release(first)
+
+        assert connection_pool.acquire(FakeConnection) is first
+
+    def test_discarded_connection_is_closed(self):
+        connection_pool = make_pool()
+
+        first = connection_pool.acquire(FakeConnection)
+        connection_pool.release(first, discard=True)
+
+        assert first.closed
+        assert connection_pool.snapshot()["idle"] == 0
+        assert connection_pool.acquire(FakeConnection) is not first
+
+    def test_failed_connect_frees_slot(self):
+        connection_pool = make_pool(size=1)
+
+        def connect():
+            raise OSError("база недоступна")
+
+        with pytest.raises(OSError):
+            connection_pool.acquire(connect)
+
+        assert connection_pool.snapshot()["in_use"] == 0
+        assert connection_pool.acquire(FakeConnection)
+
+    def test_bounded_wait(self):
+        connection_pool = make_pool(size=1)
+        held = connection_pool.acquire(FakeConnection)
+        acquired = []
+
+        waiter = threading.Thread(
+            target=lambda: acquired.append(
+                connection_pool.acquire(FakeConnection)
+            )
+        )
+        waiter.start()
+        time.sleep(0.05)
+        assert not acquired
+        connection_pool.release(held)
+        waiter.join(timeout=1)
+
+        assert acquired == [held]
+        stats = connection_pool.snapshot()
+        assert stats["waits"] == 1 and stats["wait_seconds"] > 0
+
+    def test_timeout(self):
+        connection_pool = make_pool(size=1, timeout=0.01)
+        connection_pool.acquire(FakeConnection)
+
+        with pytest.raises(pool.PoolTimeout):
+            connection_pool.acquire(FakeConnection)
+        assert connection_pool.snapshot()["timeouts"] == 1
+
+
+class TestPooledBackend:
+    def test_connections_are_reused(self, pooled_settings):
+        backend = load_backend("api.db.sqlite3")
+        raw = []
+
+        for _ in range(3):
+            connection = backend.DatabaseWrapper(pooled_settings, "pooled")
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                assert cursor.fetchone() == (1,)
+            raw.append(connection.connection)
+            connection.close()
+            assert connection.connection is None
+
+        assert raw[0] is raw[1] is raw[2]
+        stats = pool.get_pools()["pooled"].snapshot()
+        assert stats["connects"] == 1 and stats["checkouts"] == 3
+        assert 'yamdb_db_pool_checkouts_total{alias="pooled"} 3' in (
+            registry.render()
+        )
+
+    def test_threads_share_bounded_pool(self, pooled_settings):
+        backend = load_backend("api.db.sqlite3")
+        errors = []
+
+        def work():
+            connection = backend.DatabaseWrapper(pooled_settings, "pooled")
+            try:
+                for _ in range(20):
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                    connection.close()
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        stats = pool.get_pools()["pooled"].snapshot()
+        assert stats["checkouts"] == 120
+        assert stats["connects"] <= 2
+        assert stats["in_use"] == 0
+
+    def test_postgresql_params(self):
+        backend = load_backend("api.db.postgresql")
+        connection = backend.DatabaseWrapper(
+            {
+                **connections["default"].settings_dict,
+                "ENGINE": "api.db.postgresql",
+                "NAME": "yamdb",
+                "OPTIONS": {"pool": {"size": 5}, "connect_timeout": 3},
+            },
+            "pooled_postgresql",
+        )
+
+        params = connection.get_connection_params()
+
+        assert "pool" not in params
+        assert params["connect_timeout"] == 3
@@ -0,0 +1,77 @@
+import pstats
+
+import pytest
+
+from api.profiler import ProfileStore
+
+
+@pytest.fixture(autouse=True)
+def profiler_dir(settings, tmp_path):
+    settings.PROFILER_DIR = str(tmp_path)
+    settings.PROFILER_RING_SIZE = 3
+    return tmp_path
+
+
+class TestProfiler:
+    @pytest.mark.django_db
+    def test_admin_request_is_profiled(self, admin_client, title, tmp_path):
+        response = admin_client.get(
+            "/api/v1/titles/", HTTP_X_PROFILE="1"
+        )
+
+        assert response.status_code == 200
+        profile_id = response["X-Profile-Id"]
+
+        listing = admin_client.get("/api/v1/profiles/").json()
+        assert listing[0]["id"] == profile_id
+        assert listing[0]["view"] == "TitleViewSet.list"
+        assert listing[0]["queries"] == 3
+
+        summary = admin_client.get(f"/api/v1/profiles/{profile_id}/")
+        text = summary.content.decode()
+        assert "GET /api/v1/titles/" in text
+        assert 'FROM "titles"' in text
+        assert "plan:" in text, "Проверьте, что для SELECT снят EXPLAIN"
+        assert "cumulative" in text
+
+        stats = admin_client.get(f"/api/v1/profiles/{profile_id}/pstats")
+        path = tmp_path / "downloaded.pstats"
+        path.write_bytes(b"".join(stats.streaming_content))
+        assert pstats.Stats(str(path)).total_calls > 0
+
+    @pytest.mark.django_db
+    def test_query_flag(self, admin_client, title):
+        response = admin_client.get(f"/api/v1/titles/{title.id}/?profile=1")
+
+        assert "X-Profile-Id" in response
+
+    @pytest.mark.django_db
+    def test_only_admin_role(self, client, user_client, admin, title):
+        assert "X-Profile-Id" not in client.get(
+            "/api/v1/titles/", HTTP_X_PROFILE="1"
+        )
+        assert "X-Profile-Id" not in user_client.get(
+            "/api/v1/titles/", HTTP_X_PROFILE="1"
+        )
+        assert user_client.get("/api/v1/profiles/").status_code == 403
+
+    @pytest.mark.django_db
+    def test_ring_buffer(self, admin_client, title, profiler_dir):
+        ids = [
+            admin_client.get(
+                "/api/v1/titles/", HTTP_X_PROFILE="1"
+            )["X-Profile-Id"]
+            for _ in range(5)
+        ]
+
+        listing = admin_client.get("/api/v1/profiles/").json()
+        assert [profile["id"] for profile in listing] == ids[:1:-1]
+        assert len(list(profiler_dir.iterdir())) == 9
+        response = admin_client.get(f"/api/v1/profiles/{ids[0]}/")
+        assert response.status_code == 404
+
+    def test_invalid_id(self, tmp_path):
+        store = ProfileStore(str(tmp_path), 3)
+
+        with pytest.raises(FileNotFoundError):
+            store.path("../settings", "txt")
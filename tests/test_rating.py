@@ -0,0 +1,138 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+from django.http import Http404
+from rest_framework.test import APIClient
+
+from api.models import Review, Title
+from api.serializers import ReviewSerializer
+from api.views import ReviewViewSet
+
+
+def reviews_url(title, review=None):
+    url = f"/api/v1/titles/{title.id}/reviews/"
+    return f"{url}{review.id}/" if review else url
+
+
+class TestTitleRating:
+    @pytest.mark.django_db
+    def test_rating_follows_create_update_destroy(self, title, user_client):
+        response = user_client.post(
+            reviews_url(title), data={"text": "Отзыв", "score": 7}
+        )
+        assert response.status_code == 201, (
+            "Проверьте, что при POST запросе на создание отзыва "
+            "возвращается статус 201"
+        )
+        review = Review.objects.get(pk=response.json()["id"])
+
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (
+            7,
+            1,
+            7,
+        ), "Проверьте, что рейтинг пересчитывается при создании отзыва"
+
+        user_client.patch(reviews_url(title, review), data={"score": 4})
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (
+            4,
+            1,
+            4,
+        ), "Проверьте, что рейтинг пересчитывается при изменении оценки"
+
+        user_client.delete(reviews_url(title, review))
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count, title.rating) == (
+            0,
+            0,
+            None,
+        ), "Проверьте, что рейтинг пересчитывается при удалении отзыва"
+
+    @pytest.mark.django_db
+    def test_rating_matches_average(self, title, django_user_model):
+        scores = [10, 9, 3, 5]
+        for number, score in enumerate(scores):
+            author = django_user_model.objects.create(
+                username=f"author{number}", email=f"author{number}@yamdb.fake"
+            )
+            client = APIClient()
+            client.force_authenticate(user=author)
+            client.post(reviews_url(title), data={"text": "-", "score": score})
+
+        title.refresh_from_db()
+        assert title.rating == int(sum(scores) / len(scores)), (
+            "Проверьте, что рейтинг равен средней оценке отзывов"
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_parallel_reviews_do_not_lose_updates(
+        self, title, django_user_model
+    ):
+        scores = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10] * 2
+        authors = [
+            django_user_model.objects.create(
+                username=f"author{number}", email=f"author{number}@yamdb.fake"
+            )
+            for number in range(len(scores))
+        ]
+
+        def post_review(author, score):
+            client = APIClient()
+            client.force_authenticate(user=author)
+            try:
+                return client.post(
+                    reviews_url(title), data={"text": "-", "score": score}
+                ).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            statuses = list(executor.map(post_review, authors, scores))
+
+        assert statuses == [201] * len(scores), (
+            "Проверьте, что параллельные отзывы создаются без ошибок"
+        )
+
+        title = Title.objects.get(pk=title.pk)
+        assert title.score_count == Review.objects.filter(title=title).count()
+        assert title.score_sum == sum(scores), (
+            "Проверьте, что при параллельной записи отзывов "
+            "не теряются оценки"
+        )
+        assert title.rating == sum(scores) // len(scores)
+
+    @pytest.mark.django_db
+    def test_stale_delete_does_not_subtract_twice(self, title, user_client):
+        response = user_client.post(
+            reviews_url(title), data={"text": "Отзыв", "score": 7}
+        )
+        stale = Review.objects.get(pk=response.json()["id"])
+
+        user_client.delete(reviews_url(title, stale))
+        with pytest.raises(Http404):
+            ReviewViewSet().perform_destroy(stale)
+
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count) == (0, 0), (
+            "Проверьте, что повторное удаление отзыва "
+            "не вычитает оценку второй раз"
+        )
+
+    @pytest.mark.django_db
+    def test_update_of_deleted_review_returns_404(self, title, user_client):
+        response = user_client.post(
+            reviews_url(title), data={"text": "Отзыв", "score": 7}
+        )
+        stale = Review.objects.get(pk=response.json()["id"])
+        serializer = ReviewSerializer(stale, data={"score": 3}, partial=True)
+        serializer.is_valid(raise_exception=True)
+
+        user_client.delete(reviews_url(title, stale))
+        with pytest.raises(Http404):
+            ReviewViewSet().perform_update(serializer)
+
+        assert not Review.objects.filter(pk=stale.pk).exists(), (
+            "Проверьте, что изменение удаленного отзыва не создает его заново"
+        )
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone
+
+import pytest
+from django.utils.timezone import override
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Comment, Review, Title
+from api.readers import ValuesReader
+from api.serializers import (
+    CommentSerializer,
+    ReviewSerializer,
+    TitleReadSerializer,
+)
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+def assert_same_output(serializer_class, queryset):
+    reader = ValuesReader(serializer_class)
+
+    expected = render(serializer_class(queryset, many=True).data)
+    actual = render(reader.represent(reader.values(queryset)))
+
+    assert actual == expected
+
+
+@pytest.fixture
+def reviews(user, admin, title):
+    other = Title.objects.create(name="Без категории", year=1999)
+    reviews = [
+        Review.objects.create(title=title, author=user, text="Текст", score=7),
+        Review.objects.create(title=title, author=admin, text="-", score=3),
+        Review.objects.create(title=other, author=user, text="-", score=10),
+    ]
+    Review.objects.filter(id=reviews[0].id).update(
+        pub_date=datetime(2020, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc)
+    )
+    Comment.objects.create(review=reviews[0], author=admin, text="Ответ")
+    Comment.objects.create(review=reviews[0], author=user, text="Еще")
+    return reviews
+
+
+class TestValuesReader:
+    @pytest.mark.django_db
+    def test_titles(self, title, reviews):
+        Title.objects.create(
+            name="С описанием", year=2010, description="Описание"
+        )
+        queryset = Title.objects.select_related("category").prefetch_related(
+            "genre"
+        )
+
+        assert_same_output(TitleReadSerializer, queryset)
+        assert_same_output(TitleReadSerializer, queryset.filter(year=2000))
+
+    @pytest.mark.django_db
+    def test_reviews_and_comments(self, reviews):
+        assert_same_output(
+            ReviewSerializer, Review.objects.select_related("author")
+        )
+        assert_same_output(CommentSerializer, Comment.objects.all())
+
+        with override("Europe/Moscow"):
+            assert_same_output(ReviewSerializer, Review.objects.all())
+
+    @pytest.mark.django_db
+    def test_list_endpoints(self, client, title, reviews):
+        for url in (
+            "/api/v1/titles/",
+            "/api/v1/titles/?search=Тестовое",
+            f"/api/v1/titles/{title.id}/reviews/",
+            f"/api/v1/titles/{title.id}/reviews/?pagination=cursor",
+            f"/api/v1/titles/{title.id}/reviews/{reviews[0].id}/comments/",
+        ):
+            response = client.get(url)
+            assert response.status_code == 200, url
+            assert response.json()["results"], url
+
+    @pytest.mark.django_db
+    def test_cursor_pages(self, client, title, reviews):
+        url = f"/api/v1/titles/{title.id}/reviews/?pagination=cursor"
+        first = client.get(url).json()
+
+        assert [review["id"] for review in first["results"]] == [
+            reviews[1].id,
+            reviews[0].id,
+        ]
+        assert first["next"] is None
+
+    @pytest.mark.django_db
+    def test_cursor_next_page(self, client, django_user_model, title):
+        for number in range(12):
+            author = django_user_model.objects.create(
+                username=f"reader{number}", email=f"reader{number}@yamdb.fake"
+            )
+            Review.objects.create(
+                title=title, author=author, text="-", score=5
+            )
+
+        url = f"/api/v1/titles/{title.id}/reviews/?pagination=cursor"
+        first = client.get(url).json()
+        second = client.get(first["next"]).json()
+
+        ids = [review["id"] for review in first["results"] + second["results"]]
+        assert sorted(ids) == sorted(
+            Review.objects.values_list("id", flat=True)
+        )
+        assert second["previous"]
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from benchmarks import replay
+
+
+@pytest.fixture
+def calls_file(tmp_path, title):
+    path = tmp_path / "calls.jsonl"
+    lines = [
+        {"request_id": "user-001", "title": "не запрос к API"},
+        {"path": f"/api/v1/titles/{title.id}/"},
+        {"method": "get", "path": "/api/v1/titles/?search=Тестовое"},
+        {"path": "/api/v1/titles/999999/"},
+        {"path": "/api/v1/users/me/", "auth": True},
+    ]
+    path.write_text(
+        "\n".join(json.dumps(line, ensure_ascii=False) for line in lines),
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+class TestReplay:
+    def test_load_calls(self, tmp_path):
+        path = tmp_path / "calls.jsonl"
+        path.write_text(
+            '{"path": "/api/v1/titles/?search=ночь"}\n\n'
+            '{"method": "post", "path": "/api/v1/titles/7/reviews/", '
+            '"body": {"score": 5}, "auth": true}\n',
+            encoding="utf-8",
+        )
+
+        calls = replay.load_calls(str(path))
+
+        assert calls[0]["path"] == (
+            "/api/v1/titles/?search=%D0%BD%D0%BE%D1%87%D1%8C"
+        )
+        assert replay.get_route(calls[0]) == "GET /api/v1/titles/"
+        route = replay.get_route(calls[1])
+        assert route == "POST /api/v1/titles/{id}/reviews/"
+        assert calls[1]["body"] == {"score": 5} and calls[1]["auth"]
+
+    def test_arrivals(self):
+        arrivals = replay.iter_arrivals(100, False, None)
+        assert [next(arrivals) for _ in range(3)] == [0.0, 0.01, 0.02]
+
+    @pytest.mark.django_db
+    def test_confirmation_code_user_created_on_request(
+        self, django_user_model
+    ):
+        with pytest.raises(LookupError):
+            replay.local_confirmation_code("replay@yamdb.fake")
+        assert not django_user_model.objects.exists(), (
+            "Проверьте, что без create пользователь не создается"
+        )
+
+        replay.local_confirmation_code("replay@yamdb.fake", create=True)
+        assert django_user_model.objects.get().role == "user"
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize(
+        "mode, rate", [("threads", None), ("asyncio", None), ("threads", 200)]
+    )
+    def test_replay(self, live_server, calls_file, user, mode, rate):
+        code = replay.local_confirmation_code(user.email, "user")
+        token = replay.get_token(live_server.url, user.email, code)
+        calls = replay.load_calls(calls_file)
+
+        report = replay.replay(
+            live_server.url,
+            calls,
+            mode=mode,
+            concurrency=4,
+            rate=rate,
+            total=20,
+            token=token,
+        )
+
+        assert sum(stats["requests"] for stats in report.values()) == 20
+        detail = report["GET /api/v1/titles/{id}/"]
+        assert detail["requests"] == 10
+        assert detail["statuses"] == {"200": 5, "404": 5}
+        assert detail["error_rate"] == 0.5
+        assert report["GET /api/v1/titles/"]["statuses"] == {"200": 5}
+        assert report["GET /api/v1/users/me/"]["statuses"] == {"200": 5}
+        assert detail["p50"] <= detail["p95"] <= detail["p99"]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_invalid_code(self, live_server, user):
+        with pytest.raises(RuntimeError):
+            replay.get_token(live_server.url, user.email, "неверный")
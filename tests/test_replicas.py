@@ -0,0 +1,124 @@
+import pytest
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.db import transaction
+
+from api import replicas
+from api.models import Category, Genre, Review, Title
+from users.models import User
+
+databases = pytest.mark.django_db(
+    transaction=True, databases=["default", "replica"]
+)
+
+
+def replicate(*models):
+    """Копируем текущие строки основной базы в реплику."""
+
+    for model in models:
+        for obj in model.objects.using("default").all():
+            obj.save(using="replica")
+
+
+@pytest.fixture
+def replica(settings, title, user, admin):
+    settings.READ_REPLICAS = ["replica"]
+    replicate(User, Category, Genre, Title, Title.genre.through)
+    return title
+
+
+def review_texts(client, title):
+    response = client.get(f"/api/v1/titles/{title.id}/reviews/")
+    assert response.status_code == 200
+    return [review["text"] for review in response.json()["results"]]
+
+
+class TestReplicaRouting:
+    @databases
+    def test_reads_go_to_replica(self, client, replica):
+        Review.objects.create(
+            title=replica,
+            author=User.objects.get(username="TestUser"),
+            text="Только в основной базе",
+            score=5,
+        )
+
+        assert review_texts(client, replica) == []
+        response = client.get(f"/api/v1/titles/{replica.id}/")
+        assert response.status_code == 200
+
+    @databases
+    def test_read_your_writes(self, client, user_client, replica):
+        response = user_client.post(
+            f"/api/v1/titles/{replica.id}/reviews/",
+            data={"text": "Мой отзыв", "score": 8},
+        )
+        assert response.status_code == 201
+        assert Review.objects.using("replica").count() == 0
+        assert Review.objects.using("default").count() == 1
+
+        assert review_texts(user_client, replica) == ["Мой отзыв"], (
+            "Проверьте, что после записи пользователь читает основную базу"
+        )
+        assert review_texts(client, replica) == []
+
+        cache.delete(replicas.pin_key(response.wsgi_request.user.pk))
+        assert review_texts(user_client, replica) == []
+
+    @databases
+    def test_failed_write_does_not_pin(self, user_client, user, replica):
+        response = user_client.post(
+            f"/api/v1/titles/{replica.id}/reviews/", data={"score": 100}
+        )
+
+        assert response.status_code == 400
+        assert not replicas.is_pinned(user)
+
+    @databases
+    def test_streaming_reads_replica(self, client, replica):
+        Title.objects.create(name="Новое произведение", year=2020)
+
+        response = client.get("/api/v1/titles/?pagination=stream")
+        content = b"".join(response.streaming_content).decode("utf-8")
+
+        assert replica.name in content
+        assert "Новое произведение" not in content
+        assert replicas.read_alias.get() is None
+
+    @databases
+    def test_writes_and_transactions_use_primary(self, replica):
+        router = replicas.ReplicaRouter()
+        token = replicas.read_alias.set("replica")
+        try:
+            assert router.db_for_read(Title) == "replica"
+            assert router.db_for_write(Title) == "default"
+            with transaction.atomic():
+                assert router.db_for_read(Title) is None
+        finally:
+            replicas.read_alias.reset(token)
+
+        assert router.db_for_read(Title) is None
+
+    @databases
+    def test_cached_catalog_reads_primary(self, client, user_client, replica):
+        Title.objects.create(name="Новое произведение", year=2020)
+
+        response = client.get("/api/v1/titles/")
+        assert response["X-Cache"] == "MISS"
+        names = [title["name"] for title in response.json()["results"]]
+        assert "Новое произведение" in names, (
+            "Проверьте, что ответы для кэша каталога читают основную базу"
+        )
+
+        response = user_client.get("/api/v1/titles/")
+        names = [title["name"] for title in response.json()["results"]]
+        assert "Новое произведение" not in names
+
+    def test_cache_table_uses_primary(self):
+        router = replicas.ReplicaRouter()
+        model = DatabaseCache("yamdb_cache", {}).cache_model_class
+        token = replicas.read_alias.set("replica")
+        try:
+            assert router.db_for_read(model) is None
+        finally:
+            replicas.read_alias.reset(token)
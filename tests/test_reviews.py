@@ -0,0 +1,209 @@
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Comment, Review
+from api.serializers import ReviewSerializer
+
+
+@pytest.fixture
+def authors(django_user_model):
+    return [
+        django_user_model.objects.create(
+            username=f"author{number}", email=f"author{number}@yamdb.fake"
+        )
+        for number in range(10)
+    ]
+
+
+class TestReviewQueries:
+    @pytest.mark.django_db
+    def test_reviews_list_query_count(
+        self, client, title, authors, django_assert_num_queries
+    ):
+        for author in authors:
+            Review.objects.create(title=title, author=author, text="-", score=5)
+
+        # Произведение, COUNT, страница отзывов вместе с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(f"/api/v1/titles/{title.id}/reviews/")
+
+        assert {review["author"] for review in response.json()["results"]} == {
+            author.username for author in authors
+        }, "Проверьте, что автор отзыва выводится по username"
+
+    @pytest.mark.django_db
+    def test_comments_list_query_count(
+        self, client, title, authors, django_assert_num_queries
+    ):
+        review = Review.objects.create(
+            title=title, author=authors[0], text="-", score=5
+        )
+        for author in authors:
+            Comment.objects.create(review=review, author=author, text="-")
+
+        # Отзыв, COUNT, страница комментариев вместе с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(
+                f"/api/v1/titles/{title.id}/reviews/{review.id}/comments/"
+            )
+
+        assert len(response.json()["results"]) == len(authors)
+
+    @pytest.mark.django_db
+    def test_foreign_review_update_forbidden(self, user_client, title, authors):
+        review = Review.objects.create(
+            title=title, author=authors[0], text="-", score=5
+        )
+
+        response = user_client.patch(
+            f"/api/v1/titles/{title.id}/reviews/{review.id}/",
+            data={"text": "Чужой отзыв"},
+        )
+        assert response.status_code == 403, (
+            "Проверьте, что пользователь не может изменить чужой отзыв"
+        )
+
+
+class TestReviewCursorPagination:
+    @pytest.mark.django_db
+    def test_cursor_query_count(
+        self, client, title, user, django_assert_num_queries
+    ):
+        Review.objects.create(title=title, author=user, text="-", score=5)
+        url = f"/api/v1/titles/{title.id}/reviews/?pagination=cursor"
+
+        # Без COUNT: произведение и страница отзывов вместе с авторами.
+        with django_assert_num_queries(2):
+            response = client.get(url)
+
+        with django_assert_num_queries(2):
+            not_modified = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert not_modified.status_code == 304
+
+    @pytest.mark.django_db
+    def test_cursor_walks_all_reviews(self, client, title, django_user_model):
+        authors = [
+            django_user_model.objects.create(
+                username=f"author{number}", email=f"author{number}@yamdb.fake"
+            )
+            for number in range(25)
+        ]
+        reviews = [
+            Review.objects.create(title=title, author=author, text="-")
+            for author in authors
+        ]
+        # Одинаковая дата у части отзывов проверяет сортировку по id.
+        Review.objects.filter(id__in=[r.id for r in reviews[5:15]]).update(
+            pub_date=reviews[5].pub_date
+        )
+        expected = list(
+            Review.objects.order_by("-pub_date", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+        url = f"/api/v1/titles/{title.id}/reviews/?pagination=cursor"
+        pages = []
+        while url:
+            data = client.get(url).json()
+            assert "count" not in data
+            pages.append([review["id"] for review in data["results"]])
+            url = data["next"]
+
+        assert [pk for page in pages for pk in page] == expected, (
+            "Проверьте, что курсорная пагинация выдает все отзывы по порядку"
+        )
+        assert [len(page) for page in pages] == [10, 10, 5]
+
+        previous = client.get(data["previous"]).json()
+        assert [review["id"] for review in previous["results"]] == pages[1], (
+            "Проверьте, что ссылка previous возвращает предыдущую страницу"
+        )
+
+    @pytest.mark.django_db
+    def test_invalid_cursor(self, client, title):
+        response = client.get(
+            f"/api/v1/titles/{title.id}/reviews/?pagination=cursor&cursor=x"
+        )
+        assert response.status_code == 404
+
+
+class TestReviewUniqueness:
+    @pytest.mark.django_db
+    def test_second_review_rejected(self, user_client, title):
+        url = f"/api/v1/titles/{title.id}/reviews/"
+        response = user_client.post(url, data={"text": "-", "score": 5})
+        assert response.status_code == 201
+
+        response = user_client.post(url, data={"text": "-", "score": 1})
+
+        assert response.status_code == 400, (
+            "Проверьте, что второй отзыв на произведение не создается"
+        )
+        assert response.json() == {
+            "non_field_errors": ["Вы уже оставили отзыв"]
+        }
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count) == (5, 1)
+
+    @pytest.mark.django_db
+    def test_create_has_no_existence_check(self, user_client, title):
+        url = f"/api/v1/titles/{title.id}/reviews/"
+
+        with CaptureQueriesContext(connection) as captured:
+            user_client.post(url, data={"text": "-", "score": 5})
+
+        statements = [
+            query["sql"].split()[0]
+            for query in captured.captured_queries
+            if "SAVEPOINT" not in query["sql"]
+        ]
+        assert statements == ["SELECT", "INSERT", "UPDATE"], (
+            "Проверьте, что перед созданием отзыва нет запроса exists()"
+        )
+
+    @pytest.mark.django_db
+    def test_other_integrity_errors_propagate(self, user, title):
+        serializer = ReviewSerializer(data={"text": "-", "score": 5})
+        assert serializer.is_valid()
+
+        with pytest.raises(IntegrityError):
+            serializer.save(author=user, title_id=None)
+        assert not Review.objects.exists()
+
+
+class TestParentLookups:
+    def parent_lookups(self, captured, table):
+        return [
+            query
+            for query in captured.captured_queries
+            if query["sql"].startswith(f'SELECT "{table}"."id"')
+            and f'FROM "{table}" WHERE' in query["sql"]
+        ]
+
+    @pytest.mark.django_db
+    def test_review_create_loads_title_once(self, user_client, title):
+        with CaptureQueriesContext(connection) as captured:
+            user_client.post(
+                f"/api/v1/titles/{title.id}/reviews/",
+                data={"text": "-", "score": 5},
+            )
+
+        assert len(self.parent_lookups(captured, "titles")) == 1, (
+            "Проверьте, что произведение загружается один раз за запрос"
+        )
+
+    @pytest.mark.django_db
+    def test_comment_requests_load_review_once(self, user_client, title, user):
+        review = Review.objects.create(title=title, author=user, text="-")
+        url = f"/api/v1/titles/{title.id}/reviews/{review.id}/comments/"
+
+        with CaptureQueriesContext(connection) as captured:
+            comment = user_client.post(url, data={"text": "-"}).json()
+            user_client.patch(f"{url}{comment['id']}/", data={"text": "+"})
+            user_client.get(url)
+
+        assert len(self.parent_lookups(captured, "review")) == 3, (
+            "Проверьте, что отзыв загружается один раз за запрос"
+        )
@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.filters import TitleSearchFilter
+from api.models import Title
+
+
+@pytest.fixture
+def catalog(category):
+    return {
+        "matrix": Title.objects.create(
+            name="Матрица",
+            year=1999,
+            category=category,
+            description="Хакер узнает правду о реальности",
+        ),
+        "hackers": Title.objects.create(
+            name="Хакеры", year=1995, description="Хакер хакер хакер"
+        ),
+        "other": Title.objects.create(
+            name="Титаник", year=1997, description="Корабль и айсберг"
+        ),
+    }
+
+
+def search(client, query):
+    response = client.get("/api/v1/titles/", {"search": query})
+    assert response.status_code == 200
+    return [title["name"] for title in response.json()["results"]]
+
+
+class TestTitleSearch:
+    @pytest.mark.django_db
+    def test_search_is_case_insensitive_and_uses_description(
+        self, client, catalog
+    ):
+        assert search(client, "ПРАВДУ") == ["Матрица"], (
+            "Проверьте, что поиск не зависит от регистра и ищет по описанию"
+        )
+
+    @pytest.mark.django_db
+    def test_search_ranks_results(self, client, catalog):
+        assert search(client, "хакер") == ["Хакеры", "Матрица"], (
+            "Проверьте, что результаты поиска упорядочены по релевантности"
+        )
+
+    @pytest.mark.django_db
+    def test_search_requires_all_terms(self, client, catalog):
+        assert search(client, "хакер айсберг") == []
+
+    @pytest.mark.django_db
+    def test_search_follows_updates(self, client, catalog):
+        catalog["other"].name = "Хакер на корабле"
+        catalog["other"].save()
+        catalog["matrix"].delete()
+
+        assert sorted(search(client, "хакер")) == [
+            "Хакер на корабле",
+            "Хакеры",
+        ]
+
+    @pytest.mark.django_db
+    def test_search_combines_with_filters(self, client, catalog):
+        response = client.get(
+            "/api/v1/titles/", {"search": "хакер", "category": "movie"}
+        )
+        assert [title["name"] for title in response.json()["results"]] == [
+            "Матрица"
+        ]
+
+    @pytest.mark.django_db
+    def test_search_escapes_syntax(self, client, catalog):
+        assert search(client, 'NEAR( "хакер* OR') == []
+
+    @pytest.mark.django_db
+    def test_search_falls_back_to_icontains(self, catalog, monkeypatch):
+        monkeypatch.setattr(connection, "vendor", "mysql")
+        request = APIRequestFactory().get("/", {"search": "айсберг Корабль"})
+
+        queryset = TitleSearchFilter().filter_queryset(
+            Request(request), Title.objects.all(), None
+        )
+
+        assert [title.name for title in queryset] == ["Титаник"], (
+            "Проверьте, что на других СУБД поиск работает через icontains"
+        )
@@ -0,0 +1,83 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    settings.SLOW_QUERY_THRESHOLD = 0
+    settings.SLOW_QUERY_EXPLAIN = True
+    settings.SLOW_QUERY_LOG = str(tmp_path / "slow.jsonl")
+    return tmp_path / "slow.jsonl"
+
+
+def read_log(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestSlowQueryLog:
+    @pytest.mark.django_db
+    def test_queries_over_threshold_are_logged(self, client, title, slow_log):
+        client.get("/api/v1/titles/?name=Тест")
+
+        entries = read_log(slow_log)
+        titles = [
+            entry for entry in entries if 'FROM "titles"' in entry["sql"]
+        ]
+        assert titles, "Проверьте, что медленные запросы пишутся в журнал"
+
+        entry = titles[-1]
+        assert "%Тест%" in entry["params"]
+        assert entry["call_site"][0].startswith("api/")
+        assert entry["plan"], "Проверьте, что для запроса снят EXPLAIN"
+        assert not any(
+            entry["sql"].startswith("EXPLAIN") for entry in entries
+        )
+
+    @pytest.mark.django_db
+    def test_explain_is_opt_in(self, settings, client, title, slow_log):
+        settings.SLOW_QUERY_EXPLAIN = False
+
+        client.get("/api/v1/titles/")
+
+        entries = read_log(slow_log)
+        assert entries
+        assert all(entry["plan"] is None for entry in entries), (
+            "Проверьте, что EXPLAIN снимается только по SLOW_QUERY_EXPLAIN"
+        )
+
+    @pytest.mark.django_db
+    def test_disabled(self, settings, client, title, slow_log):
+        settings.SLOW_QUERY_THRESHOLD = None
+
+        client.get("/api/v1/titles/")
+
+        assert not slow_log.exists()
+
+
+class TestSlowQueriesCommand:
+    def test_report(self, tmp_path):
+        path = tmp_path / "slow.jsonl"
+        entries = [
+            {"sql": "SELECT a", "duration": 0.3, "call_site": ["api/a.py:1"]},
+            {"sql": "SELECT b", "duration": 0.5, "call_site": ["api/b.py:2"]},
+            {"sql": "SELECT a", "duration": 0.4, "call_site": ["api/c.py:3"]},
+        ]
+        path.write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+        out = StringIO()
+
+        call_command("slow_queries", log=str(path), stdout=out)
+
+        report = out.getvalue()
+        assert report.index("SELECT a") < report.index("SELECT b")
+        assert "total 700.0 ms, count 2" in report
+        assert "at api/a.py:1" in report and "at api/c.py:3" in report
+
+        out = StringIO()
+        call_command(
+            "slow_queries", log=str(path), order_by="max", limit=1, stdout=out
+        )
+        assert "SELECT b" in out.getvalue()
+        assert "SELECT a" not in out.getvalue()
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Title
+from api.renderers import StreamingJSONRenderer
+
+
+def read_stream(response):
+    assert response.streaming
+    return json.loads(b"".join(response.streaming_content))
+
+
+@pytest.fixture
+def titles(title, genres):
+    titles = [title]
+    for number in range(7):
+        titles.append(
+            Title.objects.create(name=f"Произведение {number}", year=2001)
+        )
+        titles[-1].genre.set(genres[: number % 3])
+    return titles
+
+
+class TestStreamingList:
+    @pytest.mark.django_db
+    def test_same_results_as_page(self, client, titles):
+        page = client.get("/api/v1/titles/").json()
+        stream = read_stream(
+            client.get("/api/v1/titles/?pagination=stream&page_size=10")
+        )
+
+        assert stream["count"] == page["count"] == len(titles)
+        assert stream["results"] == page["results"]
+        assert stream["next"] is None and stream["previous"] is None
+
+    @pytest.mark.django_db
+    def test_pages(self, client, titles):
+        url = "/api/v1/titles/?pagination=stream&page_size=3"
+        first = read_stream(client.get(url))
+        last = read_stream(client.get(url + "&page=3"))
+
+        assert len(first["results"]) == 3
+        assert "page=2" in first["next"]
+        assert len(last["results"]) == 2
+        assert last["next"] is None
+        assert client.get(url + "&page=9").status_code == 404
+
+    @pytest.mark.django_db
+    def test_results_are_read_by_chunks(self, client, settings, titles):
+        settings.STREAMING_CHUNK_SIZE = 2
+
+        response = client.get("/api/v1/titles/?pagination=stream&page_size=8")
+        with CaptureQueriesContext(connection) as context:
+            data = read_stream(response)
+
+        assert len(data["results"]) == 8
+        genre_queries = [
+            query
+            for query in context.captured_queries
+            if 'FROM "genre_title"' in query["sql"]
+        ]
+        assert len(genre_queries) == 4, (
+            "Проверьте, что жанры догружаются одним запросом на пачку"
+        )
+
+    @pytest.mark.django_db
+    def test_users_for_admin(self, admin_client, settings, user, admin):
+        settings.STREAMING_CHUNK_SIZE = 1
+
+        data = read_stream(
+            admin_client.get("/api/v1/users/?pagination=stream&page_size=50")
+        )
+
+        assert data["count"] == 2
+        assert {row["username"] for row in data["results"]} == {
+            user.username,
+            admin.username,
+        }
+
+    @pytest.mark.django_db
+    def test_reviews(self, client, user, title):
+        title.reviews.create(author=user, text="Текст", score=5)
+
+        response = client.get(
+            f"/api/v1/titles/{title.id}/reviews/?pagination=stream"
+        )
+
+        assert read_stream(response)["results"][0]["text"] == "Текст"
+
+
+class TestStreamingJSONRenderer:
+    def test_matches_json_renderer(self):
+        data = {
+            "count": 2,
+            "next": None,
+            "results": [{"name": "Фильм", "genre": []}, {"name": " "}],
+        }
+        streamed = dict(data, results=iter(data["results"]))
+
+        assert b"".join(
+            StreamingJSONRenderer().iter_render(streamed)
+        ) == JSONRenderer().render(data)
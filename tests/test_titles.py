@@ -0,0 +1,59 @@
+import pytest
+
+from api.models import Title
+
+
+class TestTitleQueries:
+    @pytest.mark.django_db
+    def test_list_query_count(
+        self, client, category, genres, django_assert_num_queries
+    ):
+        for number in range(10):
+            title = Title.objects.create(
+                name=f"Произведение {number}", year=2000, category=category
+            )
+            title.genre.set(genres)
+
+        # COUNT, страница произведений с категориями, жанры всей страницы.
+        with django_assert_num_queries(3):
+            response = client.get("/api/v1/titles/")
+
+        assert len(response.json()["results"]) == 10
+        assert response.json()["results"][0]["genre"] == [
+            {"name": "Драма", "slug": "drama"},
+            {"name": "Комедия", "slug": "comedy"},
+        ], "Проверьте, что жанры произведения выводятся в ответе"
+
+    @pytest.mark.django_db
+    def test_detail_query_count(self, client, title, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = client.get(f"/api/v1/titles/{title.id}/")
+
+        assert response.json()["category"] == {
+            "name": "Фильм",
+            "slug": "movie",
+        }
+
+    @pytest.mark.django_db
+    def test_create_and_update(self, admin_client, category, genres):
+        response = admin_client.post(
+            "/api/v1/titles/",
+            data={
+                "name": "Новое",
+                "year": 2001,
+                "category": "movie",
+                "genre": ["drama"],
+            },
+        )
+        assert response.status_code == 201, (
+            "Проверьте, что администратор может создать произведение"
+        )
+
+        response = admin_client.patch(
+            f"/api/v1/titles/{response.json()['id']}/",
+            data={"genre": ["drama", "comedy"]},
+        )
+        assert response.status_code == 200
+        assert sorted(response.json()["genre"]) == ["comedy", "drama"], (
+            "Проверьте, что жанры обновляются при изменении произведения"
+        )
@@ -0,0 +1,156 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import cached_property
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import User, UserRole
+
+USER_CLAIMS = ("username", "role", "is_staff")
+
+
+def user_state_key(user_id):
+    return f"users:state:{user_id}"
+
+
+def get_user_state(user_id):
+    """
+    Актуальные активность, роль и права пользователя. Значение кэшируется
+    на `JWT_USER_STATE_TIMEOUT` секунд и сбрасывается при изменении
+    пользователя. Сброс виден всем процессам, только если кэш общий
+    (CACHE_BACKEND); с кэшем в памяти процесса блокировка и смена роли
+    применяются сразу в процессе, сохранившем пользователя, а в остальных
+    не позже чем через `JWT_USER_STATE_TIMEOUT` секунд.
+    """
+
+    key = user_state_key(user_id)
+    state = cache.get(key)
+
+    if state is None:
+        row = (
+            User.objects.filter(pk=user_id)
+            .values("is_active", *USER_CLAIMS)
+            .first()
+        )
+        state = row or {"is_active": False}
+        cache.set(key, state, timeout=settings.JWT_USER_STATE_TIMEOUT)
+
+    return state
+
+
+def forget_user_state(user_id):
+    cache.delete(user_state_key(user_id))
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Токен, в который записаны имя, роль и права пользователя."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+
+        return token
+
+
+class ClaimsTokenUser(TokenUser):
+    """Пользователь, собранный из утверждений токена без запроса к БД."""
+
+    @cached_property
+    def role(self):
+        return self.token.get("role", UserRole.USER)
+
+    @property
+    def is_admin(self):
+        return self.role == UserRole.ADMIN or self.is_staff
+
+    @property
+    def is_moderator(self):
+        return self.role == UserRole.MODERATOR
+
+    def as_model(self):
+        """
+        Экземпляр User с данными из токена для связей внешних ключей.
+        Остальные поля не загружены, поэтому сохранять его нельзя.
+        """
+
+        user = User(
+            id=self.id,
+            username=self.username,
+            role=self.role,
+            is_staff=self.is_staff,
+        )
+        user._state.adding = False
+        user._state.db = "default"
+
+        return user
+
+
+def get_model_user(user):
+    """Пользователь запроса как экземпляр модели User."""
+
+    if isinstance(user, ClaimsTokenUser):
+        return user.as_model()
+
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT без чтения таблицы users на каждый запрос.
+    Токены без утверждения `role`, выпущенные раньше, проверяются
+    по базе как в JWTAuthentication. Если `JWT_USER_STATE_TIMEOUT`
+    равен нулю, токен не сверяется с состоянием пользователя.
+    """
+
+    def get_user(self, validated_token):
+        if "role" not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                "Token contained no recognizable user identification"
+            )
+
+        user = ClaimsTokenUser(validated_token)
+
+        if settings.JWT_USER_STATE_TIMEOUT:
+            state = dict(get_user_state(user_id))
+            if not state.pop("is_active"):
+                raise AuthenticationFailed(
+                    "User is inactive", code="user_inactive"
+                )
+            user.__dict__.update(state)
+
+        return user
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """
+    Сборщик метрик предъявляет `METRICS_TOKEN` как Bearer-токен.
+    Пользователь остается анонимным, доступ дает IsMetricsScraper.
+    Если токен не задан, аутентификация не выполняется.
+    """
+
+    def authenticate(self, request):
+        token = settings.METRICS_TOKEN
+        parts = request.META.get("HTTP_AUTHORIZATION", "").split()
+        if not token or len(parts) != 2 or parts[0] != "Bearer":
+            return None
+        if not constant_time_compare(parts[1], token):
+            return None
+
+        return AnonymousUser(), None
+
+    def authenticate_header(self, request):
+        return 'Bearer realm="metrics"'
@@ -0,0 +1,163 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueue:
+    """
+    Очередь исходящих писем, которую разбирает пул фоновых потоков.
+
+    Поток забирает из очереди пачку писем и отправляет ее через одно
+    соединение с почтовым бэкендом. Неотправленные письма повторяются
+    с экспоненциальной задержкой, после последней попытки пишутся в лог.
+    Потоки запускаются при первой отправке в процессе, поэтому очередь
+    работает и в воркерах gunicorn, созданных через fork.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pid = None
+        self.queue = None
+        self.workers = []
+
+    @property
+    def workers_count(self):
+        return getattr(settings, "EMAIL_QUEUE_WORKERS", 2)
+
+    @property
+    def batch_size(self):
+        return getattr(settings, "EMAIL_QUEUE_BATCH_SIZE", 50)
+
+    @property
+    def retries(self):
+        return getattr(settings, "EMAIL_QUEUE_RETRIES", 3)
+
+    @property
+    def backoff(self):
+        return getattr(settings, "EMAIL_QUEUE_BACKOFF", 1)
+
+    def start(self):
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+
+            self.pid = os.getpid()
+            self.queue = queue.Queue()
+            self.workers = [
+                threading.Thread(
+                    target=self.work, name=f"mail-queue-{number}", daemon=True
+                )
+                for number in range(self.workers_count)
+            ]
+            for worker in self.workers:
+                worker.start()
+
+    def put(self, message):
+        self.start()
+        self.queue.put(message)
+
+    def take_batch(self):
+        batch = [self.queue.get()]
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def work(self):
+        while True:
+            batch = self.take_batch()
+            try:
+                self.deliver(batch)
+            except Exception:
+                logger.exception("Ошибка отправки %s писем", len(batch))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def deliver(self, messages):
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+
+            messages = self.send_batch(messages)
+            if not messages:
+                return
+
+        for message in messages:
+            logger.error(
+                "Письмо %r для %s не отправлено после %s попыток",
+                message.subject,
+                ", ".join(message.recipients()),
+                self.retries + 1,
+            )
+
+    @staticmethod
+    def send_batch(messages):
+        """Отправляем письма через одно соединение, возвращаем неудачные."""
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception:
+            logger.warning("Почтовый бэкенд недоступен", exc_info=True)
+            return messages
+
+        failed = []
+        try:
+            for message in messages:
+                try:
+                    connection.send_messages([message])
+                except Exception:
+                    logger.warning(
+                        "Ошибка отправки письма %r", message.subject,
+                        exc_info=True,
+                    )
+                    failed.append(message)
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                logger.warning("Ошибка закрытия соединения", exc_info=True)
+
+        return failed
+
+    def join(self, timeout=None):
+        """
+        Ждем, пока очередь опустеет. Возвращает False, если за `timeout`
+        секунд отправлены не все письма.
+        """
+
+        if self.pid != os.getpid():
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = (
+                    None if deadline is None else deadline - time.monotonic()
+                )
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+
+        return True
+
+
+mail_queue = MailQueue()
+
+
+@atexit.register
+def flush_mail_queue():
+    mail_queue.join(getattr(settings, "EMAIL_QUEUE_SHUTDOWN_TIMEOUT", 10))
@@ -1,17 +1,21 @@
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
+
+from .mail import mail_queue
 
 
 def email_default():
     from django.conf import settings
 
-    return settings.GLOBAL_SETTINGS["EMAIL_DEFAULT_ADDRESS"]
+    global_settings = getattr(settings, "GLOBAL_SETTINGS", {})
+
+    return global_settings.get(
+        "EMAIL_DEFAULT_ADDRESS", settings.DEFAULT_FROM_EMAIL
+    )
 
 
 def send_message(mail_subject, message, email):
-    send_mail(
-        mail_subject,
-        message,
-        email_default(),
-        [email],
-        fail_silently=False,
+    """Ставим письмо в очередь, его отправит фоновый поток."""
+
+    mail_queue.put(
+        EmailMessage(mail_subject, message, email_default(), [email])
     )
@@ -1,12 +1,18 @@
 from uuid import uuid4
 
 from django.shortcuts import get_object_or_404
-from rest_framework import status, viewsets
+from rest_framework import status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from api.mixins import (
+    QueryBudgetMixin,
+    StreamingListMixin,
+    TimedModelViewSet,
+)
+
+from .authentication import ClaimsRefreshToken
 from .models import User
 from .permissions import IsAdminOrSuperUser
 from .serializers import (
@@ -19,12 +25,23 @@ from .utils import send_message
 
 
 @permission_classes([IsAdminOrSuperUser])
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(
+    QueryBudgetMixin, StreamingListMixin, TimedModelViewSet
+):
     """API для работы с пользователями."""
 
     queryset = User.objects.all()
     serializer_class = UserSerializer
     lookup_field = "username"
+    query_budgets = {
+        "list": 3,
+        "retrieve": 2,
+        "create": 4,
+        "update": 5,
+        "partial_update": 3,
+        "destroy": 8,
+        "me": 3,
+    }
 
     @action(
         detail=False,
@@ -35,9 +52,8 @@ class UserViewSet(viewsets.ModelViewSet):
             self,
             request,
     ):
-        serializer = MeSerializer(
-            request.user, data=request.data, partial=True
-        )
+        user = get_object_or_404(User, pk=request.user.pk)
+        serializer = MeSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -90,7 +106,7 @@ def get_jwt_token(request):
     user = get_object_or_404(User, email=email)
 
     if confirmation_code == user.confirmation_code:
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
 
         return Response(
             {"access": str(refresh.access_token)}, status=status.HTTP_200_OK